@@ -0,0 +1,107 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Benchmark del análisis de texto por post, como lo hace src/main.py.
+
+Por cada documento de debug_texts se clasifica el post (is_job_post) y se
+extraen sus datos (extract_job_data). Se compara la revisión de referencia,
+que recibe cadenas y normaliza dentro de cada extractor, con la actual, que
+normaliza cada texto una sola vez en un NormalizedDocument. Se reporta el
+tiempo por post y cuántas veces se llamó a normalize_text.
+
+Uso:
+    python benchmarks/bench_analysis.py
+    python benchmarks/bench_analysis.py --reference HEAD~1 --repeats 50
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Añadir el directorio raíz al path
+sys.path.append(ROOT)
+
+from src.text_analysis import job_analyzer
+from benchmarks.bench_normalize import load_reference, load_corpus
+
+
+def analyze_reference(module, text, description):
+    """Flujo anterior: cadenas en todas las llamadas"""
+    classification = module.is_job_post(text, description)
+    return classification, module.extract_job_data(text, description)
+
+
+def analyze_current(module, text, description):
+    """Flujo actual: un NormalizedDocument por texto, compartido por la clasificación y la extracción"""
+    image_document = module.NormalizedDocument(text)
+    description_document = module.NormalizedDocument(description)
+    classification = module.is_job_post(image_document, description_document)
+    return classification, module.extract_job_data(image_document, description_document)
+
+
+def count_normalizations(module, analyze, corpus):
+    """Llamadas a normalize_text por post"""
+    original = module.normalize_text
+    calls = 0
+    
+    def counting(text):
+        nonlocal calls
+        calls += 1
+        return original(text)
+    
+    module.normalize_text = counting
+    try:
+        for text, description in corpus:
+            analyze(module, text, description)
+    finally:
+        module.normalize_text = original
+    return calls / len(corpus)
+
+
+def time_posts(module, analyze, corpus, repeats):
+    """Milisegundos por post (mejor de `repeats` pasadas)"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text, description in corpus:
+            analyze(module, text, description)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del análisis de texto por post')
+    parser.add_argument('--texts', default=os.path.join(ROOT, 'debug_texts', '*.txt'),
+                        help='Patrón glob de textos de depuración')
+    parser.add_argument('--reference', help='Revisión de git a comparar (por defecto, la primera)')
+    parser.add_argument('--repeats', type=int, default=20, help='Pasadas sobre el corpus')
+    args = parser.parse_args()
+    
+    corpus = load_corpus(args.texts)
+    if not corpus:
+        parser.error(f"No hay textos que coincidan con {args.texts}")
+    
+    revision = args.reference or subprocess.run(
+        ['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=ROOT, check=True,
+        capture_output=True, text=True).stdout.split()[0]
+    reference = load_reference(revision)
+    
+    variants = [(f'referencia {revision[:12]}', reference, analyze_reference),
+                ('actual', job_analyzer, analyze_current)]
+    results = {name: [analyze(module, *pair) for pair in corpus] for name, module, analyze in variants}
+    identical = results[variants[0][0]] == results[variants[1][0]]
+    
+    print(f"{len(corpus)} posts")
+    print(f"{'variante':>24} {'ms/post':>8} {'normalize_text/post':>20}")
+    timings = {}
+    for name, module, analyze in variants:
+        timings[name] = time_posts(module, analyze, corpus, args.repeats)
+        calls = count_normalizations(module, analyze, corpus)
+        print(f"{name:>24} {timings[name]:>8.2f} {calls:>20.1f}")
+    print(f"Mejora: {timings[variants[0][0]] / timings[variants[1][0]]:.1f}x, "
+          f"resultados {'idénticos' if identical else 'DISTINTOS'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Benchmark de las consultas del dashboard sobre una base sintética grande.
+
+Genera una base SQLite con N posts (por defecto 1M) con el esquema de
+src/database/models.py pero sin los índices secundarios, mide las consultas
+que hacen src/web/app.py y JobAnalysisReporter, luego abre la base con
+init_db() (que crea los índices y aplica los PRAGMAs) y repite la medición.
+
+Uso:
+    python benchmarks/bench_db_indexes.py --posts 1000000
+    python benchmarks/bench_db_indexes.py --posts 200000 --db /tmp/bench.db --keep
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import logging
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func, desc, Integer
+from sqlalchemy.orm import sessionmaker
+from src.database.models import Base, init_db, JobPost, JobData, AnalysisMetrics, CarouselImage
+
+JOB_TYPES = ["Práctica profesional", "Práctica laboral", "Vacante", "Pasantía"]
+INDUSTRIES = ["Tecnología", "Manufactura", "Finanzas", "Salud", "Educación", "Construcción", None]
+MODALITIES = ["Presencial", "Remoto", "Híbrido", None]
+
+
+def build_database(path, posts, seed=42):
+    """Crea el esquema sin índices secundarios y lo llena con sqlite3 crudo"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+    engine.dispose()
+    
+    rng = random.Random(seed)
+    companies = [f"Empresa {i} S. A." for i in range(2000)]
+    start_date = datetime.now() - timedelta(days=3 * 365)
+    
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=OFF")
+    connection.execute("PRAGMA synchronous=OFF")
+    
+    def post_rows():
+        for i in range(1, posts + 1):
+            post_date = start_date + timedelta(minutes=i * 3 * 365 * 24 * 60 // posts)
+            yield (i, f"https://www.instagram.com/p/SYN{i:08d}/", f"https://cdn.example/{i}.jpg",
+                   "Descripción del post", post_date.isoformat(sep=' '), post_date.isoformat(sep=' '),
+                   None, i % 5 == 0, rng.randint(-5, 12), rng.random() < 0.4)
+    
+    connection.executemany(
+        "INSERT INTO job_posts (id, post_url, image_url, description, post_date, scraped_at, "
+        "local_image_path, is_carousel, classification_score, is_job_offer) VALUES (?,?,?,?,?,?,?,?,?,?)",
+        post_rows())
+    
+    def data_rows():
+        for (post_id, is_job) in connection.execute("SELECT id, is_job_offer FROM job_posts").fetchall():
+            if is_job:
+                yield (post_id, rng.choice(companies), rng.choice(INDUSTRIES), rng.choice(JOB_TYPES),
+                       "Asistente", rng.choice(MODALITIES),
+                       f"rrhh{post_id}@empresa.com" if rng.random() < 0.6 else None, rng.random() < 0.3)
+            else:
+                yield (post_id, "N/A", None, "No es oferta laboral", None, None, None, False)
+    
+    connection.executemany(
+        "INSERT INTO job_data (post_id, company_name, company_industry, job_type, position_title, "
+        "work_modality, contact_email, is_active) VALUES (?,?,?,?,?,?,?,?)",
+        data_rows())
+    connection.executemany(
+        "INSERT INTO analysis_metrics (post_id, ocr_confidence, text_length) VALUES (?,?,?)",
+        ((post_id, rng.randint(40, 95), rng.randint(0, 2000)) for post_id in range(1, posts + 1)))
+    connection.executemany(
+        "INSERT INTO carousel_images (post_id, image_url, image_order) VALUES (?,?,?)",
+        ((post_id, f"https://cdn.example/{post_id}_{order}.jpg", order)
+         for post_id in range(5, posts + 1, 5) for order in range(3)))
+    connection.commit()
+    connection.close()
+
+
+def dashboard_queries(session, posts):
+    """Las consultas de src/web/app.py y del reporter, con parámetros fijos"""
+    week_ago = datetime.now() - timedelta(days=7)
+    month_ago = datetime.now() - timedelta(days=30)
+    detail_post = posts // 2
+    return {
+        'total_posts': lambda: session.query(JobPost).count(),
+        'job_offers': lambda: session.query(JobPost).filter(JobPost.is_job_offer == True).count(),
+        'active_offers': lambda: session.query(JobData).join(JobPost).filter(
+            JobPost.is_job_offer == True, JobData.is_active == True).count(),
+        'expired_offers': lambda: session.query(JobData).join(JobPost).filter(
+            JobPost.is_job_offer == True, JobData.is_active == False).count(),
+        'this_week': lambda: session.query(JobPost).filter(
+            JobPost.post_date >= week_ago, JobPost.is_job_offer == True).count(),
+        'with_contact': lambda: session.query(JobData).join(JobPost).filter(
+            JobPost.is_job_offer == True, JobData.contact_email.isnot(None), JobData.is_active == True).count(),
+        'index_first_page': lambda: session.query(JobPost, JobData).join(JobData).filter(
+            JobPost.is_job_offer == True, JobData.is_active == True
+        ).order_by(desc(JobPost.post_date)).limit(50).all(),
+        'trends_30d': lambda: session.query(JobPost.post_date, JobData.job_type).join(JobData).filter(
+            JobPost.post_date >= month_ago, JobPost.is_job_offer == True).all(),
+        'top_companies': lambda: session.query(
+            JobData.company_name, func.count(JobData.id), func.sum(JobData.is_active.cast(Integer))
+        ).filter(
+            JobData.company_name.isnot(None), JobData.company_name != "N/A", JobData.company_name != "Por determinar"
+        ).group_by(JobData.company_name).order_by(func.count(JobData.id).desc()).limit(10).all(),
+        'by_job_type': lambda: session.query(JobData.job_type, func.count(JobData.job_type)).filter(
+            JobData.job_type.isnot(None)).group_by(JobData.job_type).all(),
+        'by_industry': lambda: session.query(JobData.company_industry, func.count(JobData.company_industry)).filter(
+            JobData.company_industry.isnot(None)).group_by(JobData.company_industry).all(),
+        'job_detail': lambda: (
+            session.query(CarouselImage).filter(CarouselImage.post_id == detail_post).order_by(CarouselImage.image_order).all(),
+            session.query(AnalysisMetrics).filter(AnalysisMetrics.post_id == detail_post).first(),
+        ),
+    }
+
+
+def measure(session, posts, repeats):
+    """Mediana en milisegundos de cada consulta (tras una ejecución de calentamiento)"""
+    timings = {}
+    for name, query in dashboard_queries(session, posts).items():
+        query()
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            query()
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[name] = statistics.median(samples)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de índices y PRAGMAs de SQLite')
+    parser.add_argument('--posts', type=int, default=1_000_000, help='Posts sintéticos')
+    parser.add_argument('--repeats', type=int, default=5, help='Repeticiones por consulta')
+    parser.add_argument('--db', help='Ruta de la base sintética (por defecto, un directorio temporal)')
+    parser.add_argument('--keep', action='store_true', help='No borrar la base al terminar')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    workdir = None
+    path = args.db
+    if path is None:
+        workdir = tempfile.mkdtemp()
+        path = os.path.join(workdir, 'bench.db')
+    elif os.path.exists(path):
+        os.remove(path)
+    
+    try:
+        start = time.perf_counter()
+        build_database(path, args.posts)
+        print(f"Base sintética de {args.posts} posts creada en {time.perf_counter() - start:.1f}s")
+        
+        # Antes: sin índices secundarios y con los PRAGMAs por defecto
+        engine = create_engine(f"sqlite:///{path}")
+        session = sessionmaker(bind=engine)()
+        before = measure(session, args.posts, args.repeats)
+        session.close()
+        engine.dispose()
+        
+        # Después: init_db migra la base (índices + ANALYZE) y aplica los PRAGMAs
+        start = time.perf_counter()
+        session = init_db(f"sqlite:///{path}")
+        print(f"Migración (creación de índices) en {time.perf_counter() - start:.1f}s")
+        after = measure(session, args.posts, args.repeats)
+        session.close()
+        session.get_bind().dispose()
+        
+        print(f"\n{'consulta':>18} {'antes ms':>10} {'después ms':>11} {'mejora':>8}")
+        for name in before:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            print(f"{name:>18} {before[name]:>10.1f} {after[name]:>11.1f} {speedup:>7.1f}x")
+        print(f"{'total':>18} {sum(before.values()):>10.1f} {sum(after.values()):>11.1f}")
+    finally:
+        if not args.keep:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+            if workdir:
+                os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Benchmark de memoria y tiempo de la exportación a Excel.
+
+Genera la base sintética de bench_db_indexes.py y ejecuta cada exportación en
+un proceso hijo para medir su memoria residente pico:
+
+    legacy     la exportación anterior (todo en un DataFrame de pandas)
+    streaming  JobAnalysisReporter.export_to_excel (yield_per + openpyxl write-only)
+
+Uso:
+    python benchmarks/bench_export.py --posts 200000
+    python benchmarks/bench_export.py --posts 2500000 --variants streaming
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Añadir el directorio raíz al path
+sys.path.append(ROOT)
+
+VARIANTS = ('legacy', 'streaming')
+
+
+def peak_rss_mb():
+    """Memoria residente pico del proceso actual en MB, o None si no se puede medir"""
+    try:
+        import resource
+    except ImportError:
+        # Windows: el módulo resource no existe
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def legacy_export(reporter, filename):
+    """La exportación anterior: DataFrame completo y agregados con pandas"""
+    import pandas as pd
+    from src.reports.reports_generator import OFFER_COLUMNS
+    
+    df = pd.DataFrame(reporter._offer_export_query().all(), columns=OFFER_COLUMNS)
+    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Todas_las_Ofertas', index=False)
+        df[df['Activa'] == True].to_excel(writer, sheet_name='Ofertas_Activas', index=False)
+        df.groupby('Empresa').agg({'URL_Post': 'count', 'Activa': 'sum', 'Fecha_Post': 'max'}).reset_index().to_excel(
+            writer, sheet_name='Estadisticas_Empresas', index=False)
+        df.groupby('Tipo_Trabajo').agg({'URL_Post': 'count', 'Activa': 'sum'}).reset_index().to_excel(
+            writer, sheet_name='Estadisticas_Tipo_Trabajo', index=False)
+
+
+def run_variant(variant, db_path, workdir):
+    """Ejecuta una exportación en el proceso actual e imprime el resultado como JSON"""
+    from src.reports.reports_generator import JobAnalysisReporter
+    
+    logging.disable(logging.CRITICAL)
+    reporter = JobAnalysisReporter(f"sqlite:///{db_path}")
+    filename = os.path.join(workdir, f"{variant}.xlsx")
+    baseline = peak_rss_mb()
+    
+    start = time.perf_counter()
+    if variant == 'legacy':
+        legacy_export(reporter, filename)
+    else:
+        reporter.export_to_excel(filename)
+    elapsed = time.perf_counter() - start
+    reporter.close()
+    
+    print(json.dumps({
+        'variant': variant,
+        'seconds': elapsed,
+        'baseline_rss_mb': baseline,
+        'peak_rss_mb': peak_rss_mb(),
+        'file_mb': os.path.getsize(filename) / (1024 * 1024),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la exportación a Excel')
+    parser.add_argument('--posts', type=int, default=200_000, help='Posts sintéticos (~40%% son ofertas)')
+    parser.add_argument('--variants', nargs='+', choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument('--child', choices=VARIANTS, help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        run_variant(args.child, args.db, args.workdir)
+        return
+    
+    from benchmarks.bench_db_indexes import build_database
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, 'bench.db')
+        start = time.perf_counter()
+        build_database(db_path, args.posts)
+        print(f"Base sintética de {args.posts} posts creada en {time.perf_counter() - start:.1f}s")
+        
+        results = {}
+        for variant in args.variants:
+            command = [sys.executable, os.path.abspath(__file__), '--child', variant,
+                       '--db', db_path, '--workdir', workdir]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            results[variant] = json.loads(output.strip().splitlines()[-1])
+        
+        print(f"{'variante':>10} {'segundos':>9} {'RSS base MB':>12} {'RSS pico MB':>12} {'archivo MB':>11}")
+        for variant in args.variants:
+            result = results[variant]
+            if result['peak_rss_mb'] is None:
+                rss_text = f"{'n/d':>12} {'n/d':>12}"
+            else:
+                rss_text = f"{result['baseline_rss_mb']:>12.1f} {result['peak_rss_mb']:>12.1f}"
+            print(f"{variant:>10} {result['seconds']:>9.1f} {rss_text} {result['file_mb']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Benchmark del cursor incremental de la grilla del perfil.
+
+Sirve una grilla local con scroll infinito (benchmarks/fixtures/grid) y mide
+cuánto tarda el scraper en cosechar N URLs en lotes, comparando el modo
+incremental con el modo clásico que vuelve a navegar y scrollear desde arriba
+en cada lote.
+
+Requiere ChromeDriver igual que src/main.py.
+
+Uso:
+    python benchmarks/bench_grid_cursor.py --batch 25 --counts 50 100 200 400
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scraper.instagram_scraper import InstagramScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server():
+    """Levanta un servidor HTTP local con las fixtures y devuelve (server, base_url)"""
+    handler = functools.partial(QuietHandler, directory=FIXTURES_DIR)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/"
+
+
+def make_scraper(base_url, incremental, scroll_pause):
+    scraper = InstagramScraper("bench", "bench", "grid", headless=True, incremental_grid=incremental)
+    scraper.base_url = base_url
+    # Sustituir las pausas "humanas" por una espera corta y fija para que solo cuente el trabajo
+    scraper.random_sleep = lambda *args, **kwargs: time.sleep(scroll_pause)
+    return scraper
+
+
+def harvest(scraper, total, batch):
+    """Reproduce el bucle de lotes de main() pidiendo solo URLs (sin visitar los posts)"""
+    collected = 0
+    start = time.perf_counter()
+    
+    while collected < total:
+        size = min(batch, total - collected)
+        if scraper.incremental_grid:
+            urls = scraper._get_incremental_post_urls(size)
+        else:
+            urls = [url for url in scraper._get_chronological_post_urls(size * 3)
+                    if url.split('?')[0] not in scraper.processed_urls][:size]
+        if not urls:
+            break
+        for url in urls:
+            scraper.processed_urls.add(url.split('?')[0])
+        collected += len(urls)
+    
+    return collected, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del cursor de la grilla del perfil')
+    parser.add_argument('--batch', type=int, default=25, help='Tamaño de lote (como --batch en main.py)')
+    parser.add_argument('--counts', type=int, nargs='+', default=[50, 100, 200, 400],
+                        help='Cantidades de posts a cosechar')
+    parser.add_argument('--scroll-pause', type=float, default=0.1,
+                        help='Espera tras cada navegación/scroll en segundos')
+    args = parser.parse_args()
+    
+    server, base_url = start_fixture_server()
+    try:
+        print(f"{'modo':<12} {'posts':>6} {'obtenidos':>10} {'segundos':>9} {'ms/post':>8}")
+        for incremental in (False, True):
+            mode = 'incremental' if incremental else 'clasico'
+            for count in args.counts:
+                scraper = make_scraper(base_url, incremental, args.scroll_pause)
+                try:
+                    collected, elapsed = harvest(scraper, count, args.batch)
+                finally:
+                    scraper.close()
+                per_post = (elapsed / collected * 1000) if collected else float('nan')
+                print(f"{mode:<12} {count:>6} {collected:>10} {elapsed:>9.2f} {per_post:>8.1f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Benchmark de la puntuación de indicadores de is_job_post, en documentos/segundo.
+
+Compara tres formas de buscar los términos de job_indicators.json en el texto
+combinado (normalizado y en minúsculas) de cada post de debug_texts:
+
+- subcadenas: un `term in texto` por término
+- aho-corasick: autómata en Python puro, una pasada carácter a carácter
+- trie: una expresión regular en forma de trie, una pasada en C
+
+y verifica que las tres encuentren los mismos términos. Con --terms se añaden
+palabras del corpus como términos de peso 0, para ver a partir de cuántos
+términos dejaría de convenir la búsqueda por subcadenas de IndicatorMatcher.
+
+Uso:
+    python benchmarks/bench_indicators.py
+    python benchmarks/bench_indicators.py --terms 300 --scale 10
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Añadir el directorio raíz al path
+sys.path.append(ROOT)
+
+from src.text_analysis.job_analyzer import INDICATOR_MATCHER, IndicatorMatcher, NormalizedDocument
+from benchmarks.bench_normalize import load_corpus
+
+
+def substring_terms(terms):
+    """Una pasada completa del texto por término"""
+    return lambda text: frozenset(term for term in terms if term in text)
+
+
+def aho_corasick_terms(terms):
+    """Autómata de Aho-Corasick construido una vez, recorrido en Python"""
+    goto, fail, output = [{}], [0], [set()]
+    for term in terms:
+        state = 0
+        for char in term:
+            if char not in goto[state]:
+                goto.append({})
+                fail.append(0)
+                output.append(set())
+                goto[state][char] = len(goto) - 1
+            state = goto[state][char]
+        output[state].add(term)
+    
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for char, child in goto[state].items():
+            queue.append(child)
+            link = fail[state]
+            while link and char not in goto[link]:
+                link = fail[link]
+            fail[child] = goto[link].get(char, 0)
+            output[child] |= output[fail[child]]
+    
+    def find_terms(text):
+        state, found = 0, set()
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return frozenset(found)
+    return find_terms
+
+
+def term_trie_pattern(terms):
+    """Alternativa en forma de trie: los términos con un prefijo común lo comparten"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def to_pattern(node):
+        branches = [re.escape(char) + to_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{pattern})?' if '' in node else pattern
+    
+    return to_pattern(trie)
+
+
+def trie_terms(terms):
+    """Una pasada con el trie dentro de una anticipación (encuentra términos solapados)"""
+    pattern = re.compile(r'(?=(' + term_trie_pattern(terms) + r'))')
+    prefixes = {term: frozenset(other for other in terms if term.startswith(other)) for term in terms}
+    return lambda text: frozenset().union(*(prefixes[term] for term in set(pattern.findall(text))))
+
+
+def docs_per_second(find_terms, texts, repeats):
+    """Documentos por segundo (mejor de `repeats` pasadas)"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text in texts:
+            find_terms(text)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de los indicadores de oferta laboral')
+    parser.add_argument('--texts', default=os.path.join(ROOT, 'debug_texts', '*.txt'),
+                        help='Patrón glob de textos de depuración')
+    parser.add_argument('--terms', type=int, default=0, help='Términos extra (palabras del corpus, peso 0)')
+    parser.add_argument('--scale', type=int, default=1, help='Veces que se repite cada texto')
+    parser.add_argument('--repeats', type=int, default=50, help='Pasadas sobre el corpus')
+    args = parser.parse_args()
+    
+    corpus = load_corpus(args.texts)
+    if not corpus:
+        parser.error(f"No hay textos que coincidan con {args.texts}")
+    texts = [' '.join([f"{NormalizedDocument(text).lower} {NormalizedDocument(description).lower}"] * args.scale)
+             for text, description in corpus]
+    
+    matcher = INDICATOR_MATCHER
+    if args.terms:
+        words = sorted({word.strip('.,;:()') for text in texts for word in text.split()} - set(matcher.terms))
+        extra = random.Random(0).sample(words, min(args.terms, len(words)))
+        matcher = IndicatorMatcher({**matcher.weights, **dict.fromkeys(extra, 0)}, matcher.expired_phrases,
+                                   matcher.job_types, matcher.threshold, matcher.default_job_type)
+    
+    variants = [
+        ('subcadenas', substring_terms(matcher.terms)),
+        ('aho-corasick', aho_corasick_terms(matcher.terms)),
+        ('trie', trie_terms(matcher.terms)),
+    ]
+    expected = [substring_terms(matcher.terms)(text) for text in texts]
+    
+    average = sum(map(len, texts)) / len(texts)
+    print(f"{len(texts)} documentos, {average:.0f} caracteres de media, {len(matcher.terms)} términos")
+    print(f"{'variante':>14} {'docs/s':>10} {'resultados':>11}")
+    for name, find_terms in variants:
+        same = [find_terms(text) for text in texts] == expected
+        rate = docs_per_second(find_terms, texts, args.repeats)
+        print(f"{name:>14} {rate:>10.0f} {'iguales' if same else 'DISTINTOS':>11}")
+    
+    rate = docs_per_second(matcher.scan, texts, args.repeats)
+    print(f"IndicatorMatcher.scan: {rate:.0f} docs/s")
+
+
+if __name__ == "__main__":
+    main()
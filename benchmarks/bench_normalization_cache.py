@@ -0,0 +1,103 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Benchmark de la caché de normalización (palabras y líneas) de normalize_text.
+
+Genera posts sintéticos a partir de debug_texts: cada post toma un texto como
+plantilla, conserva la mayoría de sus líneas (como el pie repetido de los
+flyers) y en el resto cambia palabras por otras del corpus o por valores
+únicos (teléfonos, correos). Normaliza todos los posts:
+
+    sin caché  normalize_text sobre el texto completo
+    fría       con una caché vacía, que luego se guarda en disco
+    persistida con la caché cargada del archivo, como en una segunda ejecución
+
+y verifica que las tres den exactamente el mismo resultado.
+
+Uso:
+    python benchmarks/bench_normalization_cache.py --posts 2500
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Añadir el directorio raíz al path
+sys.path.append(ROOT)
+
+from src.text_analysis import job_analyzer
+from benchmarks.bench_normalize import load_corpus
+
+
+def synthetic_posts(corpus, count, changed_lines, seed=0):
+    """Posts que repiten líneas y vocabulario del corpus, con algunas palabras nuevas"""
+    rng = random.Random(seed)
+    templates = [text.splitlines() for pair in corpus for text in pair if text]
+    vocabulary = [word for lines in templates for line in lines for word in line.split()]
+    
+    posts = []
+    for number in range(count):
+        lines = []
+        for line in rng.choice(templates):
+            words = line.split()
+            if words and rng.random() < changed_lines:
+                for _ in range(max(1, len(words) // 4)):
+                    words[rng.randrange(len(words))] = rng.choice(vocabulary)
+                words.append(rng.choice([f"+507 6{number:03d}-{rng.randint(0, 9999):04d}",
+                                         f"rrhh{number}@empresa{rng.randint(1, 500)}.com",
+                                         f"{rng.randint(1, 28)}/{rng.randint(1, 12)}/2025"]))
+            lines.append(' '.join(words))
+        posts.append('\n'.join(lines))
+    return posts
+
+
+def normalize_all(posts):
+    """Normaliza todos los posts y devuelve (resultados, ms por post)"""
+    start = time.perf_counter()
+    results = [job_analyzer.normalize_text(post) for post in posts]
+    return results, (time.perf_counter() - start) / len(posts) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la caché de normalización')
+    parser.add_argument('--texts', default=os.path.join(ROOT, 'debug_texts', '*.txt'),
+                        help='Patrón glob de textos de depuración')
+    parser.add_argument('--posts', type=int, default=2500, help='Posts sintéticos a normalizar')
+    parser.add_argument('--changed-lines', type=float, default=0.3,
+                        help='Fracción de líneas con palabras cambiadas (por defecto: 0.3)')
+    args = parser.parse_args()
+    
+    corpus = load_corpus(args.texts)
+    if not corpus:
+        parser.error(f"No hay textos que coincidan con {args.texts}")
+    posts = synthetic_posts(corpus, args.posts, args.changed_lines)
+    
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'normalization_cache.json')
+        
+        job_analyzer.disable_normalization_cache()
+        expected, uncached_ms = normalize_all(posts)
+        
+        runs = []
+        for name in ('fría', 'persistida'):
+            cache = job_analyzer.enable_normalization_cache(path=path)
+            results, elapsed_ms = normalize_all(posts)
+            cache.save()
+            runs.append((name, elapsed_ms, cache.get_stats(), results == expected))
+        job_analyzer.disable_normalization_cache()
+        size_kb = os.path.getsize(path) / 1024
+    
+    print(f"{args.posts} posts, {sum(map(len, posts)) / len(posts):.0f} caracteres de media, "
+          f"{args.changed_lines:.0%} de líneas con cambios")
+    print(f"{'caché':>11} {'ms/post':>8} {'palabras':>9} {'líneas':>7} {'ahorro est.':>12} {'salida':>9}")
+    print(f"{'sin caché':>11} {uncached_ms:>8.3f}")
+    for name, elapsed_ms, stats, identical in runs:
+        print(f"{name:>11} {elapsed_ms:>8.3f} {stats['token_hit_rate']:>8.1f}% {stats['line_hit_rate']:>6.1f}% "
+              f"{stats['seconds_saved']:>11.2f}s {'idéntica' if identical else 'DISTINTA':>9}")
+    print(f"Archivo de caché: {size_kb:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
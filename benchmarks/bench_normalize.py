@@ -0,0 +1,116 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Micro-benchmark de normalize_text y de extract_job_data sobre debug_texts.
+
+Compara la implementación actual de src/text_analysis/job_analyzer.py con la
+de otra revisión de git (por defecto, la primera del repositorio), cargada
+desde `git show`. Además del tiempo por llamada, verifica que las salidas de
+ambas versiones sean idénticas. Con --scales mide normalize_text sobre textos
+largos (todo el corpus concatenado N veces, como un carrusel grande) para ver
+cómo crece el tiempo con la longitud.
+
+Uso:
+    python benchmarks/bench_normalize.py
+    python benchmarks/bench_normalize.py --reference HEAD~1 --repeats 50
+    python benchmarks/bench_normalize.py --scales 1 4 16
+"""
+import os
+import re
+import sys
+import glob
+import time
+import types
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Añadir el directorio raíz al path
+sys.path.append(ROOT)
+
+from src.text_analysis import job_analyzer
+
+MODULE_PATH = 'src/text_analysis/job_analyzer.py'
+
+
+def load_reference(revision):
+    """Carga job_analyzer.py de una revisión de git como módulo independiente"""
+    source = subprocess.run(['git', 'show', f'{revision}:{MODULE_PATH}'], cwd=ROOT, check=True,
+                            capture_output=True).stdout.decode('utf-8-sig')
+    module = types.ModuleType(f'job_analyzer_{revision}')
+    # Los archivos de datos junto al módulo (job_indicators.json) se leen del árbol actual
+    module.__file__ = os.path.join(ROOT, MODULE_PATH)
+    exec(compile(source, f'{revision}:{MODULE_PATH}', 'exec'), module.__dict__)
+    return module
+
+
+def load_corpus(pattern):
+    """(texto OCR, descripción) de cada archivo de debug_texts"""
+    corpus = []
+    for path in sorted(glob.glob(pattern)):
+        with open(path, encoding='utf-8') as f:
+            raw = f.read()
+        description = re.search(r'DESCRIPTION: (.*)', raw)
+        text = raw.split('EXTRACTED TEXT:\n', 1)[-1]
+        corpus.append((text, description.group(1) if description else ''))
+    return corpus
+
+
+def time_calls(function, arguments, repeats):
+    """Microsegundos por llamada (mejor de `repeats` pasadas sobre todo el corpus)"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for args in arguments:
+            function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best / len(arguments) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark de normalize_text')
+    parser.add_argument('--texts', default=os.path.join(ROOT, 'debug_texts', '*.txt'),
+                        help='Patrón glob de textos de depuración')
+    parser.add_argument('--reference', help='Revisión de git a comparar (por defecto, la primera)')
+    parser.add_argument('--repeats', type=int, default=20, help='Pasadas sobre el corpus')
+    parser.add_argument('--scales', type=int, nargs='*', default=[],
+                        help='Repeticiones del corpus concatenado para medir textos largos')
+    args = parser.parse_args()
+    
+    corpus = load_corpus(args.texts)
+    if not corpus:
+        parser.error(f"No hay textos que coincidan con {args.texts}")
+    
+    revision = args.reference or subprocess.run(
+        ['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=ROOT, check=True,
+        capture_output=True, text=True).stdout.split()[0]
+    reference = load_reference(revision)
+    
+    texts = [(text,) for pair in corpus for text in pair if text]
+    cases = {
+        'normalize_text': ('normalize_text', texts),
+        'extract_job_data': ('extract_job_data', corpus),
+    }
+    
+    print(f"{len(corpus)} documentos, referencia {revision[:12]}")
+    print(f"{'función':>18} {'referencia µs':>14} {'actual µs':>10} {'mejora':>7} {'salida':>9}")
+    for name, (function_name, arguments) in cases.items():
+        old_function = getattr(reference, function_name)
+        new_function = getattr(job_analyzer, function_name)
+        identical = all(old_function(*a) == new_function(*a) for a in arguments)
+        old_us = time_calls(old_function, arguments, args.repeats)
+        new_us = time_calls(new_function, arguments, args.repeats)
+        print(f"{name:>18} {old_us:>14.1f} {new_us:>10.1f} {old_us / new_us:>6.1f}x "
+              f"{'idéntica' if identical else 'DISTINTA':>9}")
+    
+    if args.scales:
+        corpus_text = '\n\n'.join(text for (text,) in texts)
+        print(f"\n{'caracteres':>18} {'referencia ms':>14} {'actual ms':>10} {'mejora':>7}")
+        for scale in args.scales:
+            long_text = [('\n\n'.join([corpus_text] * scale),)]
+            old_ms = time_calls(reference.normalize_text, long_text, 1) / 1000
+            new_ms = time_calls(job_analyzer.normalize_text, long_text, 1) / 1000
+            print(f"{len(long_text[0][0]):>18} {old_ms:>14.1f} {new_ms:>10.1f} {old_ms / new_ms:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
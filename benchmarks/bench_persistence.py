@@ -0,0 +1,131 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Benchmark de persistencia de posts analizados en SQLite.
+
+Compara el guardado anterior de analyze_and_save_post (un SELECT de duplicado
+y hasta cuatro commits por post) con PostBatchWriter (URLs precargadas y un
+commit por lote de procesamiento). Cada modo escribe los mismos posts
+sintéticos en una base de datos temporal nueva.
+
+Uso:
+    python benchmarks/bench_persistence.py --posts 500 --batch 10
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import datetime
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.models import init_db, JobPost, JobData, CarouselImage, AnalysisMetrics
+from src.database.persistence import PostBatchWriter
+
+
+def synthetic_post(i):
+    """Registros equivalentes a los que arma analyze_and_save_post para un post"""
+    now = datetime.datetime(2025, 8, 1, 12, 0, 0)
+    job_post = JobPost(
+        post_url=f"https://www.instagram.com/p/BENCH{i:06d}/",
+        image_url=f"https://scontent.cdninstagram.com/bench_{i}.jpg",
+        description="Práctica profesional en Empresa S. A.",
+        post_date=now,
+        scraped_at=now,
+        local_image_path=f"debug_images/post_{i}.png",
+        is_carousel=i % 4 == 0,
+        classification_score=7,
+        is_job_offer=True
+    )
+    carousel = [
+        CarouselImage(image_url=f"https://scontent.cdninstagram.com/bench_{i}_{idx}.jpg",
+                      image_order=idx, extracted_text="Requisitos: estudiante de ingeniería")
+        for idx in range(2 if job_post.is_carousel else 0)
+    ]
+    job_data = JobData(
+        company_name="Empresa S. A.",
+        job_type="Práctica profesional",
+        position_title="Asistente de calidad",
+        contact_email="rrhh@empresa.com",
+        requirements=["Estudiante de ingeniería industrial", "Disponibilidad inmediata"],
+        knowledge_required=["Excel", "SAP"],
+        functions=["Apoyar auditorías internas"],
+        benefits=["Subsidio mensual"],
+        is_active=True
+    )
+    metrics = AnalysisMetrics(ocr_confidence=88, text_length=640, classification_confidence=57,
+                              has_contact_info=True, has_requirements=True, has_benefits=True)
+    return job_post, carousel, job_data, metrics
+
+
+def persist_per_post(db_session, posts):
+    """Flujo anterior: SELECT de duplicado y un commit por cada tabla"""
+    for i in range(posts):
+        job_post, carousel, job_data, metrics = synthetic_post(i)
+        if db_session.query(JobPost).filter_by(post_url=job_post.post_url).first():
+            continue
+        db_session.add(job_post)
+        db_session.commit()
+        if carousel:
+            for image in carousel:
+                image.post_id = job_post.id
+                db_session.add(image)
+            db_session.commit()
+        job_data.post_id = job_post.id
+        db_session.add(job_data)
+        db_session.commit()
+        metrics.post_id = job_post.id
+        db_session.add(metrics)
+        db_session.commit()
+
+
+def persist_batched(db_session, posts, batch):
+    """Flujo nuevo: URLs precargadas y un commit por lote"""
+    writer = PostBatchWriter(db_session)
+    for i in range(posts):
+        job_post, carousel, job_data, metrics = synthetic_post(i)
+        if writer.get_existing(job_post.post_url):
+            continue
+        job_post.carousel_images.extend(carousel)
+        job_post.extracted_data.append(job_data)
+        writer.add(job_post, metrics)
+        if len(writer) >= batch:
+            writer.flush()
+    writer.flush()
+
+
+def run(mode, posts, batch):
+    with tempfile.TemporaryDirectory() as workdir:
+        db_session = init_db(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        try:
+            start = time.perf_counter()
+            if mode == 'per-post':
+                persist_per_post(db_session, posts)
+            else:
+                persist_batched(db_session, posts, batch)
+            elapsed = time.perf_counter() - start
+            stored = db_session.query(JobPost).count()
+        finally:
+            db_session.close()
+            db_session.get_bind().dispose()
+    return stored, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de persistencia de posts')
+    parser.add_argument('--posts', type=int, default=500, help='Posts sintéticos a guardar')
+    parser.add_argument('--batch', type=int, default=10, help='Posts por transacción en el modo por lotes')
+    args = parser.parse_args()
+    
+    logging.disable(logging.CRITICAL)
+    
+    print(f"{'modo':>9} {'posts':>7} {'segundos':>9} {'posts/s':>9}")
+    for mode in ('per-post', 'batched'):
+        stored, elapsed = run(mode, args.posts, args.batch)
+        print(f"{mode:>9} {stored:>7} {elapsed:>9.2f} {stored / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Benchmark de las variantes de preprocesamiento del OCR.
+
+Compara los perfiles de escalado (classic vs adaptive) y los motores de
+filtrado (PIL con umbral fijo vs NumPy con Otsu/Sauvola). Cada variante corre
+en un subproceso propio sobre las imágenes de debug_images/ para medir tiempo
+total y memoria pico (RSS) sin que una variante contamine a otra. Con OCR
+activo además compara el texto de cada imagen contra la primera variante
+(similitud de difflib), para comprobar que no se pierde texto.
+
+Uso:
+    python benchmarks/bench_preprocess_profiles.py
+    python benchmarks/bench_preprocess_profiles.py --no-ocr   # solo preprocesamiento
+    python benchmarks/bench_preprocess_profiles.py --variants classic numpy-otsu numpy-sauvola
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import difflib
+import logging
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Añadir el directorio raíz al path
+sys.path.append(ROOT)
+
+# Nombre de la variante -> argumentos de EnhancedImageProcessor
+VARIANTS = {
+    'classic': {},
+    'adaptive': {'preprocess_profile': 'adaptive'},
+    'numpy-otsu': {'preprocess_engine': 'numpy', 'threshold_method': 'otsu'},
+    'numpy-sauvola': {'preprocess_engine': 'numpy', 'threshold_method': 'sauvola'},
+}
+
+
+def peak_rss_mb():
+    """Memoria residente pico del proceso actual en MB, o None si no se puede medir"""
+    try:
+        import resource
+    except ImportError:
+        # Windows: el módulo resource no existe
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_variant(variant, images, run_ocr, ocr_workers):
+    """Ejecuta una variante en el proceso actual e imprime el resultado como JSON"""
+    from src.image_processing.ocr import EnhancedImageProcessor
+    
+    logging.disable(logging.CRITICAL)
+    processor = EnhancedImageProcessor(ocr_workers=ocr_workers, **VARIANTS[variant])
+    texts = {}
+    sizes = {}
+    
+    # Las imágenes de depuración que escribe preprocess_image van a un directorio temporal
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        start = time.perf_counter()
+        for path in images:
+            image = processor.load_image_from_path(path)
+            if run_ocr:
+                texts[path] = processor.extract_text(image)
+            else:
+                processed = processor.preprocess_image(image)
+                sizes[path] = processed.size
+        elapsed = time.perf_counter() - start
+        os.chdir(ROOT)
+    processor.close()
+    
+    print(json.dumps({
+        'variant': variant,
+        'seconds': elapsed,
+        'peak_rss_mb': peak_rss_mb(),
+        'texts': texts,
+        'sizes': sizes,
+    }))
+
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de variantes de preprocesamiento del OCR')
+    parser.add_argument('--images', default=os.path.join(ROOT, 'debug_images', '*.png'),
+                        help='Patrón glob de imágenes a procesar')
+    parser.add_argument('--no-ocr', action='store_true', help='Medir solo el preprocesamiento, sin Tesseract')
+    parser.add_argument('--ocr-workers', type=int, default=1, help='Configuraciones de Tesseract en paralelo')
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS),
+                        help='Variantes a comparar; la primera es la referencia de similitud')
+    parser.add_argument('--child', choices=list(VARIANTS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    images = sorted(glob.glob(args.images))
+    if not images:
+        parser.error(f"No hay imágenes que coincidan con {args.images}")
+    
+    if args.child:
+        run_variant(args.child, images, not args.no_ocr, args.ocr_workers)
+        return
+    
+    results = {}
+    for variant in args.variants:
+        command = [sys.executable, os.path.abspath(__file__), '--child', variant,
+                   '--images', args.images, '--ocr-workers', str(args.ocr_workers)]
+        if args.no_ocr:
+            command.append('--no-ocr')
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results[variant] = json.loads(output.strip().splitlines()[-1])
+    
+    print(f"{len(images)} imágenes, {'solo preprocesamiento' if args.no_ocr else 'preprocesamiento + OCR'}")
+    print(f"{'variante':>14} {'segundos':>9} {'s/imagen':>9} {'RSS pico MB':>12} {'similitud':>10}")
+    reference = args.variants[0]
+    baseline = results[reference]
+    for variant in args.variants:
+        result = results[variant]
+        rss = result['peak_rss_mb']
+        rss_text = f"{rss:>12.1f}" if rss is not None else f"{'n/d':>12}"
+        if args.no_ocr:
+            sim_text = f"{'-':>10}"
+        else:
+            ratios = [similarity(baseline['texts'][path], result['texts'][path]) for path in images]
+            sim_text = f"{sum(ratios) / len(ratios):>10.3f}"
+        print(f"{variant:>14} {result['seconds']:>9.2f} {result['seconds'] / len(images):>9.3f} {rss_text} {sim_text}")
+    
+    if args.no_ocr:
+        print("\nTamaño de la imagen que recibe Tesseract:")
+        for path in images:
+            sizes = '  '.join(f"{variant}={results[variant]['sizes'][path][0]}x{results[variant]['sizes'][path][1]}"
+                              for variant in args.variants)
+            print(f"  {os.path.basename(path)}: {sizes}")
+    else:
+        print(f"\nSimilitud por imagen contra {reference}:")
+        for path in images:
+            ratios = '  '.join(f"{variant}={similarity(baseline['texts'][path], results[variant]['texts'][path]):.3f}"
+                               for variant in args.variants[1:])
+            print(f"  {os.path.basename(path)}: {ratios}")
+
+
+if __name__ == "__main__":
+    main()
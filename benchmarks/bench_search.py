@@ -0,0 +1,146 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Benchmark de la búsqueda del dashboard: LIKE '%término%' contra el índice FTS5.
+
+Genera la base sintética de bench_db_indexes.py con títulos de puesto
+variados, mide la búsqueda con LIKE (como hacía src/web/app.py) y luego abre
+la base con init_db(), que crea y llena el índice offer_search, y repite la
+medición con MATCH ordenado por bm25. Se miden la primera página (24 ofertas)
+y el conteo total, para un término poco frecuente y uno muy frecuente.
+
+Uso:
+    python benchmarks/bench_search.py --posts 1000000
+    python benchmarks/bench_search.py --posts 200000 --terms cloud practica
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import logging
+import tempfile
+import statistics
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, desc, or_
+from sqlalchemy.orm import sessionmaker
+from src.database.models import init_db, JobPost, JobData
+from src.database.search import build_match_expression, search_subquery
+from benchmarks.bench_db_indexes import build_database
+
+TITLES = [
+    "Asistente administrativo", "Desarrollador de software", "Analista de datos",
+    "Ingeniero industrial", "Diseñador gráfico", "Auxiliar contable", "Ejecutivo de ventas",
+    "Técnico de soporte", "Ingeniero de datos en la nube (cloud)", "Coordinador de logística",
+]
+# Pesos: el último título es deliberadamente raro
+TITLE_WEIGHTS = [20, 15, 12, 12, 10, 10, 10, 8, 1, 2]
+PAGE_SIZE = 24
+
+
+def diversify_titles(path, seed=7):
+    """Reemplaza el título fijo de build_database por uno de TITLES"""
+    rng = random.Random(seed)
+    connection = sqlite3.connect(path)
+    ids = [row[0] for row in connection.execute("SELECT id FROM job_data WHERE position_title IS NOT NULL")]
+    connection.executemany(
+        "UPDATE job_data SET position_title = ? WHERE id = ?",
+        ((rng.choices(TITLES, TITLE_WEIGHTS)[0], data_id) for data_id in ids))
+    connection.commit()
+    connection.close()
+
+
+def like_queries(session, term):
+    """Búsqueda anterior: LIKE sobre tres columnas, ordenada por fecha"""
+    query = session.query(JobPost, JobData).join(JobData).filter(
+        JobPost.is_job_offer == True,
+        or_(JobData.company_name.contains(term), JobData.position_title.contains(term),
+            JobData.job_type.contains(term)))
+    return {
+        'página': lambda: query.order_by(desc(JobPost.post_date)).limit(PAGE_SIZE).all(),
+        'conteo': lambda: query.order_by(None).count(),
+    }
+
+
+def fts_queries(session, term):
+    """Búsqueda nueva: MATCH en offer_search, ordenada por bm25"""
+    results = search_subquery(build_match_expression(term))
+    query = session.query(JobPost, JobData).join(JobData).join(
+        results, results.c.job_data_id == JobData.id).filter(JobPost.is_job_offer == True)
+    return {
+        'página': lambda: query.order_by(results.c.rank, desc(JobData.id)).limit(PAGE_SIZE).all(),
+        'conteo': lambda: query.order_by(None).count(),
+    }
+
+
+def measure(queries, repeats):
+    """Mediana en milisegundos de cada consulta y resultado de la última ejecución"""
+    timings = {}
+    results = {}
+    for name, query in queries.items():
+        query()
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            results[name] = query()
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[name] = statistics.median(samples)
+    return timings, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de búsqueda LIKE contra FTS5')
+    parser.add_argument('--posts', type=int, default=1_000_000, help='Posts sintéticos')
+    parser.add_argument('--repeats', type=int, default=5, help='Repeticiones por consulta')
+    parser.add_argument('--terms', nargs='+', default=['cloud', 'practica', 'Práctica'],
+                        help='Términos a buscar')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, 'bench.db')
+    
+    try:
+        start = time.perf_counter()
+        build_database(path, args.posts)
+        diversify_titles(path)
+        print(f"Base sintética de {args.posts} posts creada en {time.perf_counter() - start:.1f}s")
+        
+        # Antes: LIKE, sin índice de texto
+        engine = create_engine(f"sqlite:///{path}")
+        session = sessionmaker(bind=engine)()
+        before = {term: measure(like_queries(session, term), args.repeats) for term in args.terms}
+        session.close()
+        engine.dispose()
+        
+        # Después: init_db crea los índices y llena offer_search
+        start = time.perf_counter()
+        session = init_db(f"sqlite:///{path}")
+        print(f"Migración (índices + índice de búsqueda) en {time.perf_counter() - start:.1f}s")
+        after = {term: measure(fts_queries(session, term), args.repeats) for term in args.terms}
+        session.close()
+        session.get_bind().dispose()
+        
+        print(f"\n{'término':>10} {'consulta':>8} {'LIKE ms':>9} {'FTS ms':>9} {'mejora':>7} "
+              f"{'filas LIKE':>11} {'filas FTS':>10}")
+        for term in args.terms:
+            like_timings, like_results = before[term]
+            fts_timings, fts_results = after[term]
+            for name in like_timings:
+                speedup = like_timings[name] / fts_timings[name] if fts_timings[name] else float('inf')
+                like_rows = like_results[name] if name == 'conteo' else len(like_results[name])
+                fts_rows = fts_results[name] if name == 'conteo' else len(fts_results[name])
+                print(f"{term:>10} {name:>8} {like_timings[name]:>9.1f} {fts_timings[name]:>9.1f} "
+                      f"{speedup:>6.1f}x {like_rows:>11} {fts_rows:>10}")
+    finally:
+        for suffix in ('', '-wal', '-shm', '.version'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Benchmark del pool de workers contra un servidor local de posts falsos.
+
+Genera páginas estáticas que imitan un post de Instagram (article, imagen con
+'fbcdn.net' en la URL, descripción y <time>), las sirve en 127.0.0.1 y mide
+cuántos posts por minuto extrae PostWorkerPool con distinta cantidad de
+workers bajo el mismo presupuesto de peticiones.
+
+Requiere ChromeDriver igual que src/main.py.
+
+Uso:
+    python benchmarks/bench_worker_pool.py --posts 40 --workers 1 2 4 --rpm 600
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scraper.worker_pool import PostWorkerPool
+
+POST_TEMPLATE = """<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="UTF-8"><title>Post {code}</title></head>
+<body>
+    <article>
+        <img src="{base}fbcdn.net/{code}.png" alt="Oferta {code}" style="object-fit: cover">
+        <div data-testid="post-caption"><span>Práctica profesional ofrecida por Empresa {code}, S. A.</span></div>
+        <time datetime="2025-08-01T12:00:00.000Z">1 de agosto</time>
+    </article>
+</body>
+</html>
+"""
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    delay = 0.0
+
+    def do_GET(self):
+        # Simular la latencia de red de Instagram
+        if self.delay:
+            time.sleep(self.delay)
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def build_site(root, count):
+    """Escribe `count` posts falsos en root/p/<código>/index.html"""
+    codes = [f"FAKE{i:05d}" for i in range(count)]
+    for code in codes:
+        post_dir = os.path.join(root, 'p', code)
+        os.makedirs(post_dir, exist_ok=True)
+        with open(os.path.join(post_dir, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(POST_TEMPLATE.format(code=code, base='/'))
+    return codes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del pool de workers de scraping')
+    parser.add_argument('--posts', type=int, default=40, help='Posts falsos a visitar por corrida')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Tamaños de pool a probar')
+    parser.add_argument('--rpm', type=int, default=600, help='Presupuesto global de peticiones por minuto')
+    parser.add_argument('--latency', type=float, default=0.5, help='Latencia simulada por página en segundos')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as root:
+        codes = build_site(root, args.posts)
+        QuietHandler.delay = args.latency
+        handler = functools.partial(QuietHandler, directory=root)
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}/"
+        urls = [f"{base_url}p/{code}/" for code in codes]
+        
+        try:
+            print(f"{'workers':>7} {'extraídos':>10} {'segundos':>9} {'posts/min':>10}")
+            for workers in args.workers:
+                pool = PostWorkerPool("bench", "bench", "bench", workers=workers,
+                                      requests_per_minute=args.rpm, share_cookies=False)
+                try:
+                    pool.start()
+                    start = time.perf_counter()
+                    posts = pool.scrape(urls)
+                    elapsed = time.perf_counter() - start
+                finally:
+                    pool.close()
+                print(f"{workers:>7} {len(posts):>10} {elapsed:>9.2f} {len(posts) / elapsed * 60:>10.1f}")
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
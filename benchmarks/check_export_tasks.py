@@ -0,0 +1,76 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Prueba de recuperación de exportaciones interrumpidas (TaskRunner).
+
+Sobre una base SQLite temporal deja tareas sin terminar como las que quedan
+tras un reinicio y arranca un TaskRunner:
+
+    pid propio sin hora de inicio   host:<pid actual> (formato anterior): fallida
+    pid reutilizado                 host:1:<otra hora de inicio>: fallida
+    proceso vivo                    host:1:<hora de inicio real>: sigue en curso
+
+y comprueba que submit() encola una exportación nueva en lugar de devolver la
+tarea huérfana. Termina con código 1 si algo no se cumple.
+
+Uso:
+    python benchmarks/check_export_tasks.py
+"""
+import os
+import sys
+import socket
+import logging
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Añadir el directorio raíz al path
+sys.path.append(ROOT)
+
+from sqlalchemy.orm import sessionmaker
+from src.database.models import get_engine, ExportTask
+from src.web.tasks import TaskRunner, process_identity, RUNNING, FAILED
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING)
+    host = socket.gethostname()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = get_engine(f"sqlite:///{os.path.join(tmp, 'tasks.db')}")
+        Session = sessionmaker(bind=engine)
+        
+        expected = {
+            'stale-own-pid': (f"{host}:{os.getpid()}", 'excel', FAILED),
+            'reused-pid': (f"{host}:1:-1", 'excel', FAILED),
+        }
+        if process_identity(1).count(':') == 2:
+            # Solo donde se puede leer la hora de inicio (Linux)
+            expected['live-process'] = (process_identity(1), 'contacts', RUNNING)
+        
+        with Session() as session:
+            for task_id, (worker, kind, _) in expected.items():
+                session.add(ExportTask(id=task_id, kind=kind, status=RUNNING, worker=worker))
+            session.commit()
+        
+        runner = TaskRunner(engine, export_dir=os.path.join(tmp, 'exports'))
+        failures = 0
+        try:
+            for task_id, (worker, _, status) in expected.items():
+                actual = runner.get(task_id)['status']
+                ok = actual == status
+                failures += not ok
+                print(f"{'OK ' if ok else 'MAL'} {task_id:<14} {worker:<32} {actual} (esperado {status})")
+            
+            submitted = runner.submit('excel')
+            ok = submitted['id'] not in expected
+            failures += not ok
+            print(f"{'OK ' if ok else 'MAL'} submit('excel') -> {submitted['id']}")
+        finally:
+            runner.shutdown()
+            engine.dispose()
+    
+    print("\nRECUPERACIÓN OK" if not failures else f"\nRECUPERACIÓN FALLIDA: {failures} comprobaciones")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
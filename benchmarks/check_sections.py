@@ -0,0 +1,165 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Prueba de regresión del segmentador de secciones (find_sections). Termina con
+código 1 ante cualquier diferencia.
+
+benchmarks/fixtures/sections/expected_sections.json guarda, por cada JSON de
+debug_analysis/, el texto normalizado que recibía el segmentador cuando se
+generó ese JSON, los tramos de cada sección y la salida de
+extract_requirements_and_knowledge que producía el segmentador de expresiones
+regulares anterior a find_sections. Por cada post se comprueba que:
+
+1. find_sections devuelve los mismos tramos y extract_requirements_and_knowledge
+   la misma salida que el fixture.
+2. Si el post es una oferta, requisitos, conocimientos, funciones y beneficios
+   coinciden con el extracted_info guardado en debug_analysis/.
+
+El texto del fixture ya está normalizado, así que los cambios de
+normalize_text no afectan esta prueba. Si la segmentación cambia a propósito,
+--update reescribe los tramos y salidas esperados con los actuales.
+
+Costo (--scales): tiempo del segmentador sobre los textos del fixture
+concatenados N veces, tal cual y sin palabras clave de sección (el peor caso
+para el segmentador anterior). El costo por carácter debe mantenerse estable.
+
+Uso:
+    python benchmarks/check_sections.py
+    python benchmarks/check_sections.py --scales 1 4 16 64
+"""
+import os
+import re
+import sys
+import json
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Añadir el directorio raíz al path
+sys.path.append(ROOT)
+
+from src.text_analysis import job_analyzer
+from benchmarks.bench_normalize import time_calls
+
+# Sección de extract_requirements_and_knowledge -> campo de extract_job_data
+SECTION_FIELDS = {
+    'requirements': 'requirements',
+    'knowledge': 'knowledge_required',
+    'functions': 'functions',
+    'benefits': 'benefits',
+}
+EXPECTED_PATH = os.path.join(ROOT, 'benchmarks', 'fixtures', 'sections', 'expected_sections.json')
+
+
+def load_expected(path):
+    """{archivo de debug_analysis: {'text', 'sections', 'extracted'}}"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def extract_sections(text):
+    """Salida de extract_requirements_and_knowledge para un texto ya normalizado"""
+    return job_analyzer.extract_requirements_and_knowledge(job_analyzer.NormalizedDocument(text, normalized=True))
+
+
+def report(name, what, expected, actual):
+    print(f"DISTINTO {name} {what}")
+    print(f"  esperado: {expected}")
+    print(f"  actual:   {actual}")
+
+
+def check_expected(expected):
+    """Compara tramos y salidas con el fixture; devuelve el número de diferencias"""
+    differences = 0
+    for name, case in expected.items():
+        sections = job_analyzer.find_sections(case['text'])
+        extracted = extract_sections(case['text'])
+        for section_name in SECTION_FIELDS:
+            if sections[section_name] != case['sections'][section_name]:
+                differences += 1
+                report(name, f"tramos de {section_name}", case['sections'][section_name], sections[section_name])
+            if extracted[section_name] != case['extracted'][section_name]:
+                differences += 1
+                report(name, section_name, case['extracted'][section_name], extracted[section_name])
+    
+    print(f"{len(expected)} posts comparados con {os.path.relpath(EXPECTED_PATH, ROOT)}: "
+          f"{'sin diferencias' if not differences else f'{differences} diferencias'}")
+    return differences
+
+
+def check_stored(expected, analysis_dir):
+    """Compara las secciones de las ofertas con el extracted_info de debug_analysis/"""
+    differences = checked = 0
+    for name, case in expected.items():
+        path = os.path.join(analysis_dir, name)
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding='utf-8') as f:
+            analysis = json.load(f)
+        if not analysis['classification']['is_job']:
+            # main.py no extrae secciones de los posts que no son ofertas
+            continue
+        
+        checked += 1
+        extracted = extract_sections(case['text'])
+        for section_name, field in SECTION_FIELDS.items():
+            if extracted[section_name] != analysis['extracted_info'].get(field):
+                differences += 1
+                report(name, field, analysis['extracted_info'].get(field), extracted[section_name])
+    
+    if not checked:
+        print(f"Ninguna oferta de {analysis_dir} en el fixture: no hay secciones guardadas con qué comparar")
+        return 1
+    print(f"{checked} ofertas comparadas con su extracted_info: "
+          f"{'sin diferencias' if not differences else f'{differences} secciones distintas'}")
+    return differences
+
+
+def update_expected(expected):
+    """Reescribe tramos y salidas esperados con los del segmentador actual"""
+    for case in expected.values():
+        case['sections'] = job_analyzer.find_sections(case['text'])
+        case['extracted'] = extract_sections(case['text'])
+    with open(EXPECTED_PATH, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(expected, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    print(f"{len(expected)} posts actualizados en {os.path.relpath(EXPECTED_PATH, ROOT)}")
+
+
+def time_scales(expected, scales, repeats):
+    """Tiempo por llamada del segmentador según el largo del texto"""
+    corpus_text = ' '.join(case['text'] for case in expected.values())
+    keywords = re.compile('|'.join(job_analyzer.SECTION_KEYWORDS), re.IGNORECASE)
+    without_keywords = keywords.sub('x', corpus_text)
+    
+    print(f"\n{'texto':<16} {'caracteres':>10} {'ms':>8} {'µs/1000 car.':>13}")
+    for label, base_text in [('posts', corpus_text), ('sin encabezados', without_keywords)]:
+        for scale in scales:
+            document = job_analyzer.NormalizedDocument(' '.join([base_text] * scale), normalized=True)
+            ms = time_calls(job_analyzer.extract_requirements_and_knowledge, [(document,)], repeats) / 1000
+            print(f"{label:<16} {len(document.text):>10} {ms:>8.2f} {ms * 1e6 / len(document.text):>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de regresión del segmentador de secciones')
+    parser.add_argument('--analysis-dir', default=os.path.join(ROOT, 'debug_analysis'),
+                        help='Directorio con los JSON de análisis')
+    parser.add_argument('--update', action='store_true', help='Reescribir el fixture con la salida actual')
+    parser.add_argument('--scales', type=int, nargs='*', default=[], help='Repeticiones del texto para medir el costo')
+    parser.add_argument('--repeats', type=int, default=5, help='Pasadas por medición')
+    args = parser.parse_args()
+    
+    expected = load_expected(EXPECTED_PATH)
+    if args.update:
+        update_expected(expected)
+        return
+    
+    differences = check_expected(expected)
+    differences += check_stored(expected, args.analysis_dir)
+    if args.scales:
+        time_scales(expected, args.scales, args.repeats)
+    
+    print("\nREGRESIÓN OK" if not differences else f"\nREGRESIÓN FALLIDA: {differences} diferencias")
+    sys.exit(1 if differences else 0)
+
+
+if __name__ == "__main__":
+    main()
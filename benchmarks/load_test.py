@@ -0,0 +1,122 @@
+﻿# -*- coding: utf-8 -*-
+"""
+Prueba de carga del dashboard: pide `/` y `/api/stats` desde varios hilos.
+
+Sin --url arranca la aplicación en este proceso, con el servidor multihilo de
+Werkzeug y una base sintética (bench_db_indexes.build_database) en un
+directorio temporal. Con --url mide un servidor ya en marcha, por ejemplo:
+
+    waitress-serve --threads 16 --port 5000 src.web.app:app
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --concurrency 1 4 16 32
+
+Uso:
+    python benchmarks/load_test.py --posts 100000 --concurrency 1 2 4 8 16
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import logging
+import tempfile
+import threading
+import statistics
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Añadir el directorio raíz al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_PATHS = ['/', '/api/stats']
+
+
+def start_local_server(posts, port):
+    """Crea la base sintética, importa la aplicación y la sirve en un hilo"""
+    from werkzeug.serving import make_server
+    from benchmarks.bench_db_indexes import build_database
+    
+    workdir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(workdir, 'data'))
+    build_database(os.path.join(workdir, 'data', 'database.db'), posts)
+    # La aplicación abre data/database.db relativo al directorio actual
+    os.chdir(workdir)
+    from src.web.app import app
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", workdir
+
+
+def run_level(base_url, paths, concurrency, duration):
+    """Cada hilo pide las rutas en orden durante `duration` segundos"""
+    deadline = time.perf_counter() + duration
+    
+    def worker(offset):
+        latencies, errors, i = [], 0, offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(base_url + path, timeout=30) as response:
+                    response.read()
+                    if response.status != 200:
+                        errors += 1
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies, errors
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+    
+    latencies = sorted(latency for thread_latencies, _ in results for latency in thread_latencies)
+    errors = sum(thread_errors for _, thread_errors in results)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50': statistics.median(latencies) if latencies else 0.0,
+        'p95': latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prueba de carga concurrente del dashboard')
+    parser.add_argument('--url', help='Servidor a medir (por defecto, uno local con base sintética)')
+    parser.add_argument('--posts', type=int, default=100_000, help='Posts de la base sintética local')
+    parser.add_argument('--port', type=int, default=0, help='Puerto del servidor local (0 = libre)')
+    parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS, help='Rutas a pedir')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help='Hilos cliente simultáneos en cada nivel')
+    parser.add_argument('--duration', type=float, default=10.0, help='Segundos por nivel')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING, format='%(message)s')
+    server = workdir = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url, workdir = start_local_server(args.posts, args.port)
+        print(f"Servidor local en {base_url} con {args.posts} posts sintéticos")
+    
+    # Calentamiento: cachés de estadísticas y facetas
+    run_level(base_url, args.paths, 1, 1.0)
+    
+    print(f"{'hilos':>6} {'peticiones':>11} {'errores':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for concurrency in args.concurrency:
+        result = run_level(base_url, args.paths, concurrency, args.duration)
+        print(f"{concurrency:>6} {result['requests']:>11} {result['errors']:>8} {result['rps']:>8.1f} "
+              f"{result['p50']:>8.1f} {result['p95']:>8.1f}")
+    
+    if server is not None:
+        server.shutdown()
+        os.chdir(tempfile.gettempdir())
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
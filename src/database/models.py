@@ -1,11 +1,43 @@
 ﻿# -*- coding: utf-8 -*-
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy import create_engine, event, inspect, make_url, Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
+import os
+import pathlib
 import datetime
+import logging
+
+from src.database.search import ensure_search_index, share_search_index
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# PRAGMAs aplicados a cada conexión SQLite. WAL permite que el dashboard lea
+# mientras el scraper escribe y, con synchronous=NORMAL, solo sincroniza a disco
+# en los checkpoints. cache_size negativo = KiB (64 MB).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+}
+
+# Conexiones de solo lectura (vistas del dashboard): sin journal_mode ni
+# synchronous, que requieren escribir, y con query_only como segunda barrera
+SQLITE_READ_ONLY_PRAGMAS = {
+    'cache_size': -64000,
+    'temp_store': 'MEMORY',
+    'query_only': 'ON',
+}
+
+# Pool de conexiones de cada engine: en WAL, SQLite admite muchos lectores a la vez
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+POOL_TIMEOUT = 10  # segundos esperando una conexión libre
+
+_engines = {}
+
 class JobPost(Base):
     __tablename__ = 'job_posts'
     
@@ -17,6 +49,7 @@ class JobPost(Base):
     scraped_at = Column(DateTime, default=datetime.datetime.utcnow)
     local_image_path = Column(String(255), nullable=True)
     is_carousel = Column(Boolean, default=False)
+    ocr_text = Column(Text, nullable=True)  # Texto OCR de la imagen principal (para reclasificar)
     
     # Campos adicionales para análisis
     classification_score = Column(Integer, nullable=True)  # Puntuación de clasificación
@@ -26,6 +59,12 @@ class JobPost(Base):
     extracted_data = relationship("JobData", back_populates="post", cascade="all, delete-orphan")
     carousel_images = relationship("CarouselImage", back_populates="post", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Listado y dashboard: ofertas ordenadas o filtradas por fecha
+        Index('ix_job_posts_offer_date', 'is_job_offer', 'post_date'),
+        Index('ix_job_posts_post_date', 'post_date'),
+    )
+    
     def __repr__(self):
         return f"<JobPost(id={self.id}, post_date={self.post_date}, is_job={self.is_job_offer})>"
 
@@ -73,6 +112,16 @@ class JobData(Base):
     image_id = Column(Integer, ForeignKey('carousel_images.id'), nullable=True)
     image = relationship("CarouselImage", back_populates="extracted_data")
     
+    __table_args__ = (
+        Index('ix_job_data_post_id', 'post_id'),
+        # Conteos de activas/finalizadas (y con contacto) unidos a job_posts, sin leer la fila
+        Index('ix_job_data_active_post', 'is_active', 'post_id', 'contact_email'),
+        # Agrupaciones del dashboard y de los reportes (cubren el conteo de activas)
+        Index('ix_job_data_type_active', 'job_type', 'is_active'),
+        Index('ix_job_data_company_active', 'company_name', 'is_active'),
+        Index('ix_job_data_industry', 'company_industry'),
+    )
+    
     def __repr__(self):
         return f"<JobData(id={self.id}, company={self.company_name}, job_type={self.job_type}, active={self.is_active})>"
 
@@ -92,6 +141,10 @@ class CarouselImage(Base):
     post = relationship("JobPost", back_populates="carousel_images")
     extracted_data = relationship("JobData", back_populates="image", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        Index('ix_carousel_images_post_order', 'post_id', 'image_order'),
+    )
+    
     def __repr__(self):
         return f"<CarouselImage(id={self.id}, post_id={self.post_id}, order={self.image_order})>"
 
@@ -118,13 +171,123 @@ class AnalysisMetrics(Base):
     # Relación
     post_id = Column(Integer, ForeignKey('job_posts.id'))
     
+    __table_args__ = (
+        Index('ix_analysis_metrics_post_id', 'post_id'),
+    )
+    
     def __repr__(self):
         return f"<AnalysisMetrics(id={self.id}, post_id={self.post_id})>"
 
-def init_db(db_path='sqlite:///data/database.db'):
-    """Inicializa la base de datos y crea las tablas si no existen"""
-    engine = create_engine(db_path)
+# Tareas en segundo plano del dashboard (exportaciones)
+class ExportTask(Base):
+    __tablename__ = 'export_tasks'
+    
+    id = Column(String(32), primary_key=True)  # uuid4 en hexadecimal
+    kind = Column(String(20))  # excel, contacts
+    status = Column(String(20), default='pending')  # pending, running, done, failed
+    filename = Column(String(255), nullable=True)  # Archivo generado
+    error = Column(Text, nullable=True)
+    worker = Column(String(100), nullable=True)  # host:pid:inicio del proceso que la ejecuta
+    
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('ix_export_tasks_status', 'status'),
+    )
+    
+    def __repr__(self):
+        return f"<ExportTask(id={self.id}, kind='{self.kind}', status='{self.status}')>"
+
+def _sqlite_pragmas_listener(pragmas):
+    """Listener de 'connect' que aplica los PRAGMAs a cada conexión nueva"""
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return set_pragmas
+
+def _pool_options(url):
+    """Tamaño del pool para bases en archivo; las de memoria usan su propio pool"""
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return {}
+    return {'pool_size': POOL_SIZE, 'max_overflow': MAX_OVERFLOW, 'pool_timeout': POOL_TIMEOUT}
+
+def migrate_db(engine):
+    """
+    Crea las tablas, columnas e índices que falten.
+    
+    create_all() no agrega columnas ni índices a tablas que ya existen, así que
+    las bases creadas con versiones anteriores se actualizan uno por uno. Las
+    columnas nuevas deben ser nullable (ALTER TABLE ADD COLUMN sin valor).
+    """
     Base.metadata.create_all(engine, checkfirst=True)
+    
+    inspector = inspect(engine)
+    added = []
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                    added.append(f"{table.name}.{column.name}")
+    if added:
+        logger.info(f"Columnas agregadas a la base de datos: {', '.join(added)}")
+    
+    created = []
+    for table in Base.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
+                created.append(index.name)
+    
+    if created:
+        logger.info(f"Índices creados en la base de datos: {', '.join(created)}")
+        with engine.begin() as connection:
+            # Actualizar las estadísticas que usa el planificador de consultas
+            connection.exec_driver_sql("ANALYZE")
+
+def get_engine(db_path='sqlite:///data/database.db', read_only=False):
+    """
+    Engine compartido por URL: los PRAGMAs y la migración se aplican una sola vez.
+    
+    Con read_only=True devuelve un segundo engine que abre el mismo archivo
+    SQLite en modo solo lectura (mode=ro), para las vistas que solo consultan.
+    """
+    engine = _engines.get((db_path, read_only))
+    if engine is not None:
+        return engine
+    
+    url = make_url(db_path)
+    if not read_only:
+        engine = create_engine(url, **_pool_options(url))
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', _sqlite_pragmas_listener(SQLITE_PRAGMAS))
+        migrate_db(engine)
+        ensure_search_index(engine)
+    else:
+        # El engine de escritura crea primero las tablas: el de lectura no puede
+        writer = get_engine(db_path)
+        if writer.dialect.name != 'sqlite' or url.database in (None, '', ':memory:'):
+            engine = writer
+        else:
+            uri = pathlib.Path(os.path.abspath(url.database)).as_uri()
+            read_url = url.set(database=uri, query={'mode': 'ro', 'uri': 'true'})
+            engine = create_engine(read_url, **_pool_options(read_url))
+            event.listen(engine, 'connect', _sqlite_pragmas_listener(SQLITE_READ_ONLY_PRAGMAS))
+            share_search_index(writer, engine)
+    
+    _engines[(db_path, read_only)] = engine
+    return engine
+
+def init_db(db_path='sqlite:///data/database.db'):
+    """Inicializa la base de datos y crea las tablas e índices si no existen"""
+    engine = get_engine(db_path)
     Session = sessionmaker(bind=engine)
     db_session = Session()
     
@@ -137,20 +300,63 @@ def init_db(db_path='sqlite:///data/database.db'):
     
     return db_session
 
+def get_aggregate_counters(db_session, since=None):
+    """
+    Calcula todos los contadores del dashboard y de los reportes en una consulta.
+    
+    Son dos agregaciones con SUM(CASE ...) combinadas en un solo SELECT: una
+    recorre job_posts (índice de ofertas por fecha) y la otra job_data unida a
+    job_posts por clave primaria. Así cada tabla se lee una vez, sin el
+    COUNT(DISTINCT) que haría falta al agregar sobre un único JOIN.
+    
+    Args:
+        since: fecha desde la que se cuentan ofertas recientes ('recent_offers')
+    
+    Returns:
+        Dict con total_posts, job_offers, recent_offers, active_records,
+        active_offers, expired_offers y with_contact
+    """
+    from sqlalchemy import select, func, case, and_, literal, true
+    
+    def count_if(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+    
+    is_offer = JobPost.is_job_offer == True
+    recent = and_(is_offer, JobPost.post_date >= since) if since is not None else literal(False)
+    
+    posts = select(
+        func.count(JobPost.id).label('total_posts'),
+        count_if(is_offer).label('job_offers'),
+        count_if(recent).label('recent_offers'),
+    ).subquery()
+    
+    data = select(
+        count_if(JobData.is_active == True).label('active_records'),
+        count_if(and_(is_offer, JobData.is_active == True)).label('active_offers'),
+        count_if(and_(is_offer, JobData.is_active == False)).label('expired_offers'),
+        count_if(and_(is_offer, JobData.is_active == True, JobData.contact_email.isnot(None))).label('with_contact'),
+    ).select_from(JobData).outerjoin(JobPost, JobPost.id == JobData.post_id).subquery()
+    
+    # Cada subconsulta devuelve una sola fila: el JOIN incondicional las pone lado a lado
+    row = db_session.execute(select(posts, data).select_from(posts.join(data, true()))).one()
+    return {key: int(value) for key, value in row._mapping.items()}
+
 def get_job_statistics(db_session):
     """Obtiene estadísticas de las ofertas laborales - CORREGIDO"""
     from sqlalchemy import func
     
     stats = {}
     
+    counters = get_aggregate_counters(db_session)
+    
     # Total de posts
-    stats['total_posts'] = db_session.query(JobPost).count()
+    stats['total_posts'] = counters['total_posts']
     
     # Posts que son ofertas laborales
-    stats['job_offers'] = db_session.query(JobPost).filter(JobPost.is_job_offer == True).count()
+    stats['job_offers'] = counters['job_offers']
     
     # Ofertas activas
-    stats['active_offers'] = db_session.query(JobData).filter(JobData.is_active == True).count()
+    stats['active_offers'] = counters['active_records']
     
     # Por tipo de trabajo - CORREGIDO
     job_type_counts = db_session.query(
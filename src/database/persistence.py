@@ -0,0 +1,134 @@
+﻿# -*- coding: utf-8 -*-
+import time
+import logging
+from src.database.models import JobPost
+from src.database.stats_cache import bump_data_version
+from src.database.search import index_job_data
+
+logger = logging.getLogger(__name__)
+
+class PostBatchWriter:
+    """
+    Acumula los posts analizados y los persiste por lotes en una sola transacción.
+    
+    Las URLs ya guardadas se cargan una vez al crear el writer, así que detectar
+    duplicados no necesita un SELECT por post. Al hacer flush() se insertan
+    primero los posts (para obtener sus ids) y luego sus registros hijos, todo
+    con un único commit. Si el lote falla se reintenta post por post, cada uno
+    en su propia transacción, para que un post defectuoso no arrastre al resto.
+    """
+    
+    def __init__(self, db_session):
+        self.db_session = db_session
+        self._pending = []  # (JobPost, [registros sin relación con JobPost])
+        self._existing = {
+            url: (post_id, is_job, score)
+            for url, post_id, is_job, score in db_session.query(
+                JobPost.post_url, JobPost.id, JobPost.is_job_offer, JobPost.classification_score
+            )
+        }
+        
+        self.posts_persisted = 0
+        self.posts_failed = 0
+        self.batches = 0
+        self.seconds = 0.0
+        
+        logger.info(f"{len(self._existing)} posts existentes cargados para detectar duplicados")
+    
+    def get_existing(self, post_url):
+        """
+        Devuelve (id, es_oferta, puntuación) si el post ya está guardado o
+        pendiente de guardar (en ese caso el id es None), o None si es nuevo
+        """
+        return self._existing.get(post_url)
+    
+    def add(self, job_post, *dependents):
+        """
+        Encola un post para el próximo flush.
+        
+        Args:
+            job_post: JobPost con sus hijos ya asociados por relación (carrusel, JobData)
+            dependents: registros que solo referencian el post por post_id (p. ej. AnalysisMetrics)
+        """
+        self._pending.append((job_post, list(dependents)))
+        self._existing.setdefault(job_post.post_url, (None, job_post.is_job_offer, job_post.classification_score))
+    
+    def __len__(self):
+        return len(self._pending)
+    
+    def flush(self):
+        """
+        Persiste todos los posts pendientes.
+        
+        Returns:
+            Dict {post_url: id} de los posts guardados en este flush
+        """
+        if not self._pending:
+            return {}
+        
+        pending, self._pending = self._pending, []
+        start = time.perf_counter()
+        try:
+            self._insert(pending)
+            self.db_session.commit()
+            saved = pending
+        except Exception as e:
+            self.db_session.rollback()
+            logger.warning(f"Falló el guardado del lote de {len(pending)} posts ({e}); reintentando post por post")
+            saved = self._insert_one_by_one(pending)
+        
+        if saved:
+            # Avisar a los lectores (dashboard) que hay datos nuevos
+            bump_data_version(self.db_session.get_bind())
+        
+        self.seconds += time.perf_counter() - start
+        self.batches += 1
+        self.posts_persisted += len(saved)
+        
+        post_ids = {}
+        for job_post, _ in saved:
+            post_ids[job_post.post_url] = job_post.id
+            self._existing[job_post.post_url] = (job_post.id, job_post.is_job_offer, job_post.classification_score)
+        return post_ids
+    
+    def _insert(self, entries):
+        """Inserta posts e hijos en la transacción actual, sin hacer commit"""
+        # Los posts primero: el flush los inserta en bloque y asigna sus ids
+        self.db_session.add_all(job_post for job_post, _ in entries)
+        self.db_session.flush()
+        
+        for job_post, dependents in entries:
+            for record in dependents:
+                record.post_id = job_post.id
+            self.db_session.add_all(dependents)
+        self.db_session.flush()
+        
+        # Índice de búsqueda de texto completo, en la misma transacción
+        index_job_data(self.db_session, [
+            job_data.id for job_post, _ in entries for job_data in job_post.extracted_data
+        ])
+    
+    def _insert_one_by_one(self, entries):
+        """Guarda cada post en su propia transacción y descarta los que fallen"""
+        saved = []
+        for job_post, dependents in entries:
+            try:
+                self._insert([(job_post, dependents)])
+                self.db_session.commit()
+                saved.append((job_post, dependents))
+            except Exception as e:
+                self.db_session.rollback()
+                self.posts_failed += 1
+                if self._existing.get(job_post.post_url, (None,))[0] is None:
+                    self._existing.pop(job_post.post_url, None)
+                logger.error(f"ERROR guardando post {job_post.post_url}: {e}")
+        return saved
+    
+    def get_stats(self):
+        """Estadísticas de persistencia"""
+        return {
+            "posts_persisted": self.posts_persisted,
+            "posts_failed": self.posts_failed,
+            "batches": self.batches,
+            "posts_per_second": self.posts_persisted / self.seconds if self.seconds else 0.0,
+        }
@@ -0,0 +1,129 @@
+﻿# -*- coding: utf-8 -*-
+import re
+import logging
+from sqlalchemy import bindparam, func, literal_column, select, text
+from sqlalchemy.sql import table, column
+
+logger = logging.getLogger(__name__)
+
+# Índice de texto completo de las ofertas: una fila por JobData (rowid = job_data.id)
+SEARCH_TABLE = 'offer_search'
+
+# unicode61 con remove_diacritics 2: "práctica", "PRACTICA" y "practica" son el mismo token
+CREATE_SEARCH_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    company_name, position_title, job_type, details, description, ocr_text,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+# Mantener el índice al borrar ofertas (p. ej. clean_database)
+CREATE_DELETE_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_job_data_delete AFTER DELETE ON job_data BEGIN
+    DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id;
+END
+"""
+
+# Pesos de bm25 por columna, en el orden de CREATE_SEARCH_TABLE
+COLUMN_WEIGHTS = (10.0, 8.0, 4.0, 2.0, 1.0, 1.0)
+
+# Campos que se concatenan en la columna 'details'
+_DETAIL_EXPRESSIONS = [
+    "d.company_industry", "d.work_modality", "d.duration", "d.contact_name",
+    "d.experience_required", "d.education_required",
+] + [
+    f"(SELECT group_concat(value, ' ') FROM json_each(d.{field}))"
+    for field in ('requirements', 'knowledge_required', 'functions', 'benefits')
+]
+
+# Contenido indexado de cada oferta: campos extraídos, listas JSON (requisitos,
+# conocimientos, funciones, beneficios), descripción del post y OCR del carrusel
+_INDEX_SELECT = f"""
+INSERT INTO {SEARCH_TABLE} (rowid, company_name, position_title, job_type, details, description, ocr_text)
+SELECT
+    d.id,
+    d.company_name,
+    d.position_title,
+    d.job_type,
+    {" || ' ' || ".join(f"coalesce({expression}, '')" for expression in _DETAIL_EXPRESSIONS)},
+    p.description,
+    (SELECT group_concat(c.extracted_text, ' ') FROM carousel_images c WHERE c.post_id = d.post_id)
+FROM job_data d
+LEFT JOIN job_posts p ON p.id = d.post_id
+"""
+
+_search_enabled = {}
+
+def ensure_search_index(engine):
+    """
+    Crea el índice FTS5 si no existe y, en ese caso, lo llena con los datos actuales.
+    
+    Returns:
+        True si la búsqueda de texto completo está disponible en esta base
+    """
+    if engine.dialect.name != 'sqlite':
+        _search_enabled[engine.url] = False
+        return False
+    
+    try:
+        with engine.begin() as connection:
+            exists = connection.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+            ).first() is not None
+            connection.exec_driver_sql(CREATE_SEARCH_TABLE)
+            connection.exec_driver_sql(CREATE_DELETE_TRIGGER)
+            if not exists:
+                connection.exec_driver_sql(_INDEX_SELECT)
+                indexed = connection.exec_driver_sql(f"SELECT count(*) FROM {SEARCH_TABLE}").scalar()
+                logger.info(f"Índice de búsqueda {SEARCH_TABLE} creado con {indexed} ofertas")
+    except Exception as e:
+        # SQLite compilado sin FTS5 (o sin json_each): se usa LIKE
+        logger.warning(f"Búsqueda de texto completo no disponible, se usará LIKE: {e}")
+        _search_enabled[engine.url] = False
+        return False
+    
+    _search_enabled[engine.url] = True
+    return True
+
+def share_search_index(source_engine, engine):
+    """Otro engine sobre la misma base (p. ej. de solo lectura) usa el índice de source_engine"""
+    _search_enabled[engine.url] = search_enabled(source_engine)
+
+def search_enabled(engine):
+    """Indica si la base tiene índice FTS5 (ver ensure_search_index)"""
+    return _search_enabled.get(engine.url, False)
+
+def index_job_data(db_session, job_data_ids):
+    """
+    Agrega las ofertas indicadas al índice de búsqueda, dentro de la transacción
+    actual. Debe llamarse después de insertar sus posts, JobData y carrusel.
+    """
+    if not job_data_ids or not search_enabled(db_session.get_bind()):
+        return
+    db_session.execute(
+        text(_INDEX_SELECT + " WHERE d.id IN :ids").bindparams(bindparam('ids', expanding=True)),
+        {'ids': list(job_data_ids)}
+    )
+
+def build_match_expression(search_query):
+    """
+    Convierte el texto del usuario en una expresión MATCH segura.
+    
+    Cada palabra se busca como prefijo ("desarroll" encuentra "desarrollador")
+    y todas deben aparecer. Devuelve None si no hay palabras utilizables.
+    """
+    terms = re.findall(r'\w+', search_query)
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def search_subquery(match_expression):
+    """Subconsulta (rowid, rank) de las ofertas que coinciden, con rank = bm25 ponderado"""
+    search_table = table(SEARCH_TABLE, column('rowid'))
+    table_column = literal_column(SEARCH_TABLE)
+    return select(
+        search_table.c.rowid.label('job_data_id'),
+        func.bm25(table_column, *COLUMN_WEIGHTS).label('rank')
+    ).select_from(search_table).where(
+        table_column.op('MATCH')(match_expression)
+    ).subquery('search_results')
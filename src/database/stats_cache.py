@@ -0,0 +1,97 @@
+﻿# -*- coding: utf-8 -*-
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def data_version_path(engine):
+    """
+    Archivo de versión de datos asociado a una base SQLite en disco.
+    
+    El pipeline lo reescribe cada vez que confirma posts nuevos; los procesos
+    lectores (dashboard, API) comparan su fecha de modificación para saber si
+    sus cachés quedaron obsoletas. Devuelve None para bases en memoria o no SQLite.
+    """
+    if engine.dialect.name != 'sqlite':
+        return None
+    database = engine.url.database
+    if not database or database == ':memory:':
+        return None
+    return os.path.abspath(database) + '.version'
+
+def bump_data_version(engine):
+    """Marca que los datos cambiaron (llamar después de cada commit del pipeline)"""
+    path = data_version_path(engine)
+    if path is None:
+        return
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(str(time.time_ns()))
+    except OSError as e:
+        logger.warning(f"No se pudo actualizar la versión de datos {path}: {e}")
+
+def get_data_version(path):
+    """Versión actual de los datos (0 si nunca se marcó)"""
+    if path is None:
+        return 0
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+class StatsCache:
+    """
+    Caché en proceso para resultados agregados caros (contadores del dashboard).
+    
+    Un valor se recalcula cuando vence el TTL o cuando cambia la versión de
+    datos que publica el pipeline, lo que ocurra primero. Mientras tanto cada
+    lectura cuesta un os.stat() del archivo de versión.
+    """
+    
+    def __init__(self, ttl=30, version_path=None):
+        self.ttl = ttl
+        self.version_path = version_path
+        self._entries = {}  # clave -> (valor, instante de cálculo, versión de datos)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, compute):
+        """Devuelve el valor cacheado para `key` o lo calcula con `compute()`"""
+        version = get_data_version(self.version_path)
+        entry = self._entries.get(key)
+        if entry is not None and self._is_fresh(entry, version):
+            self.hits += 1
+            return entry[0]
+        
+        with self._lock:
+            # Otro hilo pudo haberlo recalculado mientras esperábamos el lock
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(entry, version):
+                self.hits += 1
+                return entry[0]
+            
+            self.misses += 1
+            value = compute()
+            self._entries[key] = (value, time.monotonic(), version)
+            return value
+    
+    def _is_fresh(self, entry, version):
+        _, computed_at, computed_version = entry
+        return computed_version == version and time.monotonic() - computed_at < self.ttl
+    
+    def invalidate(self):
+        """Descarta todos los valores cacheados"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self):
+        """Estadísticas de uso de la caché"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total * 100) if total else 0.0,
+        }
@@ -1,16 +1,182 @@
 ﻿# -*- coding: utf-8 -*-
 import logging
 import os
+import re
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import pytesseract
 from PIL import Image, ImageEnhance, ImageFilter, ImageOps
 import requests
 from io import BytesIO
-import numpy as np # Added for potential future advanced image processing, not strictly used in current PIL example
+import numpy as np
+
+# Subir este número cuando cambie preprocess_image para invalidar la caché de OCR
+PREPROCESS_VERSION = 1
+
+# Perfil 'adaptive': altura de línea de texto (en px) a la que se lleva la imagen.
+# El modelo LSTM de Tesseract normaliza cada línea a 36 px, así que escalar más
+# allá de eso solo encarece el filtrado y el reconocimiento.
+TARGET_TEXT_LINE_HEIGHT = 32
+MIN_UPSCALE_FACTOR = 1.0
+
+# Motor 'numpy': parámetros de Sauvola (ventana en px de la imagen ya escalada)
+SAUVOLA_WINDOW = 31
+SAUVOLA_K = 0.2
+SAUVOLA_R = 128.0
+
+def otsu_threshold(gray_array):
+    """Umbral de Otsu para un array uint8 en escala de grises"""
+    hist = np.bincount(gray_array.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    if total == 0:
+        return 128
+    
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    cum_mean = np.cumsum(hist * levels)
+    mean_bg = cum_mean / np.maximum(weight_bg, 1)
+    mean_fg = (cum_mean[-1] - cum_mean) / np.maximum(weight_fg, 1)
+    between_var = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between_var)) + 1
+
+def box_sum(arr, size, dtype=np.int64):
+    """
+    Suma de cada ventana size x size centrada en cada píxel, usando una imagen integral.
+    
+    Los bordes se rellenan replicando el píxel más cercano, así que el resultado
+    tiene la misma forma que `arr`.
+    """
+    radius = size // 2
+    padded = np.pad(arr.astype(dtype, copy=False), radius, mode='edge')
+    integral = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1), dtype=dtype)
+    np.cumsum(padded, axis=0, out=integral[1:, 1:])
+    del padded
+    np.cumsum(integral[1:, 1:], axis=1, out=integral[1:, 1:])
+    
+    # Operaciones en el lugar para no crear un temporal por término
+    result = integral[size:, size:] - integral[:-size, size:]
+    result -= integral[size:, :-size]
+    result += integral[:-size, :-size]
+    return result
+
+def window_sum(arr, size, dtype):
+    """
+    Igual que box_sum pero sumando desplazamientos fila y columna por separado.
+    
+    Para ventanas pequeñas (3x3, 5x5) evita la imagen integral y permite un
+    dtype estrecho (uint8/uint16), lo que reduce mucho la memoria.
+    """
+    radius = size // 2
+    height, width = arr.shape
+    padded = np.pad(arr.astype(dtype, copy=False), radius, mode='edge')
+    rows = np.zeros((padded.shape[0], width), dtype=dtype)
+    for offset in range(size):
+        rows += padded[:, offset:offset + width]
+    del padded
+    result = np.zeros((height, width), dtype=dtype)
+    for offset in range(size):
+        result += rows[offset:offset + height]
+    return result
+
+def sauvola_threshold(gray_array, window=SAUVOLA_WINDOW, k=SAUVOLA_K, r=SAUVOLA_R):
+    """Umbral local de Sauvola por píxel: media * (1 + k * (desviación / r - 1))"""
+    area = float(window * window)
+    mean = (box_sum(gray_array, window) / area).astype(np.float32)
+    variance = (box_sum(np.square(gray_array, dtype=np.int32), window) / area).astype(np.float32)
+    variance -= np.square(mean)
+    np.maximum(variance, 0, out=variance)
+    std = np.sqrt(variance, out=variance)
+    std /= r
+    std -= 1
+    std *= k
+    std += 1
+    std *= mean
+    return std
+
+def estimate_text_line_height(gray_image, strips=8, min_runs=10):
+    """
+    Estima la altura típica de las líneas de texto de una imagen en escala de grises.
+    
+    Binariza con Otsu, divide la imagen en franjas verticales (para no mezclar
+    columnas o gráficos) y mide las corridas de filas con tinta en cada franja.
+    La mediana de esas corridas aproxima la altura de una línea de texto.
+    
+    Returns:
+        Altura en píxeles, o None si no se detectó texto.
+    """
+    arr = np.asarray(gray_image, dtype=np.uint8)
+    height, width = arr.shape
+    ink = arr < otsu_threshold(arr)
+    if ink.mean() > 0.5:
+        # Texto claro sobre fondo oscuro
+        ink = ~ink
+    
+    strip_width = width // strips
+    if strip_width == 0:
+        return None
+    ink = ink[:, :strip_width * strips].reshape(height, strips, strip_width)
+    rows_with_ink = ink.mean(axis=2) > 0.02  # (filas, franjas)
+    
+    # Corridas de filas con tinta por franja
+    padded = np.pad(rows_with_ink.T, ((0, 0), (1, 1))).astype(np.int8)
+    edges = np.diff(padded, axis=1)
+    starts = np.nonzero(edges == 1)[1]
+    ends = np.nonzero(edges == -1)[1]
+    runs = ends - starts
+    runs = runs[(runs >= 4) & (runs <= height * 0.15)]
+    
+    if runs.size < min_runs:
+        # Muy pocas corridas: probablemente una foto o un gráfico, no texto
+        return None
+    return float(np.median(runs))
 
 class EnhancedImageProcessor:
-    def __init__(self, tesseract_path=None):
+    def __init__(self, tesseract_path=None, ocr_cache=None, ocr_workers=None,
+                 early_exit_chars=None, early_exit_confidence=None, selection='length',
+                 preprocess_profile='classic', preprocess_engine='pil', threshold_method='otsu',
+                 debug_writer=None):
         self.logger = logging.getLogger(__name__)
         
+        # DebugArtifactWriter opcional para guardar la imagen preprocesada en segundo plano
+        self.debug_writer = debug_writer
+        
+        # Motor de preprocesamiento: 'pil' encadena filtros de PIL con umbral fijo,
+        # 'numpy' hace contraste, nitidez, umbral adaptativo y mediana en una pasada vectorizada
+        if preprocess_engine not in ('pil', 'numpy'):
+            raise ValueError(f"Motor de preprocesamiento no válido: {preprocess_engine}")
+        if threshold_method not in ('otsu', 'sauvola'):
+            raise ValueError(f"Método de binarización no válido: {threshold_method}")
+        self.preprocess_engine = preprocess_engine
+        self.threshold_method = threshold_method  # Solo aplica al motor 'numpy'
+        
+        # Perfil de preprocesamiento: 'classic' escala 4x/2x fijo, 'adaptive' elige
+        # el factor según la altura estimada del texto
+        if preprocess_profile not in ('classic', 'adaptive'):
+            raise ValueError(f"Perfil de preprocesamiento no válido: {preprocess_profile}")
+        self.preprocess_profile = preprocess_profile
+        self.ocr_cache = ocr_cache  # OCRCache opcional para no repetir Tesseract
+        
+        # Criterio para elegir la mejor configuración de Tesseract:
+        # 'length' = texto más largo, 'confidence' = mayor confianza agregada por palabra
+        if selection not in ('length', 'confidence'):
+            raise ValueError(f"Criterio de selección de OCR no válido: {selection}")
+        self.selection = selection
+        self.tesseract_version = None
+        
+        # Las configuraciones de Tesseract se ejecutan en paralelo (un subproceso por hilo)
+        self.ocr_workers = ocr_workers or min(len(self._tesseract_configs('spa')), os.cpu_count() or 1)
+        self._executor = None
+        if self.ocr_workers > 1:
+            # Evitar que cada Tesseract abra además sus propios hilos OpenMP
+            os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+        
+        # Política opcional de salida temprana: parar en cuanto una configuración
+        # alcance suficientes caracteres o suficiente confianza media por palabra
+        self.early_exit_chars = early_exit_chars
+        self.early_exit_confidence = early_exit_confidence
+        
         # Configurar Tesseract
         if tesseract_path:
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
@@ -29,8 +195,8 @@ class EnhancedImageProcessor:
        
         try:
             # Test Tesseract to ensure it's properly configured
-            tesseract_version = pytesseract.get_tesseract_version()
-            self.logger.info(f"Tesseract versión: {tesseract_version}")
+            self.tesseract_version = pytesseract.get_tesseract_version()
+            self.logger.info(f"Tesseract versión: {self.tesseract_version}")
         except pytesseract.TesseractNotFoundError:
             self.logger.error("Tesseract no está instalado o no está en el PATH. La extracción de texto fallará.")
         except Exception as e:
@@ -64,6 +230,121 @@ class EnhancedImageProcessor:
             self.logger.error(f"Error al cargar imagen desde ruta {path}: {e}")
             return None
             
+    def _upscale_factor(self, gray_image):
+        """Factor de escalado según el perfil de preprocesamiento"""
+        width, height = gray_image.size
+        
+        # Escalado heurístico basado en el formato: más agresivo si la resolución es baja
+        classic_scale = 4.0 if width < 1000 or height < 1000 else 2.0
+        if self.preprocess_profile != 'adaptive':
+            return classic_scale
+        
+        line_height = estimate_text_line_height(gray_image)
+        if not line_height:
+            self.logger.debug("No se pudo estimar la altura del texto; se usa el escalado clásico.")
+            return classic_scale
+        
+        # Redondear a pasos de 0.25 para no remuestrear por diferencias mínimas. El
+        # escalado clásico es el techo: el perfil adaptativo solo ahorra trabajo
+        scale = round(TARGET_TEXT_LINE_HEIGHT / line_height * 4) / 4
+        return min(classic_scale, max(MIN_UPSCALE_FACTOR, scale))
+
+    def _enhance_pil(self, enlarged, median_size):
+        """Pasos 3-6 del preprocesamiento con filtros de PIL y umbral fijo"""
+        # 3. Mejorar contraste de forma adaptativa si es posible, o fija
+        # Usamos autocontraste para distribuir el rango de píxeles
+        contrast_enhanced = ImageOps.autocontrast(enlarged, cutoff=0.5)
+        self.logger.debug("Paso 3: Contraste mejorado (autocontraste).")
+
+        # 4. Aumentar nitidez
+        sharpener = ImageEnhance.Sharpness(contrast_enhanced)
+        sharpened_img = sharpener.enhance(3.0) # Ajustado a 3.0
+        self.logger.debug("Paso 4: Nitidez aumentada.")
+
+        # 5. Reducción de ruido con filtro mediano (más robusto para el ruido sal y pimienta)
+        filtered_img = sharpened_img.filter(ImageFilter.MedianFilter(size=median_size)) # Aumentado a size=5
+        self.logger.debug(f"Paso 5: Ruido reducido con MedianFilter({median_size}).")
+
+        # 6. Binarización adaptativa o con umbral mejorado
+        # Para el tipo de imagen proporcionado, un umbral fijo puede funcionar bien si el fondo es claro y el texto oscuro.
+        # Sin embargo, una binarización adaptativa es generalmente más robusta.
+        # Aquí, probamos un umbral fijo después de los ajustes de contraste/brillo.
+        # Considerar aplicar un segundo paso de contraste o brillo si el texto no es suficientemente oscuro.
+        
+        # Ajustar brillo para que el texto sea más oscuro antes de binarizar
+        brightness = ImageEnhance.Brightness(filtered_img)
+        brightened_img = brightness.enhance(0.8) # Reducir ligeramente el brillo general para oscurecer texto, o aumentar para fondos oscuros
+
+        # Binarización: texto oscuro en fondo claro
+        # Intentar un umbral un poco más alto, o una curva
+        threshold = 150 # Este valor es experimental, ajustar según el resultado.
+        binarized_img = brightened_img.point(lambda p: 0 if p < threshold else 255) # Invertido si el texto es claro y fondo oscuro.
+
+        # Si el texto es oscuro sobre fondo claro (como la imagen de ejemplo), la lógica es:
+        # píxeles > umbral son blancos (fondo), píxeles <= umbral son negros (texto).
+        # binarized_img = brightened_img.point(lambda p: 255 if p > threshold else 0)
+
+
+        # Si después de todos los pasos, el texto es tenue, podemos intentar otro paso de contraste
+        final_processed_image = ImageEnhance.Contrast(binarized_img).enhance(1.5)
+        return final_processed_image
+
+    def _enhance_numpy(self, enlarged, median_size):
+        """
+        Pasos 3-6 del preprocesamiento en una pasada vectorizada sobre un solo array.
+        
+        Equivale a la cadena de PIL salvo el umbral, que es adaptativo (Otsu o
+        Sauvola) en lugar del 150 fijo. La binarización se hace antes del filtro
+        mediano: sobre una imagen binaria la mediana es un voto de mayoría en la
+        ventana, que se calcula con una imagen integral. Con un umbral global el
+        resultado es idéntico al orden original (la mediana conmuta con
+        cualquier función monótona).
+        """
+        arr = np.asarray(enlarged, dtype=np.uint8)
+        
+        # 3. Autocontraste con recorte del 0.5% en cada extremo, como ImageOps.autocontrast
+        hist = np.bincount(arr.ravel(), minlength=256)
+        cutoff = arr.size * 0.005
+        cumulative = np.cumsum(hist)
+        low = int(np.searchsorted(cumulative, cutoff, side='right'))
+        high = int(np.searchsorted(cumulative, arr.size - cutoff, side='left'))
+        if high > low:
+            levels = (np.arange(256) - low) * (255.0 / (high - low))
+            lut = np.clip(levels, 0, 255).astype(np.uint8)
+            arr = lut[arr]
+        self.logger.debug("Paso 3: Contraste mejorado (autocontraste).")
+        
+        # 4. Nitidez: ImageEnhance.Sharpness(3.0) = 3 * imagen - 2 * suavizada, con el
+        # kernel SMOOTH (vecinos 1, centro 5, /13). En enteros: (31 * imagen - 2 * vecindad 3x3) / 13,
+        # que cabe en int16 (|31 * 255| + 2 * 9 * 255 < 32768)
+        sharpened = arr.astype(np.int16)
+        sharpened *= 31
+        neighbourhood = window_sum(arr, 3, dtype=np.int16)
+        neighbourhood *= 2
+        sharpened -= neighbourhood
+        del neighbourhood
+        sharpened += 6
+        sharpened //= 13
+        np.clip(sharpened, 0, 255, out=sharpened)
+        sharpened = sharpened.astype(np.uint8)
+        self.logger.debug("Paso 4: Nitidez aumentada.")
+        
+        # 5. Binarización adaptativa (texto = True)
+        if self.threshold_method == 'sauvola':
+            ink = sharpened < sauvola_threshold(sharpened)
+        else:
+            ink = sharpened < otsu_threshold(sharpened)
+        del sharpened
+        self.logger.debug(f"Paso 5: Binarizada con umbral {self.threshold_method}.")
+        
+        # 6. Mediana sobre la imagen binaria = mayoría de píxeles de tinta en la ventana
+        votes = window_sum(ink, median_size, dtype=np.uint8)
+        ink = votes > (median_size * median_size) // 2
+        self.logger.debug(f"Paso 6: Ruido reducido con mediana binaria({median_size}).")
+        
+        # Texto negro sobre fondo blanco
+        return Image.fromarray(np.where(ink, 0, 255).astype(np.uint8), mode='L')
+
     def preprocess_image(self, image):
         """Preprocesa la imagen con técnicas avanzadas para mejorar el OCR."""
         if image is None:
@@ -74,117 +355,269 @@ class EnhancedImageProcessor:
             gray_image = image.convert('L')
             self.logger.debug("Paso 1: Convertido a escala de grises.")
 
-            # 2. Aumentar tamaño (escalado heurístico basado en el formato)
-            # Para el formato dado, un escalado mayor puede ser beneficioso.
+            # 2. Aumentar tamaño
             width, height = gray_image.size
-            if width < 1000 or height < 1000: # Scale up if resolution is low
-                enlarged = gray_image.resize((width * 4, height * 4), Image.LANCZOS)
-                self.logger.debug("Paso 2: Imagen escalada 4x.")
+            scale = self._upscale_factor(gray_image)
+            if scale == 1.0:
+                enlarged = gray_image
             else:
-                enlarged = gray_image.resize((width * 2, height * 2), Image.LANCZOS) # Less aggressive for already large images
-                self.logger.debug("Paso 2: Imagen escalada 2x.")
+                enlarged = gray_image.resize((round(width * scale), round(height * scale)), Image.LANCZOS)
+            self.logger.debug(f"Paso 2: Imagen escalada {scale:g}x.")
 
+            # Con poco escalado una ventana 5x5 se come los trazos finos; el perfil adaptativo la reduce
+            median_size = 3 if self.preprocess_profile == 'adaptive' and scale < 2 else 5
+            
+            if self.preprocess_engine == 'numpy':
+                final_processed_image = self._enhance_numpy(enlarged, median_size)
+            else:
+                final_processed_image = self._enhance_pil(enlarged, median_size)
+            
+            # Guardar versión preprocesada para depuración (sin bloquear el OCR)
+            if self.debug_writer is not None:
+                filename = os.path.join("debug_images_processed", f"last_processed_{os.urandom(4).hex()}.png") # Unique filename
+                if self.debug_writer.save_image(final_processed_image, filename):
+                    self.logger.debug(f"Imagen preprocesada encolada para {filename}")
+            
+            return final_processed_image
+        except Exception as e:
+            self.logger.error(f"Error en el preprocesamiento: {e}", exc_info=True) # Added exc_info for traceback
+            return image # Return original image on error
+            
+    def _tesseract_configs(self, lang):
+        """Configuraciones de Tesseract a probar, en orden de prioridad"""
+        # Priorizar --psm 6 y --psm 3 para documentos estructurados.
+        # --oem 3 es el motor por defecto y el mejor para la mayoría de los casos.
+        # Considerar --user-words y --user-patterns si hay vocabulario específico recurrente.
+        return [
+            f'--psm 3 --oem 3 -l {lang}',  # Fully automatic page segmentation, but no OSD
+            f'--psm 6 --oem 3 -l {lang}',  # Assume a single uniform block of text
+            f'--psm 1 --oem 3 -l {lang}',  # Automatic page segmentation with OSD
+            f'--psm 4 --oem 3 -l {lang}',  # Assume a single column of text of variable sizes
+        ]
 
-            # 3. Mejorar contraste de forma adaptativa si es posible, o fija
-            # Usamos autocontraste para distribuir el rango de píxeles
-            contrast_enhanced = ImageOps.autocontrast(enlarged, cutoff=0.5)
-            self.logger.debug("Paso 3: Contraste mejorado (autocontraste).")
-
-            # 4. Aumentar nitidez
-            sharpener = ImageEnhance.Sharpness(contrast_enhanced)
-            sharpened_img = sharpener.enhance(3.0) # Ajustado a 3.0
-            self.logger.debug("Paso 4: Nitidez aumentada.")
-
-            # 5. Reducción de ruido con filtro mediano (más robusto para el ruido sal y pimienta)
-            filtered_img = sharpened_img.filter(ImageFilter.MedianFilter(size=5)) # Aumentado a size=5
-            self.logger.debug("Paso 5: Ruido reducido con MedianFilter.")
+    def _ocr_fingerprint(self, lang):
+        """Describe todo lo que influye en el resultado del OCR (para la clave de caché)"""
+        return json.dumps({
+            "preprocess": PREPROCESS_VERSION,
+            "configs": self._tesseract_configs(lang),
+            "tesseract": str(self.tesseract_version),
+            "early_exit": [self.early_exit_chars, self.early_exit_confidence],
+            "selection": self.selection,
+            "profile": self.preprocess_profile,
+            "engine": self.preprocess_engine,
+            "threshold": self.threshold_method if self.preprocess_engine == 'numpy' else None,
+        }, sort_keys=True)
 
-            # 6. Binarización adaptativa o con umbral mejorado
-            # Para el tipo de imagen proporcionado, un umbral fijo puede funcionar bien si el fondo es claro y el texto oscuro.
-            # Sin embargo, una binarización adaptativa es generalmente más robusta.
-            # Aquí, probamos un umbral fijo después de los ajustes de contraste/brillo.
-            # Considerar aplicar un segundo paso de contraste o brillo si el texto no es suficientemente oscuro.
+    @staticmethod
+    def _parse_ocr_data(data):
+        """
+        Convierte la salida de image_to_data en texto, líneas con sus cajas y confianza.
+        
+        Returns:
+            Tupla (texto, líneas, confianza media, puntuación agregada). La
+            puntuación es la suma de confianzas/100, es decir, el número esperado
+            de palabras correctas: el ruido de baja confianza apenas suma.
+        """
+        lines = {}
+        confidences = []
+        for i, word in enumerate(data['text']):
+            word = word.strip()
+            conf = float(data['conf'][i])
+            if not word or conf < 0:
+                continue
+            confidences.append(conf)
             
-            # Ajustar brillo para que el texto sea más oscuro antes de binarizar
-            brightness = ImageEnhance.Brightness(filtered_img)
-            brightened_img = brightness.enhance(0.8) # Reducir ligeramente el brillo general para oscurecer texto, o aumentar para fondos oscuros
-
-            # Binarización: texto oscuro en fondo claro
-            # Intentar un umbral un poco más alto, o una curva
-            threshold = 150 # Este valor es experimental, ajustar según el resultado.
-            binarized_img = brightened_img.point(lambda p: 0 if p < threshold else 255) # Invertido si el texto es claro y fondo oscuro.
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            left, top = data['left'][i], data['top'][i]
+            right, bottom = left + data['width'][i], top + data['height'][i]
+            line = lines.get(key)
+            if line is None:
+                lines[key] = {"words": [word], "confs": [conf], "box": [left, top, right, bottom]}
+            else:
+                line["words"].append(word)
+                line["confs"].append(conf)
+                box = line["box"]
+                box[0], box[1] = min(box[0], left), min(box[1], top)
+                box[2], box[3] = max(box[2], right), max(box[3], bottom)
+        
+        parsed_lines = [
+            {
+                "text": " ".join(line["words"]),
+                "confidence": round(sum(line["confs"]) / len(line["confs"]), 1),
+                "box": [line["box"][0], line["box"][1],
+                        line["box"][2] - line["box"][0], line["box"][3] - line["box"][1]],
+            }
+            for line in lines.values()
+        ]
+        text = "\n".join(line["text"] for line in parsed_lines)
+        mean_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+        return text, parsed_lines, mean_confidence, sum(confidences) / 100.0
 
-            # Si el texto es oscuro sobre fondo claro (como la imagen de ejemplo), la lógica es:
-            # píxeles > umbral son blancos (fondo), píxeles <= umbral son negros (texto).
-            # binarized_img = brightened_img.point(lambda p: 255 if p > threshold else 0)
+    def _run_config(self, image_path, config):
+        """
+        Ejecuta una configuración de Tesseract y devuelve su resultado como dict.
+        
+        Si hace falta la confianza (modo 'confidence' o salida temprana por
+        confianza) se llama solo a image_to_data y el texto se arma con sus
+        palabras; si no, a image_to_string, que conserva el formato original.
+        """
+        if self.selection == 'confidence' or self.early_exit_confidence is not None:
+            # Una sola llamada da texto, cajas y confianza
+            data = pytesseract.image_to_data(image_path, config=config, output_type=pytesseract.Output.DICT)
+            text, lines, confidence, score = self._parse_ocr_data(data)
+            if self.selection == 'length':
+                score = len(text)
+            return {"config": config, "text": text, "confidence": confidence, "score": score, "lines": lines}
+        
+        text = pytesseract.image_to_string(image_path, config=config)
+        
+        # Post-procesamiento del texto: limpiar espacios y nuevas líneas dobles
+        text = text.replace('\n\n', '\n').strip()
+        return {"config": config, "text": text, "confidence": None, "score": len(text), "lines": []}
 
+    def _passes_early_exit(self, result):
+        """Indica si un resultado es suficientemente bueno para no probar más configuraciones"""
+        if self.early_exit_chars is not None and len(result["text"]) >= self.early_exit_chars:
+            return True
+        if self.early_exit_confidence is not None and result["confidence"] is not None:
+            return result["confidence"] >= self.early_exit_confidence
+        return False
 
-            # Si después de todos los pasos, el texto es tenue, podemos intentar otro paso de contraste
-            final_processed_image = ImageEnhance.Contrast(binarized_img).enhance(1.5)
-            
-            # Guardar versión preprocesada para depuración
-            debug_dir = "debug_images_processed"
-            os.makedirs(debug_dir, exist_ok=True) # Ensure directory exists
+    def _run_configs(self, processed_image, configs):
+        """
+        Ejecuta las configuraciones de Tesseract sobre la imagen preprocesada.
+        
+        Con varios workers se mantienen como mucho ocr_workers configuraciones
+        en curso, lanzadas en orden de prioridad: cada vez que se recoge un
+        resultado se lanza la siguiente. Los resultados se recorren siempre en
+        orden de prioridad para que la elección sea la misma que en modo
+        secuencial. Con salida temprana no se lanzan las configuraciones
+        restantes; las que ya estaban en curso terminan igual, así que solo se
+        ahorra trabajo si hay más configuraciones que workers.
+        
+        Returns:
+            Lista de resultados (dicts de _run_config) de las configuraciones que terminaron bien
+        """
+        # Codificar la imagen una sola vez; Tesseract la lee directamente del disco
+        fd, image_path = tempfile.mkstemp(suffix='.png', prefix='ocr_')
+        os.close(fd)
+        futures = []
+        try:
+            processed_image.save(image_path, compress_level=1)
             
-            filename = os.path.join(debug_dir, f"last_processed_{os.urandom(4).hex()}.png") # Unique filename
-            final_processed_image.save(filename)
-            self.logger.info(f"Imagen preprocesada guardada en {filename}")
+            parallel = self.ocr_workers > 1
+            if parallel:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.ocr_workers, thread_name_prefix='tesseract')
+                for config in configs[:self.ocr_workers]:
+                    futures.append(self._executor.submit(self._run_config, image_path, config))
             
-            return final_processed_image
-        except Exception as e:
-            self.logger.error(f"Error en el preprocesamiento: {e}", exc_info=True) # Added exc_info for traceback
-            return image # Return original image on error
+            results = []
+            for index, config in enumerate(configs):
+                try:
+                    result = futures[index].result() if parallel else self._run_config(image_path, config)
+                except Exception as e:
+                    self.logger.warning(f"Error con config Tesseract '{config}': {e}")
+                    result = None
+                
+                if result is not None:
+                    results.append(result)
+                    if self._passes_early_exit(result):
+                        self.logger.debug(f"Salida temprana con configuración: {config}")
+                        break
+                
+                # Se liberó un worker: lanzar la siguiente configuración pendiente
+                if parallel and len(futures) < len(configs):
+                    futures.append(self._executor.submit(self._run_config, image_path, configs[len(futures)]))
             
+            return results
+        finally:
+            for future in futures:
+                future.cancel()
+            try:
+                os.remove(image_path)
+            except OSError:
+                pass
+
     def extract_text(self, image, lang='spa'):
         """Extrae texto de una imagen usando Tesseract OCR con múltiples configuraciones."""
+        return self.extract_text_detailed(image, lang)["text"]
+
+    def extract_text_detailed(self, image, lang='spa'):
+        """
+        Extrae texto y devuelve un resultado estructurado.
+        
+        Returns:
+            Dict con 'text', 'confidence' (media por palabra, 0-100, o None en
+            modo 'length' sin salida temprana por confianza), 'psm' de la
+            configuración elegida y 'lines' (lista de {'text', 'confidence',
+            'box': [left, top, width, height]}).
+        """
+        empty_result = {"text": "", "confidence": None, "psm": None, "lines": []}
         if image is None:
-            return ""
+            return empty_result
+
+        cache_key = None
+        if self.ocr_cache is not None:
+            cache_key = self.ocr_cache.make_key(image, self._ocr_fingerprint(lang))
+            cached = self.ocr_cache.get(cache_key)
+            if cached is not None:
+                self.logger.info(f"Texto recuperado de la caché OCR ({len(cached['text'])} caracteres, psm {cached['psm']})")
+                return {**empty_result, **cached}
 
         try:
             # Preprocesar la imagen
             processed_image = self.preprocess_image(image)
             if processed_image is None:
                 self.logger.error("El preprocesamiento de la imagen falló, no se puede extraer texto.")
-                return ""
-
-            # Probar diferentes configuraciones de Tesseract y quedarse con la mejor
-            # Priorizar --psm 6 y --psm 3 para documentos estructurados.
-            # --oem 3 es el motor por defecto y el mejor para la mayoría de los casos.
-            # Considerar --user-words y --user-patterns si hay vocabulario específico recurrente.
-            configs = [
-                f'--psm 3 --oem 3 -l {lang}',  # Fully automatic page segmentation, but no OSD
-                f'--psm 6 --oem 3 -l {lang}',  # Assume a single uniform block of text
-                f'--psm 1 --oem 3 -l {lang}',  # Automatic page segmentation with OSD
-                f'--psm 4 --oem 3 -l {lang}',  # Assume a single column of text of variable sizes
-            ]
-            
-            best_text = ""
-            best_length = 0
-            best_config = ""
-            
-            for config in configs:
-                try:
-                    text = pytesseract.image_to_string(processed_image, config=config)
-                    
-                    # Post-procesamiento del texto: limpiar espacios y nuevas líneas dobles
-                    text = text.replace('\n\n', '\n').strip()
-                    
-                    if len(text) > best_length:
-                        best_text = text
-                        best_length = len(text)
-                        best_config = config
-                except Exception as e:
-                    self.logger.warning(f"Error con config Tesseract '{config}': {e}")
-                    continue # Try next config
+                return empty_result
+
+            # Probar diferentes configuraciones de Tesseract y quedarse con la mejor:
+            # la más larga en modo 'length', la de mayor confianza agregada en modo 'confidence'
+            results = self._run_configs(processed_image, self._tesseract_configs(lang))
             
-            self.logger.info(f"Texto extraído con {best_length} caracteres. Mejor configuración: {best_config}")
-            return best_text
+            best = None
+            for result in results:
+                if result["text"] and (best is None or result["score"] > best["score"]):
+                    best = result
+            
+            if best is None:
+                self.logger.info("Texto extraído con 0 caracteres.")
+                final_result = empty_result
+            else:
+                final_result = {
+                    "text": best["text"],
+                    "confidence": round(best["confidence"], 1) if best["confidence"] is not None else None,
+                    "psm": self._config_psm(best["config"]),
+                    "lines": best["lines"],
+                }
+                confidence_info = f", confianza {final_result['confidence']}" if best["confidence"] is not None else ""
+                self.logger.info(f"Texto extraído con {len(best['text'])} caracteres{confidence_info}. "
+                                 f"Mejor configuración: {best['config']}")
+            
+            # No guardar en caché resultados de corridas donde Tesseract falló por completo
+            if cache_key is not None and results:
+                self.ocr_cache.put(cache_key, final_result)
+            
+            return final_result
         except pytesseract.TesseractNotFoundError:
             self.logger.error("Tesseract no está instalado o no está en el PATH. No se pudo extraer texto.")
-            return ""
+            return empty_result
         except Exception as e:
             self.logger.error(f"Error general al extraer texto: {e}", exc_info=True)
-            return ""
+            return empty_result
+            
+    @staticmethod
+    def _config_psm(config):
+        """Extrae el número de PSM de una cadena de configuración de Tesseract"""
+        match = re.search(r'--psm (\d+)', config or "")
+        return int(match.group(1)) if match else None
+            
+    def close(self):
+        """Libera el pool de hilos de Tesseract"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
             
     def extract_text_from_url(self, url, lang='spa'):
         """Extrae texto de una imagen desde una URL"""
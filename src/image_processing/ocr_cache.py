@@ -0,0 +1,97 @@
+﻿# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+
+class OCRCache:
+    """
+    Caché persistente de resultados de OCR direccionada por contenido.
+    
+    La clave combina un hash de los píxeles de la imagen con un hash de la
+    configuración de preprocesamiento y Tesseract, de modo que un flyer
+    republicado o una re-ejecución con --no-clean reutilizan el texto sin
+    volver a lanzar Tesseract, y cualquier cambio de configuración invalida
+    las entradas viejas. Se guarda en SQLite y se limita a `max_entries`
+    expulsando las entradas menos usadas recientemente (LRU).
+    """
+    
+    def __init__(self, path='data/ocr_cache.db', max_entries=20000):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_ocr_cache_last_used ON ocr_cache (last_used)")
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(image, fingerprint):
+        """Clave = hash de los píxeles + hash de la configuración de OCR"""
+        image_hash = hashlib.sha256()
+        image_hash.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode('utf-8'))
+        image_hash.update(image.tobytes())
+        config_hash = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+        return f"{image_hash.hexdigest()}:{config_hash[:16]}"
+    
+    def get(self, key):
+        """Devuelve el resultado guardado (dict) o None"""
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM ocr_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self._conn.execute("UPDATE ocr_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return json.loads(row[0])
+    
+    def put(self, key, result):
+        """Guarda un resultado y expulsa las entradas más antiguas si se supera el límite"""
+        payload = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, payload, last_used) VALUES (?, ?, ?)",
+                (key, payload, time.time())
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM ocr_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM ocr_cache WHERE key IN "
+                    "(SELECT key FROM ocr_cache ORDER BY last_used ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self.logger.debug(f"Caché OCR: {overflow} entradas expulsadas")
+            self._conn.commit()
+    
+    def get_stats(self):
+        """Devuelve contadores de aciertos/fallos"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups * 100) if lookups else 0.0,
+        }
+    
+    def close(self):
+        """Cierra la conexión con la caché"""
+        with self._lock:
+            self._conn.close()
@@ -19,9 +19,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.scraper.instagram_scraper import InstagramScraper
 from src.image_processing.ocr import EnhancedImageProcessor
+from src.image_processing.ocr_cache import OCRCache
 from src.database.models import init_db, JobPost, JobData, CarouselImage, AnalysisMetrics, get_job_statistics
-from src.text_analysis.job_analyzer import is_job_post, extract_job_data
-from src.utils.helpers import save_image_from_url
+from src.database.persistence import PostBatchWriter
+from src.database.stats_cache import bump_data_version
+from src.text_analysis.job_analyzer import (is_job_post, is_job_post_batch, extract_job_data, NormalizedDocument,
+                                            enable_normalization_cache)
+from src.utils.helpers import fetch_image_from_url
+from src.utils.debug_artifacts import DebugArtifactWriter
 
 # Configurar logging SIN EMOJIS para evitar errores
 logging.basicConfig(
@@ -51,6 +56,8 @@ Ejemplos de uso:
   python src/main.py --max               # Procesamiento masivo (2500 posts)
   python src/main.py --headless         # Ejecutar en modo headless
   python src/main.py --clean-only       # Solo limpiar entorno y BD
+  python src/main.py --reclassify       # Recalcular puntuaciones con los pesos actuales
+  python src/main.py 200 --workers 3    # Visitar posts con 3 navegadores en paralelo
         """)
     
     # Argumento principal: número de posts
@@ -101,6 +108,12 @@ Ejemplos de uso:
         help='Solo limpiar entorno y base de datos, luego salir'
     )
     
+    parser.add_argument(
+        '--reclassify',
+        action='store_true',
+        help='Recalcular classification_score de los posts guardados con job_indicators.json, luego salir'
+    )
+    
     parser.add_argument(
         '--account', '-a',
         type=str,
@@ -113,6 +126,108 @@ Ejemplos de uso:
         help='Activar logging de debug detallado'
     )
     
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=1,
+        help='Navegadores headless que visitan posts en paralelo (por defecto: 1)'
+    )
+    
+    parser.add_argument(
+        '--requests-per-minute',
+        type=int,
+        default=40,
+        help='Presupuesto global de visitas a posts por minuto con --workers (por defecto: 40)'
+    )
+    
+    parser.add_argument(
+        '--no-ocr-cache',
+        action='store_true',
+        help='No reutilizar resultados de OCR guardados en data/ocr_cache.db'
+    )
+    
+    parser.add_argument(
+        '--no-normalization-cache',
+        action='store_true',
+        help='No reutilizar palabras y líneas ya normalizadas guardadas en data/normalization_cache.json'
+    )
+    
+    parser.add_argument(
+        '--ocr-workers',
+        type=int,
+        help='Configuraciones de Tesseract ejecutadas en paralelo (por defecto: según núcleos)'
+    )
+    
+    parser.add_argument(
+        '--ocr-early-exit-chars',
+        type=int,
+        help='Dejar de probar configuraciones de Tesseract al obtener al menos N caracteres'
+    )
+    
+    parser.add_argument(
+        '--ocr-early-exit-confidence',
+        type=float,
+        help='Dejar de probar configuraciones de Tesseract al superar esta confianza media (0-100)'
+    )
+    
+    parser.add_argument(
+        '--ocr-selection',
+        choices=['length', 'confidence'],
+        default='length',
+        help='Criterio para elegir la configuración de Tesseract: length (texto más largo, por defecto) '
+             'o confidence (confianza por palabra de image_to_data)'
+    )
+    
+    parser.add_argument(
+        '--preprocess-profile',
+        choices=['classic', 'adaptive'],
+        default='classic',
+        help='Escalado previo al OCR: classic (4x/2x fijo) o adaptive (según la altura del texto)'
+    )
+    
+    parser.add_argument(
+        '--preprocess-engine',
+        choices=['pil', 'numpy'],
+        default='pil',
+        help='Filtros previos al OCR: pil (umbral fijo) o numpy (una pasada vectorizada con umbral adaptativo)'
+    )
+    
+    parser.add_argument(
+        '--threshold',
+        choices=['otsu', 'sauvola'],
+        default='otsu',
+        help='Binarización del motor numpy: otsu (global) o sauvola (local) (por defecto: otsu)'
+    )
+    
+    parser.add_argument(
+        '--debug-artifacts',
+        choices=['off', 'sampled', 'full'],
+        default='full',
+        help='Archivos de inspección en debug_*/: off, sampled (1 de cada N posts) o full (por defecto: full)'
+    )
+    
+    parser.add_argument(
+        '--debug-sample-every',
+        type=int,
+        default=10,
+        help='Con --debug-artifacts sampled, guardar los artefactos de 1 de cada N posts (por defecto: 10)'
+    )
+    
+    parser.add_argument(
+        '--debug-png-compression',
+        type=int,
+        default=6,
+        choices=range(10),
+        metavar='0-9',
+        help='Nivel de compresión de los PNG de depuración (0 = rápido, 9 = pequeño; por defecto: 6)'
+    )
+    
+    parser.add_argument(
+        '--no-grid-cursor',
+        action='store_true',
+        help='Volver a scrollear el perfil desde arriba en cada lote (modo clásico)'
+    )
+    
     args = parser.parse_args()
     
     # Lógica de prioridad para el número de posts
@@ -133,60 +248,89 @@ Ejemplos de uso:
     if args.batch <= 0 or args.batch > 100:
         parser.error("El tamaño de lote debe estar entre 1 y 100")
     
+    if args.workers <= 0 or args.workers > 8:
+        parser.error("El número de workers debe estar entre 1 y 8")
+    
+    if args.requests_per_minute <= 0:
+        parser.error("El presupuesto de peticiones por minuto debe ser mayor que 0")
+    
     return args
 
-def analyze_and_save_post(post, post_count, image_processor, db_session):
+def fetch_and_extract_text(image_url, local_image_path, image_processor, debug_writer, post_count):
     """
-    Analiza un post individual y guarda la información en la base de datos
+    Descarga una imagen una sola vez, la encola para inspección y extrae su texto
+    
+    Returns:
+        Tupla (resultado de extract_text_detailed, bytes descargados, ruta local
+        o None si la imagen no se guardará)
+    """
+    image, content = fetch_image_from_url(image_url)
+    if image is None:
+        return {"text": "", "confidence": None, "psm": None, "lines": []}, len(content), None
+    
+    saved = debug_writer.save_image(image, local_image_path, key=post_count)
+    ocr_result = image_processor.extract_text_detailed(image.convert('RGB'))
+    return ocr_result, len(content), local_image_path if saved else None
+
+def analyze_and_save_post(post, post_count, image_processor, post_writer, debug_writer):
+    """
+    Analiza un post individual y lo encola para guardarlo en la base de datos
     
     Args:
         post: Diccionario con información del post
         post_count: Número del post (para archivos de debug)
         image_processor: Instancia del procesador de imágenes
-        db_session: Sesión de base de datos
+        post_writer: PostBatchWriter que persiste los posts por lotes
+        debug_writer: DebugArtifactWriter para los archivos de inspección
     
     Returns:
-        Dict con resultados del análisis
+        Dict con resultados del análisis. El post_id se completa al hacer
+        flush del lote (None hasta entonces); si el post no se pudo guardar,
+        el loop principal marca 'save_failed'.
     """
     
     logger.info(f"Procesando post {post_count}: {post['url']}")
     
     try:
-        # Verificar si el post ya existe en la base de datos
-        existing_post = db_session.query(JobPost).filter_by(post_url=post['url']).first()
+        # Verificar si el post ya existe en la base de datos (o en el lote pendiente)
+        existing_post = post_writer.get_existing(post['url'])
         if existing_post:
+            post_id, existing_is_job, existing_score = existing_post
             logger.warning(f"Post {post_count} ya existe en BD: {post['url']}")
             return {
-                "post_id": existing_post.id,
-                "is_job": existing_post.is_job_offer,
+                "post_id": post_id,
+                "post_url": post['url'],
+                "is_job": existing_is_job,
                 "job_type": "DUPLICADO",
-                "score": existing_post.classification_score,
+                "score": existing_score,
                 "company": "N/A",
-                "contact_email": None
+                "contact_email": None,
+                "bytes_fetched": 0,
+                "save_failed": False
             }
         
-        # Crear directorios de debug si no existen
-        os.makedirs("debug_images", exist_ok=True)
-        os.makedirs("debug_texts", exist_ok=True)
-        os.makedirs("debug_analysis", exist_ok=True)
-        
-        # Guardar imagen para inspección
-        local_image_path = f"debug_images/post_{post_count}.png"
-        save_image_from_url(post['image_url'], local_image_path)
-        
-        # Extraer texto de la imagen principal
-        image_text = image_processor.extract_text_from_url(post['image_url'])
+        # Descargar la imagen principal una vez: se encola para inspección y se pasa al OCR
+        ocr_result, bytes_fetched, local_image_path = fetch_and_extract_text(
+            post['image_url'], f"debug_images/post_{post_count}.png", image_processor, debug_writer, post_count)
+        image_text = ocr_result['text']
+        ocr_confidences = [ocr_result['confidence']] if ocr_result['confidence'] is not None else []
         logger.info(f"Texto extraído ({len(image_text)} caracteres): {image_text[:200]}...")
         
         # Guardar texto extraído para inspección
-        with open(f"debug_texts/post_{post_count}.txt", "w", encoding="utf-8") as f:
-            f.write(f"POST URL: {post['url']}\n")
-            f.write(f"IMAGE URL: {post['image_url']}\n")
-            f.write(f"DESCRIPTION: {post['description']}\n")
-            f.write(f"EXTRACTED TEXT:\n{image_text}\n")
+        debug_writer.write_text(
+            f"debug_texts/post_{post_count}.txt",
+            f"POST URL: {post['url']}\n"
+            f"IMAGE URL: {post['image_url']}\n"
+            f"DESCRIPTION: {post['description']}\n"
+            f"EXTRACTED TEXT:\n{image_text}\n",
+            key=post_count
+        )
         
-        # Análisis de clasificación
-        is_job, job_type, score, is_expired = is_job_post(image_text, post['description'])
+        # Análisis de clasificación: cada texto se normaliza una sola vez y se
+        # reutiliza en la extracción
+        image_document = NormalizedDocument(image_text)
+        description_document = NormalizedDocument(post['description'] or "")
+        is_job, job_type, score, is_expired = is_job_post(image_document, description_document)
         
         logger.info(f"Análisis de clasificación:")
         logger.info(f"  - Es oferta laboral: {is_job}")
@@ -207,47 +351,44 @@ def analyze_and_save_post(post, post_count, image_processor, db_session):
             scraped_at=scraped_at,
             local_image_path=local_image_path,
             is_carousel=post.get('is_carousel', False),
+            ocr_text=image_text,
             classification_score=score,
             is_job_offer=is_job
         )
         
-        db_session.add(job_post)
-        db_session.commit()
-        
         # Procesar imágenes del carrusel si existen
         carousel_texts = []
         if post.get('is_carousel', False) and post.get('carousel_images'):
             for idx, img_url in enumerate(post['carousel_images']):
-                # Guardar imagen del carrusel
-                carousel_local_path = f"debug_images/post_{post_count}_carousel_{idx}.png"
-                save_image_from_url(img_url, carousel_local_path)
-                
-                # Extraer texto de cada imagen del carrusel
-                carousel_text = image_processor.extract_text_from_url(img_url)
+                # Guardar y extraer texto de cada imagen del carrusel con una sola descarga
+                carousel_result, carousel_bytes, carousel_local_path = fetch_and_extract_text(
+                    img_url, f"debug_images/post_{post_count}_carousel_{idx}.png", image_processor, debug_writer, post_count)
+                carousel_text = carousel_result['text']
+                bytes_fetched += carousel_bytes
+                if carousel_result['confidence'] is not None:
+                    ocr_confidences.append(carousel_result['confidence'])
                 carousel_texts.append(carousel_text)
                 
                 # Crear registro de imagen del carrusel
-                carousel_img = CarouselImage(
-                    post_id=job_post.id,
+                job_post.carousel_images.append(CarouselImage(
                     image_url=img_url,
                     local_image_path=carousel_local_path,
                     image_order=idx,
                     extracted_text=carousel_text
-                )
-                db_session.add(carousel_img)
+                ))
             
-            db_session.commit()
             logger.info(f"Procesadas {len(post['carousel_images'])} imágenes del carrusel")
         
         # Extraer información estructurada si es una oferta laboral
         job_info = {}
         if is_job:
-            # Combinar texto de imagen principal y carrusel para análisis completo
-            combined_image_text = image_text
+            # Combinar texto de imagen principal y carrusel para análisis completo.
+            # Sin carrusel, el texto de la imagen ya está normalizado
             if carousel_texts:
-                combined_image_text += "\n\n" + "\n\n".join(carousel_texts)
-            
-            job_info = extract_job_data(combined_image_text, post['description'])
+                combined_image_text = image_text + "\n\n" + "\n\n".join(carousel_texts)
+                job_info = extract_job_data(combined_image_text, description_document)
+            else:
+                job_info = extract_job_data(image_document, description_document)
             
             logger.info("Información extraída:")
             logger.info(f"  - Empresa: {job_info.get('company_name', 'No identificada')}")
@@ -258,7 +399,6 @@ def analyze_and_save_post(post, post_count, image_processor, db_session):
             
             # Crear registro de datos estructurados
             job_data = JobData(
-                post_id=job_post.id,
                 company_name=job_info.get('company_name') or "Por determinar",
                 company_industry=job_info.get('company_industry'),
                 job_type=job_type or "Por determinar",
@@ -280,19 +420,17 @@ def analyze_and_save_post(post, post_count, image_processor, db_session):
         else:
             # Post que no es oferta laboral
             job_data = JobData(
-                post_id=job_post.id,
                 company_name="N/A",
                 job_type="No es oferta laboral",
                 requirements=[image_text] if image_text.strip() else [],
                 is_active=False
             )
         
-        db_session.add(job_data)
-        db_session.commit()
+        job_post.extracted_data.append(job_data)
         
         # Crear métricas de análisis
         metrics = AnalysisMetrics(
-            post_id=job_post.id,
+            ocr_confidence=round(sum(ocr_confidences) / len(ocr_confidences)) if ocr_confidences else None,
             text_length=len(image_text),
             classification_confidence=min(100, max(0, score + 50)),
             has_contact_info=bool(job_info.get('contact_email') or job_info.get('contact_phone')),
@@ -300,8 +438,8 @@ def analyze_and_save_post(post, post_count, image_processor, db_session):
             has_benefits=bool(job_info.get('benefits'))
         )
         
-        db_session.add(metrics)
-        db_session.commit()
+        # Se guarda junto con el resto del lote de procesamiento
+        post_writer.add(job_post, metrics)
         
         # Guardar análisis detallado para inspección
         analysis_data = {
@@ -320,22 +458,26 @@ def analyze_and_save_post(post, post_count, image_processor, db_session):
             "text_extracted": {
                 "main_image": image_text,
                 "carousel_images": carousel_texts
-            }
+            },
+            "bytes_fetched": bytes_fetched
         }
         
-        with open(f"debug_analysis/post_{post_count}_analysis.json", "w", encoding="utf-8") as f:
-            json.dump(analysis_data, f, ensure_ascii=False, indent=2)
+        debug_writer.write_json(f"debug_analysis/post_{post_count}_analysis.json", analysis_data, key=post_count)
+        
+        logger.info(f"Imágenes descargadas: {bytes_fetched / 1024:.1f} KB")
         
         return {
-            "post_id": job_post.id,
+            "post_id": None,
+            "post_url": post['url'],
             "is_job": is_job,
             "job_type": job_type,
             "score": score,
             "company": job_info.get('company_name'),
-            "contact_email": job_info.get('contact_email')
+            "contact_email": job_info.get('contact_email'),
+            "bytes_fetched": bytes_fetched,
+            "save_failed": False
         }
     except Exception as e:
-        db_session.rollback()
         logger.error(f"ERROR procesando post {post_count}: {str(e)}")
         raise
 
@@ -380,6 +522,7 @@ def clean_database():
         db_session.query(JobData).delete()
         db_session.query(JobPost).delete()
         db_session.commit()
+        bump_data_version(db_session.get_bind())
         logger.info("Base de datos limpiada correctamente")
     except Exception as e:
         db_session.rollback()
@@ -387,6 +530,64 @@ def clean_database():
     finally:
         db_session.close()
 
+RECLASSIFY_BATCH_SIZE = 5000
+
+def reclassify_posts(batch_size=RECLASSIFY_BATCH_SIZE):
+    """
+    Recalcula classification_score de los posts guardados con los pesos
+    actuales de job_indicators.json, por lotes y sin repetir el OCR.
+    
+    Solo se pueden reclasificar los posts que guardaron su texto OCR
+    (ocr_text). is_job_offer no cambia, porque los datos extraídos dependen de
+    él: se informa cuántos posts cambiarían de clase para reprocesarlos.
+    """
+    logger.info("Reclasificando posts guardados...")
+    db_session = init_db()
+    rescored = changed = flipped = 0
+    try:
+        without_text = db_session.query(JobPost).filter(JobPost.ocr_text.is_(None)).count()
+        
+        last_id = 0
+        while True:
+            # Paginación por id: cada lote se confirma sin mantener un cursor abierto
+            rows = db_session.query(
+                JobPost.id, JobPost.ocr_text, JobPost.description,
+                JobPost.classification_score, JobPost.is_job_offer
+            ).filter(
+                JobPost.id > last_id, JobPost.ocr_text.isnot(None)
+            ).order_by(JobPost.id).limit(batch_size).all()
+            if not rows:
+                break
+            
+            classifications = is_job_post_batch([row.ocr_text for row in rows],
+                                                [row.description for row in rows])
+            updates = []
+            for row, (is_job, _, score, _) in zip(rows, classifications):
+                if score != row.classification_score:
+                    updates.append({'id': row.id, 'classification_score': score})
+                if is_job != bool(row.is_job_offer):
+                    flipped += 1
+            
+            if updates:
+                db_session.bulk_update_mappings(JobPost, updates)
+                db_session.commit()
+            rescored += len(rows)
+            changed += len(updates)
+            last_id = rows[-1].id
+        
+        if changed:
+            bump_data_version(db_session.get_bind())
+        logger.info(f"Reclasificación completada: {rescored} posts, {changed} puntuaciones actualizadas")
+        if flipped:
+            logger.info(f"   {flipped} posts cambiarían de clase (oferta/no oferta); reprocesarlos para actualizar sus datos")
+        if without_text:
+            logger.info(f"   {without_text} posts sin texto OCR guardado no se reclasificaron")
+    except Exception as e:
+        db_session.rollback()
+        logger.error(f"Error al reclasificar posts: {e}")
+    finally:
+        db_session.close()
+
 def remove_duplicates_from_list(posts_list):
     """Elimina posts duplicados basándose en la URL"""
     seen_urls = set()
@@ -421,6 +622,7 @@ def main():
     logger.info(f"Posts a procesar: {args.posts}")
     logger.info(f"Tamaño de lote: {args.batch}")
     logger.info(f"Modo headless: {'Sí' if args.headless else 'No'}")
+    logger.info(f"Workers de scraping: {args.workers}")
     logger.info(f"Limpiar entorno: {'No' if args.no_clean else 'Sí'}")
     
     # Solo limpiar si se especifica
@@ -431,6 +633,10 @@ def main():
         logger.info("Limpieza completada. Saliendo...")
         return
     
+    if args.reclassify:
+        reclassify_posts()
+        return
+    
     # Limpiar entorno anterior (a menos que se especifique lo contrario)
     if not args.no_clean:
         clean_environment()
@@ -452,9 +658,28 @@ def main():
     logger.info(f"Cuenta objetivo: {target_account}")
     
     # Inicializar componentes
-    scraper = InstagramScraper(username, password, target_account, headless=args.headless)
-    image_processor = EnhancedImageProcessor()
+    scraper = InstagramScraper(username, password, target_account, headless=args.headless,
+                               incremental_grid=not args.no_grid_cursor)
+    ocr_cache = None if args.no_ocr_cache else OCRCache()
+    normalization_cache = None if args.no_normalization_cache else enable_normalization_cache()
+    debug_writer = DebugArtifactWriter(
+        level=args.debug_artifacts,
+        sample_every=args.debug_sample_every,
+        png_compress_level=args.debug_png_compression
+    )
+    image_processor = EnhancedImageProcessor(
+        ocr_cache=ocr_cache,
+        ocr_workers=args.ocr_workers,
+        early_exit_chars=args.ocr_early_exit_chars,
+        early_exit_confidence=args.ocr_early_exit_confidence,
+        selection=args.ocr_selection,
+        preprocess_profile=args.preprocess_profile,
+        preprocess_engine=args.preprocess_engine,
+        threshold_method=args.threshold,
+        debug_writer=debug_writer
+    )
     db_session = init_db()
+    post_writer = PostBatchWriter(db_session)
     
     try:
         # Proceso de scraping
@@ -468,6 +693,10 @@ def main():
             logger.error("ERROR: No se pudo acceder a la cuenta objetivo.")
             return
         
+        if args.workers > 1:
+            logger.info(f"Iniciando pool de {args.workers} workers ({args.requests_per_minute} posts/min máx.)...")
+            scraper.start_worker_pool(args.workers, requests_per_minute=args.requests_per_minute)
+        
         # CONFIGURACIÓN DINÁMICA BASADA EN ARGUMENTOS
         MAX_POSTS = args.posts
         BATCH_SIZE = min(args.batch, MAX_POSTS)
@@ -559,6 +788,7 @@ def main():
         results = []
         job_offers_found = 0
         duplicates_found = 0
+        save_failures = 0
         
         # Progreso más frecuente para volúmenes pequeños
         progress_interval = min(10, max(1, len(all_posts) // 10))
@@ -570,11 +800,12 @@ def main():
             total_batches = (len(all_posts) + PROCESSING_BATCH_SIZE - 1) // PROCESSING_BATCH_SIZE
             
             logger.info(f"Procesando lote {batch_num}/{total_batches}")
+            batch_start = len(results)
             
             for post_idx, post in enumerate(batch):
                 post_count = i + post_idx + 1
                 try:
-                    result = analyze_and_save_post(post, post_count, image_processor, db_session)
+                    result = analyze_and_save_post(post, post_count, image_processor, post_writer, debug_writer)
                     results.append(result)
                     
                     if result['job_type'] == 'DUPLICADO':
@@ -592,6 +823,20 @@ def main():
                     logger.error(f"ERROR procesando post {post_count}: {str(e)}")
                     continue
             
+            # Guardar el lote completo en una sola transacción
+            post_ids = post_writer.flush()
+            for result in results[batch_start:]:
+                if result['post_id'] is not None or result['job_type'] == 'DUPLICADO':
+                    continue
+                result['post_id'] = post_ids.get(result['post_url'])
+                if result['post_id'] is None:
+                    # El post no se guardó: no cuenta como oferta ni como procesado con éxito
+                    result['save_failed'] = True
+                    save_failures += 1
+                    if result['is_job']:
+                        job_offers_found -= 1
+                        logger.warning(f"La oferta {result['post_url']} no se guardó y no se cuenta en el resumen")
+            
             # Pausa entre lotes de procesamiento
             if len(all_posts) > 50 and i + PROCESSING_BATCH_SIZE < len(all_posts):
                 time.sleep(random.uniform(0.5, 2))
@@ -600,12 +845,47 @@ def main():
         logger.info("\n=== RESUMEN DE RESULTADOS ===")
         logger.info(f"Posts procesados: {len(results)}")
         logger.info(f"Posts duplicados: {duplicates_found}")
+        
+        total_bytes = sum(r.get('bytes_fetched', 0) for r in results)
+        downloaded_posts = len(results) - duplicates_found
+        if downloaded_posts > 0:
+            logger.info(f"Imágenes descargadas: {total_bytes / (1024 * 1024):.1f} MB "
+                        f"({total_bytes / downloaded_posts / 1024:.1f} KB/post)")
         logger.info(f"Ofertas laborales encontradas: {job_offers_found}")
         
+        persistence_stats = post_writer.get_stats()
+        logger.info(f"Persistencia: {persistence_stats['posts_persisted']} posts en {persistence_stats['batches']} "
+                    f"transacciones ({persistence_stats['posts_per_second']:.1f} posts/s)")
+        if persistence_stats['posts_failed']:
+            logger.warning(f"Posts que no se pudieron guardar: {persistence_stats['posts_failed']}")
+        
+        if scraper.worker_pool:
+            pool_stats = scraper.worker_pool.get_stats()
+            logger.info(f"Throughput del pool: {pool_stats['posts_per_minute']:.1f} posts/min "
+                        f"con {pool_stats['workers']} workers")
+        
         if job_offers_found > 0:
-            success_rate = (job_offers_found / (len(results) - duplicates_found)) * 100
+            success_rate = (job_offers_found / (len(results) - duplicates_found - save_failures)) * 100
             logger.info(f"Tasa de éxito: {success_rate:.1f}%")
         
+        if ocr_cache is not None:
+            cache_stats = ocr_cache.get_stats()
+            logger.info(f"Caché OCR: {cache_stats['hits']} aciertos, {cache_stats['misses']} fallos "
+                        f"({cache_stats['hit_rate']:.1f}% de aciertos)")
+        
+        if normalization_cache is not None:
+            normalization_stats = normalization_cache.get_stats()
+            logger.info(f"Caché de normalización: {normalization_stats['token_hit_rate']:.1f}% de aciertos en palabras, "
+                        f"{normalization_stats['line_hit_rate']:.1f}% en líneas "
+                        f"(~{normalization_stats['seconds_saved']:.2f}s ahorrados)")
+        
+        if debug_writer.enabled:
+            debug_writer.flush()
+            debug_stats = debug_writer.get_stats()
+            logger.info(f"Artefactos de depuración ({debug_stats['level']}): {debug_stats['written']} escritos, "
+                        f"{debug_stats['skipped']} omitidos, {debug_stats['dropped']} descartados por cola llena "
+                        f"({debug_stats['write_seconds']:.1f}s de escritura en segundo plano)")
+        
         # Estadísticas detalladas
         stats = get_job_statistics(db_session)
         logger.info(f"Total posts en BD: {stats['total_posts']}")
@@ -626,7 +906,7 @@ def main():
         # Mostrar ofertas encontradas
         if job_offers_found > 0:
             logger.info(f"\nOfertas encontradas en esta ejecución:")
-            for i, result in enumerate([r for r in results if r['is_job']], 1):
+            for i, result in enumerate([r for r in results if r['is_job'] and not r['save_failed']], 1):
                 logger.info(f"{i:2d}. {result['company'] or 'Empresa no identificada'}")
                 logger.info(f"     Tipo: {result['job_type']}")
                 if result['contact_email']:
@@ -642,9 +922,22 @@ def main():
         logger.error(f"ERROR crítico: {str(e)}")
         raise
     finally:
-        # Cerrar recursos
+        # Cerrar recursos (guardando lo que haya quedado pendiente, p. ej. tras Ctrl+C)
+        try:
+            post_writer.flush()
+        except Exception as e:
+            logger.error(f"Error al guardar los posts pendientes: {e}")
         scraper.close()
+        image_processor.close()
         db_session.close()
+        if ocr_cache is not None:
+            ocr_cache.close()
+        if normalization_cache is not None:
+            try:
+                normalization_cache.save()
+            except OSError as e:
+                logger.error(f"Error al guardar la caché de normalización: {e}")
+        debug_writer.close()
         logger.info("Recursos liberados correctamente")
 
 if __name__ == "__main__":
@@ -1,21 +1,74 @@
 ﻿# -*- coding: utf-8 -*-
 import os
 import sys
+import csv
 import json
-import pandas as pd
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from sqlalchemy import func, Integer
 
 # Añadir el directorio raíz al path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.database.models import init_db, JobPost, JobData, AnalysisMetrics
+from src.database.models import init_db, JobPost, JobData, AnalysisMetrics, get_aggregate_counters
+
+# Filas leídas de la base por lote al exportar
+EXPORT_BATCH_SIZE = 5000
+
+# Límite de filas de una hoja de Excel (incluido el encabezado)
+EXCEL_MAX_ROWS = 1048576
+
+OFFER_COLUMNS = [
+    'URL_Post', 'Fecha_Post', 'Es_Oferta', 'Puntuacion_Clasificacion',
+    'Empresa', 'Industria', 'Tipo_Trabajo', 'Titulo_Puesto',
+    'Modalidad_Trabajo', 'Duracion', 'Nombre_Contacto', 'Posicion_Contacto',
+    'Email_Contacto', 'Telefono_Contacto', 'Experiencia_Requerida',
+    'Educacion_Requerida', 'Activa', 'Fecha_Extraccion'
+]
+
+class _SheetWriter:
+    """
+    Hoja de un Workbook write-only con encabezado en negrita.
+    
+    Si se alcanza el límite de filas de Excel, continúa en una hoja nueva
+    ('Todas_las_Ofertas_2', ...) en lugar de generar un archivo inválido.
+    """
+    
+    def __init__(self, workbook, title, columns):
+        self.workbook = workbook
+        self.title = title
+        self.columns = columns
+        self.rows = 0
+        self.sheets = 0
+        self._new_sheet()
+    
+    def _new_sheet(self):
+        self.sheets += 1
+        title = self.title if self.sheets == 1 else f"{self.title}_{self.sheets}"
+        self.sheet = self.workbook.create_sheet(title[:31])
+        header = []
+        for name in self.columns:
+            cell = WriteOnlyCell(self.sheet, value=name)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        self.sheet.append(header)
+        self._sheet_rows = 1
+    
+    def append(self, row):
+        if self._sheet_rows >= EXCEL_MAX_ROWS:
+            self._new_sheet()
+        self.sheet.append(tuple(row))
+        self._sheet_rows += 1
+        self.rows += 1
 
 class JobAnalysisReporter:
     """Generador de reportes y análisis de ofertas laborales"""
     
-    def __init__(self, db_path='sqlite:///data/database.db'):
-        self.db_session = init_db(db_path)
+    def __init__(self, db_path='sqlite:///data/database.db', db_session=None):
+        # Una sesión inyectada (p. ej. por las tareas del dashboard) evita abrir otra base
+        self.db_session = db_session if db_session is not None else init_db(db_path)
     
     def generate_summary_report(self):
         """Genera un reporte resumen de todas las ofertas"""
@@ -24,10 +77,11 @@ class JobAnalysisReporter:
         print("REPORTE RESUMEN DE OFERTAS LABORALES")
         print("=" * 60)
         
-        # Estadísticas generales
-        total_posts = self.db_session.query(JobPost).count()
-        job_offers = self.db_session.query(JobPost).filter(JobPost.is_job_offer == True).count()
-        active_offers = self.db_session.query(JobData).filter(JobData.is_active == True).count()
+        # Estadísticas generales (una sola consulta agregada)
+        counters = get_aggregate_counters(self.db_session)
+        total_posts = counters['total_posts']
+        job_offers = counters['job_offers']
+        active_offers = counters['active_records']
         
         print(f":bar_chart: ESTADÍSTICAS GENERALES")
         print(f"   Total de posts analizados: {total_posts}")
@@ -133,14 +187,9 @@ class JobAnalysisReporter:
             print(f"   :link: Post: {offer.post.post_url}")
             print(f"   :date: Publicado: {offer.post.post_date.strftime('%d/%m/%Y')}")
     
-    def export_to_excel(self, filename=None):
-        """Exporta los datos a un archivo Excel"""
-        
-        if filename is None:
-            filename = f"ofertas_laborales_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        
-        # Consultar datos
-        query = self.db_session.query(
+    def _offer_export_query(self):
+        """Columnas de la hoja de ofertas, en el orden de OFFER_COLUMNS"""
+        return self.db_session.query(
             JobPost.post_url,
             JobPost.post_date,
             JobPost.is_job_offer,
@@ -160,52 +209,65 @@ class JobAnalysisReporter:
             JobData.is_active,
             JobData.extracted_at
         ).join(JobData).filter(JobPost.is_job_offer == True)
+    
+    def export_to_excel(self, filename=None, batch_size=EXPORT_BATCH_SIZE):
+        """
+        Exporta los datos a un archivo Excel.
         
-        # Convertir a DataFrame
-        df = pd.DataFrame(query.all(), columns=[
-            'URL_Post', 'Fecha_Post', 'Es_Oferta', 'Puntuacion_Clasificacion',
-            'Empresa', 'Industria', 'Tipo_Trabajo', 'Titulo_Puesto',
-            'Modalidad_Trabajo', 'Duracion', 'Nombre_Contacto', 'Posicion_Contacto',
-            'Email_Contacto', 'Telefono_Contacto', 'Experiencia_Requerida',
-            'Educacion_Requerida', 'Activa', 'Fecha_Extraccion'
-        ])
-        
-        # Crear archivo Excel con múltiples hojas
-        with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-            # Hoja principal con todas las ofertas
-            df.to_excel(writer, sheet_name='Todas_las_Ofertas', index=False)
-            
-            # Hoja solo con ofertas activas
-            active_df = df[df['Activa'] == True]
-            active_df.to_excel(writer, sheet_name='Ofertas_Activas', index=False)
-            
-            # Hoja de estadísticas por empresa
-            company_stats = df.groupby('Empresa').agg({
-                'URL_Post': 'count',
-                'Activa': 'sum',
-                'Fecha_Post': 'max'
-            }).rename(columns={
-                'URL_Post': 'Total_Ofertas',
-                'Activa': 'Ofertas_Activas',
-                'Fecha_Post': 'Ultima_Oferta'
-            }).reset_index()
-            company_stats.to_excel(writer, sheet_name='Estadisticas_Empresas', index=False)
-            
-            # Hoja de estadísticas por tipo de trabajo
-            job_type_stats = df.groupby('Tipo_Trabajo').agg({
-                'URL_Post': 'count',
-                'Activa': 'sum'
-            }).rename(columns={
-                'URL_Post': 'Total_Ofertas',
-                'Activa': 'Ofertas_Activas'
-            }).reset_index()
-            job_type_stats.to_excel(writer, sheet_name='Estadisticas_Tipo_Trabajo', index=False)
-        
-        print(f":white_check_mark: Datos exportados exitosamente a: {filename}")
+        Las filas se leen por lotes (yield_per) y se escriben con openpyxl en
+        modo write-only, así que la memoria no depende del número de ofertas.
+        Las hojas de estadísticas se calculan con GROUP BY en la base.
+        """
+        
+        if filename is None:
+            filename = f"ofertas_laborales_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        
+        workbook = Workbook(write_only=True)
+        all_offers = _SheetWriter(workbook, 'Todas_las_Ofertas', OFFER_COLUMNS)
+        active_offers = _SheetWriter(workbook, 'Ofertas_Activas', OFFER_COLUMNS)
+        
+        # Una sola pasada: las dos hojas se escriben a la vez
+        active_index = OFFER_COLUMNS.index('Activa')
+        for row in self._offer_export_query().yield_per(batch_size):
+            all_offers.append(row)
+            if row[active_index]:
+                active_offers.append(row)
+        
+        # Hoja de estadísticas por empresa
+        company_stats = self.db_session.query(
+            JobData.company_name,
+            func.count(JobData.id),
+            func.sum(JobData.is_active.cast(Integer)),
+            func.max(JobPost.post_date)
+        ).join(JobPost).filter(
+            JobPost.is_job_offer == True,
+            JobData.company_name.isnot(None)
+        ).group_by(JobData.company_name).order_by(JobData.company_name)
+        sheet = _SheetWriter(workbook, 'Estadisticas_Empresas',
+                             ['Empresa', 'Total_Ofertas', 'Ofertas_Activas', 'Ultima_Oferta'])
+        for row in company_stats.yield_per(batch_size):
+            sheet.append(row)
+        
+        # Hoja de estadísticas por tipo de trabajo
+        job_type_stats = self.db_session.query(
+            JobData.job_type,
+            func.count(JobData.id),
+            func.sum(JobData.is_active.cast(Integer))
+        ).join(JobPost).filter(
+            JobPost.is_job_offer == True,
+            JobData.job_type.isnot(None)
+        ).group_by(JobData.job_type).order_by(JobData.job_type)
+        sheet = _SheetWriter(workbook, 'Estadisticas_Tipo_Trabajo',
+                             ['Tipo_Trabajo', 'Total_Ofertas', 'Ofertas_Activas'])
+        for row in job_type_stats:
+            sheet.append(row)
+        
+        workbook.save(filename)
+        print(f":white_check_mark: Datos exportados exitosamente a: {filename} ({all_offers.rows} ofertas)")
         return filename
     
-    def export_contacts_csv(self, filename=None):
-        """Exporta solo la información de contactos a CSV"""
+    def export_contacts_csv(self, filename=None, batch_size=EXPORT_BATCH_SIZE):
+        """Exporta solo la información de contactos a CSV, fila por fila"""
         
         if filename is None:
             filename = f"contactos_ofertas_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
@@ -225,12 +287,14 @@ class JobAnalysisReporter:
             JobData.contact_email.isnot(None)
         )
         
-        df = pd.DataFrame(query.all(), columns=[
-            'Empresa', 'Nombre_Contacto', 'Posicion_Contacto', 'Email',
-            'Telefono', 'Tipo_Trabajo', 'Titulo_Puesto', 'URL_Post'
-        ])
+        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow([
+                'Empresa', 'Nombre_Contacto', 'Posicion_Contacto', 'Email',
+                'Telefono', 'Tipo_Trabajo', 'Titulo_Puesto', 'URL_Post'
+            ])
+            writer.writerows(query.yield_per(batch_size))
         
-        df.to_csv(filename, index=False, encoding='utf-8-sig')
         print(f":white_check_mark: Contactos exportados exitosamente a: {filename}")
         return filename
     
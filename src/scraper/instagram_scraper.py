@@ -17,11 +17,12 @@ import pickle
 import re
 
 class InstagramScraper:
-    def __init__(self, username, password, target_account, headless=False):
+    def __init__(self, username, password, target_account, headless=False, incremental_grid=True):
         self.username = username
         self.password = password
         self.target_account = target_account
         self.base_url = "https://www.instagram.com/"
+        self.headless = headless
         self.posts = []
         
         # Control mejorado de navegación y duplicados
@@ -31,6 +32,13 @@ class InstagramScraper:
         self.max_failed_navigations = 2
         self.browser_crashed = False
         
+        # Pool opcional de navegadores para visitar posts en paralelo
+        self.worker_pool = None
+        
+        # Cursor persistente sobre la grilla del perfil (evita re-scrollear desde arriba)
+        self.incremental_grid = incremental_grid
+        self.grid_cursor = self._new_grid_cursor()
+        
         # Configurar logging
         logging.basicConfig(
             level=logging.INFO,
@@ -109,6 +117,8 @@ class InstagramScraper:
             
             # Reinicializar
             chrome_options = Options()
+            if self.headless:
+                chrome_options.add_argument("--headless")
             chrome_options.add_argument("--no-sandbox")
             chrome_options.add_argument("--disable-dev-shm-usage")
             chrome_options.add_argument("--disable-gpu")
@@ -123,6 +133,9 @@ class InstagramScraper:
             self.wait = WebDriverWait(self.driver, 15)
             self.browser_crashed = False
             
+            # Las pestañas del cursor murieron con el navegador anterior
+            self._reset_grid_tabs()
+            
             # Recargar cookies si existen
             self.load_cookies()
             
@@ -231,7 +244,11 @@ class InstagramScraper:
             posts_data = []
             
             # ESTRATEGIA NUEVA: Obtener URLs únicas considerando posts ya procesados
-            all_available_urls = self._get_chronological_post_urls(limit * 3)
+            if self.incremental_grid:
+                # El cursor solo devuelve URLs nuevas, no hace falta pedir de más
+                all_available_urls = self._get_incremental_post_urls(limit)
+            else:
+                all_available_urls = self._get_chronological_post_urls(limit * 3)
             
             if not all_available_urls:
                 self.logger.error("No se pudieron obtener URLs de posts")
@@ -253,63 +270,33 @@ class InstagramScraper:
             self.logger.info(f"📋 URLs únicas para procesar: {len(new_urls)}")
             self.logger.info(f"📊 URLs ya procesadas anteriormente: {len(self.processed_urls)}")
             
-            # Procesar posts de uno en uno con mejor manejo de errores
-            for i, post_url in enumerate(new_urls):
-                try:
-                    if not self._is_browser_alive():
-                        self.logger.warning("🔄 Navegador cerrado, reinicializando...")
-                        if not self._reinitialize_browser():
-                            break
-                    
+            # Marcar como procesadas ANTES de intentar extraer
+            for post_url in new_urls:
+                self.processed_urls.add(post_url.split('?')[0])
+            
+            if self.worker_pool:
+                # Modo concurrente: varios navegadores consumen la cola de URLs
+                posts_data = self.worker_pool.scrape(new_urls)
+                self.session_posts.extend(posts_data)
+            else:
+                # Visitar los posts en otra pestaña para no perder el scroll del perfil
+                if self.incremental_grid:
+                    self._switch_to_detail_tab()
+                
+                # Procesar posts de uno en uno con mejor manejo de errores
+                for i, post_url in enumerate(new_urls):
                     post_id = self._extract_post_id(post_url)
                     self.logger.info(f"🔍 Procesando post {i+1}/{len(new_urls)}: {post_id}")
                     
-                    # Marcar como procesado ANTES de intentar extraer
-                    clean_url = post_url.split('?')[0]
-                    self.processed_urls.add(clean_url)
-                    
-                    # Navegar al post con retry
-                    success = False
-                    for attempt in range(2):
-                        try:
-                            self.driver.get(post_url)
-                            self.random_sleep(2, 4)
-                            
-                            if self._wait_for_post_load():
-                                success = True
-                                break
-                            else:
-                                self.logger.warning(f"⚠️ Intento {attempt + 1}: Post no cargó")
-                        except Exception as e:
-                            self.logger.warning(f"⚠️ Intento {attempt + 1} falló: {str(e)}")
-                            if not self._is_browser_alive():
-                                if not self._reinitialize_browser():
-                                    break
-                    
-                    if not success:
-                        self.logger.warning(f"⚠️ No se pudo cargar post: {post_url}")
-                        continue
-                    
-                    # Cerrar popups
-                    self._close_popups()
-                    
-                    # Extraer datos
-                    post_data = self._extract_post_data_improved()
-                    
-                    if post_data and post_data.get('image_url'):
+                    post_data = self.scrape_single_post(post_url)
+                    if post_data:
                         posts_data.append(post_data)
                         self.session_posts.append(post_data)
                         self.logger.info(f"✅ Post {i+1} extraído: {post_id}")
-                    else:
-                        self.logger.warning(f"⚠️ No se extrajeron datos válidos: {post_url}")
                     
                     # Pausa entre posts
                     if i < len(new_urls) - 1:
                         self.random_sleep(2, 4)
-                
-                except Exception as e:
-                    self.logger.error(f"❌ Error procesando {post_url}: {str(e)}")
-                    continue
             
             self.posts = posts_data
             self.logger.info(f"🎉 Extracción completada: {len(posts_data)} posts únicos extraídos")
@@ -322,6 +309,73 @@ class InstagramScraper:
             self._save_debug_screenshot("critical_error")
             return []
 
+    def scrape_single_post(self, post_url, pace=True):
+        """Visita un post y devuelve sus datos, o None si no se pudo extraer.
+        
+        Con pace=False se omite la pausa "humana" tras cargar la página; la usa
+        el pool de workers, donde el ritmo lo marca el limitador global.
+        """
+        try:
+            if not self._is_browser_alive():
+                self.logger.warning("🔄 Navegador cerrado, reinicializando...")
+                if not self._reinitialize_browser():
+                    return None
+            
+            # Navegar al post con retry
+            success = False
+            for attempt in range(2):
+                try:
+                    self.driver.get(post_url)
+                    if pace:
+                        self.random_sleep(2, 4)
+                    
+                    if self._wait_for_post_load():
+                        success = True
+                        break
+                    else:
+                        self.logger.warning(f"⚠️ Intento {attempt + 1}: Post no cargó")
+                except Exception as e:
+                    self.logger.warning(f"⚠️ Intento {attempt + 1} falló: {str(e)}")
+                    if not self._is_browser_alive():
+                        if not self._reinitialize_browser():
+                            break
+            
+            if not success:
+                self.logger.warning(f"⚠️ No se pudo cargar post: {post_url}")
+                return None
+            
+            # Cerrar popups
+            self._close_popups()
+            
+            # Extraer datos
+            post_data = self._extract_post_data_improved()
+            
+            if post_data and post_data.get('image_url'):
+                return post_data
+            
+            self.logger.warning(f"⚠️ No se extrajeron datos válidos: {post_url}")
+            return None
+        
+        except Exception as e:
+            self.logger.error(f"❌ Error procesando {post_url}: {str(e)}")
+            return None
+
+    def start_worker_pool(self, workers, requests_per_minute=40, headless=True):
+        """Arranca un pool de navegadores para visitar posts en paralelo"""
+        from src.scraper.worker_pool import PostWorkerPool
+        
+        # Los workers reutilizan la sesión de este navegador a través del archivo de cookies
+        self.save_cookies()
+        
+        self.worker_pool = PostWorkerPool(
+            self.username, self.password, self.target_account,
+            workers=workers,
+            requests_per_minute=requests_per_minute,
+            headless=headless
+        )
+        self.worker_pool.start()
+        return self.worker_pool
+
     def _get_chronological_post_urls(self, target_count=30):
         """Obtiene URLs en orden cronológico (más nuevos primero) SIN duplicados"""
         try:
@@ -398,6 +452,131 @@ class InstagramScraper:
             self.logger.error(f"❌ Error obteniendo URLs cronológicas: {str(e)}")
             return []
 
+    def _new_grid_cursor(self):
+        """Estado inicial del cursor sobre la grilla del perfil"""
+        return {
+            "profile_handle": None,   # Pestaña que mantiene el perfil abierto
+            "detail_handle": None,    # Pestaña usada para visitar cada post
+            "last_shortcode": None,   # Último post cosechado de la grilla
+            "scroll_y": 0,            # Posición de scroll alcanzada en el perfil
+            "seen": set(),            # URLs limpias ya cosechadas
+            "pending": [],            # URLs cosechadas aún no entregadas
+        }
+
+    def _reset_grid_tabs(self):
+        """Olvida las pestañas del cursor (p. ej. tras reinicializar el navegador)"""
+        self.grid_cursor["profile_handle"] = None
+        self.grid_cursor["detail_handle"] = None
+
+    def _ensure_profile_tab(self):
+        """Cambia a la pestaña del perfil, abriéndola solo si no existe"""
+        cursor = self.grid_cursor
+        handles = self.driver.window_handles
+        
+        if cursor["profile_handle"] in handles:
+            self.driver.switch_to.window(cursor["profile_handle"])
+            return
+        
+        self.logger.info("📥 Abriendo pestaña persistente del perfil...")
+        if self.driver.current_window_handle == cursor["detail_handle"]:
+            self.driver.switch_to.new_window('tab')
+        cursor["profile_handle"] = self.driver.current_window_handle
+        profile_url = f"{self.base_url}{self.target_account}/"
+        if self.driver.current_url.split('?')[0].rstrip('/') != profile_url.rstrip('/'):
+            self.driver.get(profile_url)
+            self.random_sleep(3, 5)
+        
+        # Tras un reinicio, volver hasta donde había llegado el scroll
+        if cursor["scroll_y"]:
+            self.driver.execute_script("window.scrollTo(0, arguments[0]);", cursor["scroll_y"])
+            self.random_sleep(2, 3)
+
+    def _switch_to_detail_tab(self):
+        """Cambia a la pestaña de detalle, creándola la primera vez"""
+        cursor = self.grid_cursor
+        if cursor["detail_handle"] in self.driver.window_handles:
+            self.driver.switch_to.window(cursor["detail_handle"])
+            return
+        
+        self.driver.switch_to.new_window('tab')
+        cursor["detail_handle"] = self.driver.current_window_handle
+
+    def _harvest_new_grid_links(self):
+        """Devuelve solo los enlaces de la grilla que no se habían cosechado antes"""
+        # Marcar los anclas en el DOM evita volver a leer las ya vistas
+        hrefs = self.driver.execute_script(
+            "var links = document.querySelectorAll(\"a[href*='/p/']:not([data-grid-seen])\");"
+            "var out = [];"
+            "for (var i = 0; i < links.length; i++) {"
+            "  links[i].setAttribute('data-grid-seen', '1');"
+            "  out.push(links[i].href);"
+            "}"
+            "return out;"
+        ) or []
+        
+        new_urls = []
+        for href in hrefs:
+            if not href or '/p/' not in href:
+                continue
+            clean_href = href.split('?')[0]
+            if clean_href in self.grid_cursor["seen"]:
+                continue
+            self.grid_cursor["seen"].add(clean_href)
+            new_urls.append(href)
+        
+        if new_urls:
+            self.grid_cursor["last_shortcode"] = self._extract_post_id(new_urls[-1])
+        return new_urls
+
+    def _get_incremental_post_urls(self, target_count=10):
+        """Obtiene URLs nuevas continuando el scroll del perfil donde quedó el lote anterior"""
+        try:
+            if not self._is_browser_alive():
+                if not self._reinitialize_browser():
+                    return []
+            
+            cursor = self.grid_cursor
+            self._ensure_profile_tab()
+            
+            self.logger.info(f"📥 Continuando grilla desde {cursor['last_shortcode'] or 'el inicio'} "
+                             f"(scroll {cursor['scroll_y']}px, {len(cursor['pending'])} pendientes)")
+            
+            scroll_attempts = 0
+            max_scrolls = 8
+            no_new_content_count = 0
+            
+            while len(cursor["pending"]) < target_count and scroll_attempts < max_scrolls:
+                new_urls = [url for url in self._harvest_new_grid_links()
+                            if url.split('?')[0] not in self.processed_urls]
+                cursor["pending"].extend(new_urls)
+                
+                if new_urls:
+                    self.logger.info(f"📋 Encontradas {len(new_urls)} URLs nuevas. Pendientes: {len(cursor['pending'])}")
+                    no_new_content_count = 0
+                else:
+                    no_new_content_count += 1
+                    self.logger.debug(f"Sin contenido nuevo en scroll {scroll_attempts + 1}")
+                
+                if no_new_content_count >= 3:
+                    self.logger.info("No se encuentra más contenido nuevo")
+                    break
+                
+                if len(cursor["pending"]) < target_count:
+                    self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                    self.random_sleep(2, 3)
+                    cursor["scroll_y"] = self.driver.execute_script("return window.scrollY;") or cursor["scroll_y"]
+                    scroll_attempts += 1
+            
+            batch = cursor["pending"][:target_count]
+            cursor["pending"] = cursor["pending"][target_count:]
+            
+            self.logger.info(f"✅ URLs nuevas entregadas: {len(batch)} (total cosechadas: {len(cursor['seen'])})")
+            return batch
+            
+        except Exception as e:
+            self.logger.error(f"❌ Error obteniendo URLs incrementales: {str(e)}")
+            return []
+
     def _wait_for_post_load(self, timeout=10):
         """Espera a que el post se cargue completamente"""
         try:
@@ -782,6 +961,10 @@ class InstagramScraper:
 
     def close(self):
         """Cierra el navegador de manera segura"""
+        if self.worker_pool:
+            self.worker_pool.close()
+            self.worker_pool = None
+        
         try:
             if hasattr(self, 'driver') and not self.browser_crashed:
                 self.driver.quit()
@@ -0,0 +1,133 @@
+﻿# -*- coding: utf-8 -*-
+import time
+import queue
+import logging
+import threading
+
+from src.scraper.instagram_scraper import InstagramScraper
+
+
+class RateLimiter:
+    """Limitador global de peticiones compartido por todos los workers.
+    
+    Reparte las peticiones de forma uniforme: con un presupuesto de N peticiones
+    por minuto, dos peticiones consecutivas nunca salen con menos de 60/N segundos
+    de diferencia, sin importar cuántos workers haya.
+    """
+    
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Bloquea hasta que el presupuesto permita la siguiente petición"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+
+
+class PostWorkerPool:
+    """Pool de navegadores headless que visitan posts en paralelo.
+    
+    Cada worker es un InstagramScraper independiente (con su propia recuperación
+    de crashes vía _reinitialize_browser) que reutiliza la sesión guardada con
+    save_cookies. Todos consumen la misma cola de URLs y respetan un limitador
+    global, de modo que el throughput escala con el número de workers hasta
+    agotar el presupuesto de peticiones por minuto.
+    """
+    
+    def __init__(self, username, password, target_account, workers=2,
+                 requests_per_minute=40, headless=True, share_cookies=True):
+        self.username = username
+        self.password = password
+        self.target_account = target_account
+        self.num_workers = max(1, workers)
+        self.headless = headless
+        self.share_cookies = share_cookies
+        self.rate_limiter = RateLimiter(requests_per_minute)
+        self.workers = []
+        self.logger = logging.getLogger(__name__)
+        
+        # Métricas acumuladas
+        self.posts_scraped = 0
+        self.posts_failed = 0
+        self.busy_seconds = 0.0
+    
+    def start(self):
+        """Inicializa los navegadores de los workers"""
+        for i in range(self.num_workers):
+            worker = InstagramScraper(
+                self.username, self.password, self.target_account,
+                headless=self.headless, incremental_grid=False
+            )
+            if self.share_cookies:
+                worker.load_cookies()
+            self.workers.append(worker)
+            self.logger.info(f"Worker {i + 1}/{self.num_workers} listo")
+        
+        return self
+    
+    def _run_worker(self, worker, url_queue, results):
+        while True:
+            try:
+                index, post_url = url_queue.get_nowait()
+            except queue.Empty:
+                return
+            
+            self.rate_limiter.acquire()
+            results[index] = worker.scrape_single_post(post_url, pace=False)
+    
+    def scrape(self, post_urls):
+        """Visita las URLs en paralelo y devuelve los posts extraídos en el orden original"""
+        if not self.workers:
+            self.start()
+        
+        url_queue = queue.Queue()
+        for index, post_url in enumerate(post_urls):
+            url_queue.put((index, post_url))
+        
+        results = [None] * len(post_urls)
+        start_time = time.perf_counter()
+        
+        threads = [
+            threading.Thread(target=self._run_worker, args=(worker, url_queue, results), daemon=True)
+            for worker in self.workers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        elapsed = time.perf_counter() - start_time
+        posts_data = [post for post in results if post]
+        
+        self.posts_scraped += len(posts_data)
+        self.posts_failed += len(post_urls) - len(posts_data)
+        self.busy_seconds += elapsed
+        
+        if elapsed > 0:
+            self.logger.info(f"⚡ {len(posts_data)}/{len(post_urls)} posts con {len(self.workers)} workers "
+                             f"en {elapsed:.1f}s ({len(posts_data) / elapsed * 60:.1f} posts/min)")
+        
+        return posts_data
+    
+    def get_stats(self):
+        """Devuelve estadísticas del pool"""
+        return {
+            "workers": len(self.workers),
+            "posts_scraped": self.posts_scraped,
+            "posts_failed": self.posts_failed,
+            "posts_per_minute": (self.posts_scraped / self.busy_seconds * 60) if self.busy_seconds else 0.0,
+        }
+    
+    def close(self):
+        """Cierra todos los navegadores del pool"""
+        for worker in self.workers:
+            worker.close()
+        self.workers = []
@@ -1,121 +1,332 @@
 ﻿# -*- coding: utf-8 -*-
+import os
 import re
+import json
+import hashlib
 import unicodedata
 import logging
-from typing import Dict, List, Optional, Tuple
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from src.text_analysis.normalization_cache import NormalizationCache
 
 logger = logging.getLogger(__name__)
 
-def normalize_text(text: str) -> str:
+# === REGLAS DE NORMALIZACIÓN (compiladas una sola vez) ===
+#
+# Los diccionarios de reemplazos palabra -> palabra se unen en una sola
+# alternativa con un callback de búsqueda en tabla, en lugar de un re.sub por
+# entrada. Se omiten las entradas que nunca podían tener efecto: reemplazos
+# idénticos y variantes de mayúsculas ya cubiertas por IGNORECASE.
+
+# 1. Patrón "IA" mal interpretado (muy común en OCR)
+IA_PATTERNS = [
+    (re.compile(r'\bIA\b'), 'ia'),  # IA como palabra completa ? ia
+    (re.compile(r'IA([a-z])'), r'ia\1'),  # IA seguido de minúscula ? ia
+    (re.compile(r'([A-Z])IA([a-z])'), r'\1ia\2'),  # CompanIA ? Compania
+]
+
+# 2. Correcciones de acentos perdidos (sin distinguir mayúsculas)
+ACCENT_WORDS = {
+    'ultimo': 'último',
+    'ultima': 'última',
+    'practica': 'práctica',
+    'academico': 'académico',
+    'academica': 'académica',
+    'tecnico': 'técnico',
+    'tecnica': 'técnica',
+    'basico': 'básico',
+    'basica': 'básica',
+    'logica': 'Lógica',
+    'matematicas': 'matemáticas',
+}
+
+# 3. Errores de consonantes comunes (OCR confunde estas letras): (leído, probable).
+# Una palabra solo se corrige si no está en el léxico y la corrección sí.
+CONSONANT_CONFUSIONS = [
+    ('rn', 'm'),
+    ('cl', 'd'),
+    ('li', 'h'),
+]
+# Palabras (solo letras ASCII) que contienen alguna de las confusiones
+CONSONANT_WORD_PATTERN = re.compile(
+    r'\b[A-Za-z]*(?:' + '|'.join(wrong for wrong, _ in CONSONANT_CONFUSIONS) + r')[A-Za-z]*\b'
+)
+LEXICON_PATH = os.getenv(
+    'LEXICON_ES', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexicon_es.txt')
+)
+
+# 4. Sufijos comunes: -cion ? -ción, -sion ? -sión (precedidos de al menos una letra)
+SUFFIX_PATTERN = re.compile(r'(?<=[a-zA-Z])([cs])ion\b')
+
+# 5. Palabras técnicas comunes (sin distinguir mayúsculas)
+TECH_WORDS = {
+    's3L': 'SQL',
+    'Mys3L': 'MySQL',
+    'Postgres3L': 'PostgreSQL',
+    'SIMUhNK': 'SIMULINK',
+    'pythOn': 'Python',
+    'Javascript': 'JavaScript',
+}
+
+# 6. Correcciones de 'h' perdida o mal colocada: (literal, patrón, reemplazo)
+H_PATTERNS = [
+    ('idad', re.compile(r'\b([a-zA-Z]*?)l([a-zA-Z]*?)idad\b'), r'\1bilidad'),  # habihdad ? habilidad
+    ('dades', re.compile(r'\b([a-zA-Z]*?)l([a-zA-Z]*?)dades\b'), r'\1bilidades'),
+]
+
+# 7. Nombres propios comunes (distinguiendo mayúsculas)
+PROPER_NAME_WORDS = {
+    'Panamena': 'Panameña',
+    'AvIAcion': 'Aviación',
+    'IngenierIA': 'Ingeniería',
+    'ExperiencIA': 'Experiencia',
+}
+
+# 8. Espacios múltiples y caracteres extraños
+WHITESPACE_PATTERN = re.compile(r'\s+')
+STRAY_CHARS_PATTERN = re.compile(r'[^\w\s\.,;:()\-+@áéíóúñü]')
+
+def word_span_finder(pattern: re.Pattern) -> re.Pattern:
     """
-    Sistema de normalización escalable para errores de OCR comunes.
-    Aplica correcciones generales que funcionan para cualquier texto.
+    Versión codiciosa de un patrón \\b([letras]*?)x([letras]*?)\\b.
+    
+    Encuentra exactamente las mismas palabras, porque \\b solo puede cumplirse
+    al final de la secuencia de letras, pero con mucho menos retroceso. Los
+    grupos del patrón original se aplican después sobre cada palabra.
+    """
+    return re.compile(pattern.pattern.replace('*?', '*'))
+
+def compile_word_replacements(replacements: Dict[str, str], ignore_case: bool = False):
+    """
+    Une un diccionario palabra -> reemplazo en una sola expresión regular.
+    
+    Returns:
+        Función que aplica todos los reemplazos en una pasada sobre un texto
+    """
+    words = sorted(replacements, key=len, reverse=True)
+    # La anticipación de la primera letra descarta rápido las posiciones que no sirven
+    first_letters = {word[0] for word in words}
+    if ignore_case:
+        first_letters |= {letter.swapcase() for letter in first_letters}
+    pattern = re.compile(
+        r'\b(?=[' + re.escape(''.join(sorted(first_letters))) + r'])(?:' + '|'.join(map(re.escape, words)) + r')\b',
+        re.IGNORECASE if ignore_case else 0
+    )
+    if ignore_case:
+        table = {word.lower(): replacement for word, replacement in replacements.items()}
+        return lambda text: pattern.sub(lambda match: table[match.group(0).lower()], text)
+    return lambda text: pattern.sub(lambda match: replacements[match.group(0)], text)
+
+_replace_accents = compile_word_replacements(ACCENT_WORDS, ignore_case=True)
+_replace_tech_words = compile_word_replacements(TECH_WORDS, ignore_case=True)
+_replace_proper_names = compile_word_replacements(PROPER_NAME_WORDS)
+_H_FINDERS = {literal: word_span_finder(pattern) for literal, pattern, _ in H_PATTERNS}
+
+def load_lexicon(path: str) -> FrozenSet[str]:
+    """Palabras de un archivo de léxico (una por línea, # para comentarios), en minúsculas"""
+    with open(path, encoding='utf-8') as f:
+        return frozenset(
+            line.strip().lower() for line in f if line.strip() and not line.startswith('#')
+        )
+
+LEXICON = load_lexicon(LEXICON_PATH)
+
+def lexicon_correction(word: str, corrected: str) -> str:
+    """La corrección solo si la palabra original no está en el léxico y la corregida sí"""
+    if corrected != word and word.lower() not in LEXICON and corrected.lower() in LEXICON:
+        return corrected
+    return word
+
+@lru_cache(maxsize=65536)
+def correct_consonants(word: str) -> str:
+    """
+    Corrige una confusión de consonantes del OCR en una palabra (cornpleto ? completo).
+    
+    Prueba cada aparición de cada confusión por separado y luego todas juntas,
+    y devuelve la primera variante que está en el léxico. Las palabras del
+    léxico, o sin ninguna variante válida, se devuelven sin cambios. La
+    decisión se memoriza por palabra.
+    """
+    if word.lower() in LEXICON:
+        return word
+    
+    for wrong, right in CONSONANT_CONFUSIONS:
+        start = word.find(wrong)
+        if start == -1:
+            continue
+        candidates = []
+        while start != -1:
+            candidates.append(word[:start] + right + word[start + len(wrong):])
+            start = word.find(wrong, start + 1)
+        if len(candidates) > 1:
+            candidates.append(word.replace(wrong, right))
+        for candidate in candidates:
+            if candidate.lower() in LEXICON:
+                return candidate
+    return word
+
+def fold_to_ascii(text: str) -> str:
+    """Descompone los caracteres Unicode y descarta lo que no es ASCII (tildes, emojis)"""
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
+
+def apply_normalization_rules(text: str) -> str:
+    """
+    Correcciones de normalize_text sin colapsar los espacios.
+    
+    Todas las reglas actúan dentro de una palabra (secuencia sin espacios), así
+    que normalizar varias palabras separadas por saltos de línea devuelve una
+    línea por palabra: la caché de normalización se apoya en esto.
     """
-    if not text:
-        return ""
-        
     # Normalizar caracteres Unicode
-    normalized = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8')
+    normalized = fold_to_ascii(text)
     
     # === CORRECCIONES GENERALES DE OCR ===
     
-    # 1. Patrón "IA" mal interpretado (muy común en OCR)
-    normalized = re.sub(r'\bIA\b', 'ia', normalized)  # IA como palabra completa ? ia
-    normalized = re.sub(r'IA([a-z])', r'ia\1', normalized)  # IA seguido de minúscula ? ia
-    normalized = re.sub(r'([A-Z])IA([a-z])', r'\1ia\2', normalized)  # CompanIA ? Compania
-    
-    # 2. Correcciones de acentos perdidos (patrones comunes)
-    accent_patterns = {
-        r'\bultimo\b': 'último',
-        r'\bultima\b': 'última',  
-        r'\bpractica\b': 'práctica',
-        r'\bPractica\b': 'Práctica',
-        r'\bacademico\b': 'académico',
-        r'\bacademica\b': 'académica',
-        r'\btecnico\b': 'técnico',
-        r'\btecnica\b': 'técnica',
-        r'\bbasico\b': 'básico',
-        r'\bbasica\b': 'básica',
-        r'\bLogica\b': 'Lógica',
-        r'\blogica\b': 'lógica',
-        r'\bmatematicas\b': 'matemáticas',
-        r'\bMatematicas\b': 'Matemáticas',
-    }
-    
-    for pattern, replacement in accent_patterns.items():
-        normalized = re.sub(pattern, replacement, normalized, flags=re.IGNORECASE)
+    # 1. Patrón "IA" mal interpretado
+    if 'IA' in normalized:
+        for pattern, replacement in IA_PATTERNS:
+            normalized = pattern.sub(replacement, normalized)
     
-    # 3. Errores de consonantes comunes (OCR confunde estas letras)
-    consonant_patterns = {
-        r'\b([A-Za-z]*?)rn([A-Za-z]*?)\b': r'\1m\2',  # 'rn' ? 'm'
-        r'\b([A-Za-z]*?)cl([A-Za-z]*?)\b': r'\1d\2',   # 'cl' ? 'd' 
-        r'\b([A-Za-z]*?)li([A-Za-z]*?)\b': r'\1h\2',   # 'li' ? 'h'
-        r'\bii\b': 'n',  # 'ii' ? 'n' cuando es palabra completa
-    }
+    # 2. Correcciones de acentos perdidos
+    normalized = _replace_accents(normalized)
     
-    for pattern, replacement in consonant_patterns.items():
-        # Solo aplicar si la palabra resultante tiene sentido
-        matches = re.finditer(pattern, normalized)
-        for match in matches:
-            original_word = match.group(0)
-            corrected = re.sub(pattern, replacement, original_word)
-            if len(corrected) >= 3:  # Evitar correcciones muy cortas
-                normalized = normalized.replace(original_word, corrected)
+    # 3. Errores de consonantes comunes: una pasada, palabra por palabra, validada con el léxico
+    if any(wrong in normalized for wrong, _ in CONSONANT_CONFUSIONS):
+        normalized = CONSONANT_WORD_PATTERN.sub(lambda match: correct_consonants(match.group(0)), normalized)
     
     # 4. Correcciones de sufijos comunes
-    suffix_patterns = {
-        r'([a-zA-Z]+?)cion\b': r'\1ción',  # -cion ? -ción
-        r'([a-zA-Z]+?)ciones\b': r'\1ciones',  # mantener si ya tiene tilde en otro lado
-        r'([a-zA-Z]+?)sion\b': r'\1sión',  # -sion ? -sión
-    }
-    
-    for pattern, replacement in suffix_patterns.items():
-        normalized = re.sub(pattern, replacement, normalized)
+    normalized = SUFFIX_PATTERN.sub(r'\1ión', normalized)
     
     # 5. Correcciones de palabras técnicas comunes
-    tech_patterns = {
-        r'\bs3L\b': 'SQL',
-        r'\bMys3L\b': 'MySQL',
-        r'\bPostgres3L\b': 'PostgreSQL',
-        r'\bSIMUhNK\b': 'SIMULINK',
-        r'\bMATLAB/SIMUhNK\b': 'MATLAB/SIMULINK',
-        r'\bpythOn\b': 'Python',
-        r'\bJavascript\b': 'JavaScript',
-        r'\bjavascript\b': 'JavaScript',
-    }
+    normalized = _replace_tech_words(normalized)
     
-    for pattern, replacement in tech_patterns.items():
-        normalized = re.sub(pattern, replacement, normalized, flags=re.IGNORECASE)
+    # 6. Correcciones de 'h' perdida o mal colocada (validadas con el léxico)
+    for literal, pattern, replacement in H_PATTERNS:
+        if literal in normalized:
+            normalized = _H_FINDERS[literal].sub(
+                lambda match: lexicon_correction(match.group(0), pattern.sub(replacement, match.group(0))),
+                normalized
+            )
     
-    # 6. Correcciones de 'h' perdida o mal colocada
-    h_patterns = {
-        r'\b([a-zA-Z]*?)l([a-zA-Z]*?)idad\b': r'\1bilidad',  # habihdad ? habilidad
-        r'\b([a-zA-Z]*?)l([a-zA-Z]*?)dades\b': r'\1bilidades',
-    }
+    # 7. Correcciones de nombres propios comunes
+    normalized = _replace_proper_names(normalized)
     
-    for pattern, replacement in h_patterns.items():
-        normalized = re.sub(pattern, replacement, normalized)
+    # 8. Limpiar caracteres extraños (los espacios se colapsan en normalize_text)
+    return STRAY_CHARS_PATTERN.sub(' ', normalized)
+
+# Huella de las reglas y del léxico: invalida la caché persistida cuando cambian
+with open(os.path.abspath(__file__), 'rb') as _rules_file, open(LEXICON_PATH, 'rb') as _lexicon_file:
+    NORMALIZATION_FINGERPRINT = hashlib.sha256(_rules_file.read() + _lexicon_file.read()).hexdigest()
+
+_normalization_cache: Optional[NormalizationCache] = None
+
+def enable_normalization_cache(path: str = 'data/normalization_cache.json',
+                               max_tokens: int = 50000, max_lines: int = 5000) -> NormalizationCache:
+    """
+    Activa una caché por palabra y por línea para todas las llamadas a normalize_text.
     
-    # 7. Correcciones de nombres propios comunes
-    proper_name_patterns = {
-        r'\bPanamena\b': 'Panameña',
-        r'\bAvIAcion\b': 'Aviación',
-        r'\bIngenierIA\b': 'Ingeniería',
-        r'\bComputacionales\b': 'Computacionales',
-        r'\bExperiencIA\b': 'Experiencia',
-    }
+    Returns:
+        La caché, para guardarla al terminar (save) y consultar sus estadísticas
+    """
+    global _normalization_cache
+    _normalization_cache = NormalizationCache(
+        apply_normalization_rules, NORMALIZATION_FINGERPRINT,
+        path=path, max_tokens=max_tokens, max_lines=max_lines
+    )
+    return _normalization_cache
+
+def disable_normalization_cache():
+    """Vuelve a normalizar cada texto completo, sin caché"""
+    global _normalization_cache
+    _normalization_cache = None
+
+def normalize_text(text: str) -> str:
+    """
+    Sistema de normalización escalable para errores de OCR comunes.
+    Aplica correcciones generales que funcionan para cualquier texto.
+    """
+    if not text:
+        return ""
+    if _normalization_cache is not None:
+        # Se pliega antes de separar líneas y palabras: algunos separadores
+        # Unicode (U+2028) desaparecen al plegar en lugar de separar palabras
+        return _normalization_cache.normalize(fold_to_ascii(text))
+    
+    # Limpiar espacios múltiples (split() = \s+ y strip()) después de las
+    # reglas, así normalizar un texto ya normalizado no lo cambia
+    return ' '.join(apply_normalization_rules(text).split())
+
+class NormalizedDocument:
+    """
+    Texto normalizado una sola vez, con las formas derivadas que usan los extractores.
+    
+    Todos los extractores aceptan un str (que normalizan) o un NormalizedDocument,
+    así extract_job_data normaliza cada texto una sola vez por post.
+    """
+    
+    def __init__(self, text: str, normalized: bool = False):
+        """
+        Args:
+            text: texto original, o ya normalizado si normalized=True
+        """
+        self.text = text if normalized else normalize_text(text)
+        self._lower = None
+        self._lines = None
+    
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+    
+    @property
+    def lines(self) -> List[str]:
+        """Líneas no vacías del texto normalizado"""
+        if self._lines is None:
+            self._lines = [line.strip() for line in self.text.split('\n') if line.strip()]
+        return self._lines
+    
+    def __len__(self):
+        return len(self.text)
+
+TextInput = Union[str, NormalizedDocument]
+
+def as_document(text: Optional[TextInput]) -> NormalizedDocument:
+    """Devuelve el documento tal cual, o normaliza el texto"""
+    if isinstance(text, NormalizedDocument):
+        return text
+    return NormalizedDocument(text or "")
+
+# === PATRONES ULTRA SIMPLES Y ROBUSTOS ===
+CONTACT_NAME_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # 1. PATRÓN MÁS SIMPLE: Solo "Contacto: Nombre Apellido"
+    r"Contacto:\s*([A-Za-z][A-Za-z\s\.]{8,45})",
     
-    for pattern, replacement in proper_name_patterns.items():
-        normalized = re.sub(pattern, replacement, normalized)
+    # 2. CON TÍTULO: "Contacto: Lcda. Nombre Apellido"  
+    r"Contacto:\s*((?:Lcda?\.|Lic\.|Dr[a]?\.|Ing\.)\s*[A-Za-z][A-Za-z\s]{5,35})",
     
-    # 8. Limpiar espacios múltiples y caracteres extraños
-    normalized = re.sub(r'\s+', ' ', normalized)
-    normalized = re.sub(r'[^\w\s\.,;:()\-+@áéíóúñü]', ' ', normalized)
-    normalized = normalized.strip()
+    # 3. NOMBRE + PIPE: "Contacto: Nombre Apellido |"
+    r"Contacto:\s*([A-Za-z][A-Za-z\s\.]{8,45})\s*\|",
     
-    return normalized
+    # 4. BÚSQUEDA EN LÍNEA COMPLETA
+    r"Contacto:\s*([^\|:\n]+?)(?:\s*\||\s*$)",
+]]
+CONTACT_NAME_CHARS = re.compile(r'^[A-Za-z\.\s]+$')
+
+PHONE_PATTERNS = [re.compile(pattern) for pattern in [
+    r"(?:Móvil|Celular):\s*(\+\(?\d{3}\)?\s*\d{4}[-\s]?\d{4})",
+    r"(\+\(?\d{3}\)?\s*\d{4}[-\s]?\d{4})",
+]]
+
+EMAIL_PATTERNS = [re.compile(pattern) for pattern in [
+    r"(?:Email|E-mail|Correo):\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})",
+    r"\b([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b",
+]]
 
-def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
+def extract_contact_info(text: TextInput) -> Dict[str, Optional[str]]:
     """Extrae información de contacto SUPER ROBUSTA - versión final"""
     
     contact_info = {
@@ -126,33 +337,18 @@ def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
         "mobile": None
     }
     
-    normalized_text = normalize_text(text)
+    normalized_text = as_document(text).text
     
-    # === PATRONES ULTRA SIMPLES Y ROBUSTOS ===
-    simple_patterns = [
-        # 1. PATRÓN MÁS SIMPLE: Solo "Contacto: Nombre Apellido"
-        r"Contacto:\s*([A-Za-z][A-Za-z\s\.]{8,45})",
-        
-        # 2. CON TÍTULO: "Contacto: Lcda. Nombre Apellido"  
-        r"Contacto:\s*((?:Lcda?\.|Lic\.|Dr[a]?\.|Ing\.)\s*[A-Za-z][A-Za-z\s]{5,35})",
-        
-        # 3. NOMBRE + PIPE: "Contacto: Nombre Apellido |"
-        r"Contacto:\s*([A-Za-z][A-Za-z\s\.]{8,45})\s*\|",
-        
-        # 4. BÚSQUEDA EN LÍNEA COMPLETA
-        r"Contacto:\s*([^\|:\n]+?)(?:\s*\||\s*$)",
-    ]
-    
-    for i, pattern in enumerate(simple_patterns):
+    for i, pattern in enumerate(CONTACT_NAME_PATTERNS):
         try:
-            match = re.search(pattern, normalized_text, re.IGNORECASE)
+            match = pattern.search(normalized_text)
             if match:
                 name = match.group(1).strip()
                 
                 # Validación MUY SIMPLE
                 if (len(name) >= 8 and len(name) <= 50 and
                     ' ' in name and  # Debe tener al menos un espacio
-                    re.match(r'^[A-Za-z\.\s]+$', name) and
+                    CONTACT_NAME_CHARS.match(name) and
                     not name.lower().startswith('contacto')):
                     
                     contact_info["name"] = name
@@ -164,32 +360,54 @@ def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
             logger.debug(f"? Error en patrón {i+1}: {e}")
     
     # === TELÉFONOS - MUY SIMPLE ===
-    phone_patterns = [
-        r"(?:Móvil|Celular):\s*(\+\(?\d{3}\)?\s*\d{4}[-\s]?\d{4})",
-        r"(\+\(?\d{3}\)?\s*\d{4}[-\s]?\d{4})",
-    ]
-    
-    for pattern in phone_patterns:
-        match = re.search(pattern, normalized_text)
+    for pattern in PHONE_PATTERNS:
+        match = pattern.search(normalized_text)
         if match:
             contact_info["phone"] = match.group(1).strip()
             break
     
     # === EMAILS ===
-    email_patterns = [
-        r"(?:Email|E-mail|Correo):\s*([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})",
-        r"\b([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b",
-    ]
-    
-    for pattern in email_patterns:
-        match = re.search(pattern, normalized_text)
+    for pattern in EMAIL_PATTERNS:
+        match = pattern.search(normalized_text)
         if match:
             contact_info["email"] = match.group(1).strip()
             break
     
     return contact_info
 
-def extract_company_info(text: str) -> Dict[str, Optional[str]]:
+# === PATRONES MEJORADOS PARA EMPRESAS ===
+COMPANY_PATTERNS = [re.compile(pattern) for pattern in [
+    # Patrón PRINCIPAL mejorado para Copa Airlines y similares
+    r"(?:Empresa|Entidad):\s*([A-Z][A-Za-z\s,\.&()]{8,120}?(?:\s*S\.?\s*A\.?|Inc\.?|Corp\.?|Group|Bank|Solutions?|Airlines?)?)(?=\s*(?:\n|Contacto:|$))",
+    
+    # Patrón específico para nombres con paréntesis (Copa Airlines)
+    r"(?:Empresa|Entidad):\s*([^:]+?)\s*\(([^)]+?)\)",
+    
+    # Empresas en mayúsculas (común en OCR)
+    r"(?:Empresa|Entidad):\s*([A-Z][A-Z\s,\.&()]{10,60})",
+    
+    # Empresa seguida de "está ofreciendo"
+    r"([A-Z][A-Za-z\s,\.&()]{8,60}?(?:\s*S\.?\s*A\.?)?)\s+está\s+(?:ofreciendo|buscando)",
+    
+    # Patrón para GRUPO MANZ, GRUPO ENX, etc.
+    r"(?:Empresa|Entidad):\s*(GRUPO\s+[A-Z]+(?:\s*,\s*S\.?\s*A\.?)?)",
+]]
+COMPANY_EDGE_CHARS = re.compile(r'^\W+|\W+$')
+ONLY_NUMBERS_PUNCTUATION = re.compile(r'^[\d\s\.,\-\(\)]+$')
+
+# Patrones de industria escalables MEJORADOS: una alternativa por industria, en orden de prioridad
+INDUSTRY_PATTERNS = [(industry, re.compile('|'.join(patterns))) for industry, patterns in {
+    "aviación": [r"aviación", r"aviation", r"airline", r"aereo", r"copa", r"panameña de aviación"],
+    "tecnología": [r"tech", r"system", r"software", r"digital", r"solutions", r"manz", r"grupo", r"enx"],
+    "financiero": [r"banco", r"bank", r"financ", r"tower", r"credit", r"international"],
+    "consultoría": [r"consult", r"advisory", r"pwc", r"audit"],
+    "manufactura": [r"manufactur", r"industrial", r"fabrica"],
+    "educación": [r"universidad", r"educación", r"academy", r"utp"],
+    "gobierno": [r"gobierno", r"ministerio", r"gob\.pa", r"dgcp"],
+    "servicios": [r"servicios", r"services", r"viva solutions"],
+}.items()]
+
+def extract_company_info(text: TextInput) -> Dict[str, Optional[str]]:
     """Extrae información de empresas con patrones escalables MEJORADOS"""
     
     company_info = {
@@ -198,28 +416,10 @@ def extract_company_info(text: str) -> Dict[str, Optional[str]]:
         "description": None
     }
     
-    normalized_text = normalize_text(text)
-    
-    # === PATRONES MEJORADOS PARA EMPRESAS ===
-    general_company_patterns = [
-        # Patrón PRINCIPAL mejorado para Copa Airlines y similares
-        r"(?:Empresa|Entidad):\s*([A-Z][A-Za-z\s,\.&()]{8,120}?(?:\s*S\.?\s*A\.?|Inc\.?|Corp\.?|Group|Bank|Solutions?|Airlines?)?)(?=\s*(?:\n|Contacto:|$))",
-        
-        # Patrón específico para nombres con paréntesis (Copa Airlines)
-        r"(?:Empresa|Entidad):\s*([^:]+?)\s*\(([^)]+?)\)",
-        
-        # Empresas en mayúsculas (común en OCR)
-        r"(?:Empresa|Entidad):\s*([A-Z][A-Z\s,\.&()]{10,60})",
-        
-        # Empresa seguida de "está ofreciendo"
-        r"([A-Z][A-Za-z\s,\.&()]{8,60}?(?:\s*S\.?\s*A\.?)?)\s+está\s+(?:ofreciendo|buscando)",
-        
-        # Patrón para GRUPO MANZ, GRUPO ENX, etc.
-        r"(?:Empresa|Entidad):\s*(GRUPO\s+[A-Z]+(?:\s*,\s*S\.?\s*A\.?)?)",
-    ]
+    normalized_text = as_document(text).text
     
-    for pattern in general_company_patterns:
-        match = re.search(pattern, normalized_text)
+    for pattern in COMPANY_PATTERNS:
+        match = pattern.search(normalized_text)
         if match:
             # Para patrones con paréntesis, preferir el contenido del paréntesis
             if len(match.groups()) >= 2 and match.group(2):
@@ -230,13 +430,13 @@ def extract_company_info(text: str) -> Dict[str, Optional[str]]:
                 company_name = match.group(1).strip()
             
             # Limpiar nombre de empresa
-            company_name = re.sub(r'^\W+|\W+$', '', company_name)
-            company_name = re.sub(r'\s+', ' ', company_name)
+            company_name = COMPANY_EDGE_CHARS.sub('', company_name)
+            company_name = WHITESPACE_PATTERN.sub(' ', company_name)
             
             # Filtros de calidad generales MEJORADOS
             if (3 <= len(company_name) <= 80 and  # Rango más amplio
                 not any(word in company_name.lower() for word in ['contacto', 'telefono', 'email', 'movil']) and
-                not re.match(r'^[\d\s\.,\-\(\)]+$', company_name)):  # No solo números/puntuación
+                not ONLY_NUMBERS_PUNCTUATION.match(company_name)):  # No solo números/puntuación
                 
                 company_info["name"] = company_name
                 break
@@ -245,26 +445,102 @@ def extract_company_info(text: str) -> Dict[str, Optional[str]]:
     if company_info["name"]:
         company_text = (company_info["name"] + " " + normalized_text).lower()
         
-        # Patrones de industria escalables MEJORADOS
-        industry_keywords = {
-            "aviación": [r"aviación", r"aviation", r"airline", r"aereo", r"copa", r"panameña de aviación"],
-            "tecnología": [r"tech", r"system", r"software", r"digital", r"solutions", r"manz", r"grupo", r"enx"],
-            "financiero": [r"banco", r"bank", r"financ", r"tower", r"credit", r"international"],
-            "consultoría": [r"consult", r"advisory", r"pwc", r"audit"],
-            "manufactura": [r"manufactur", r"industrial", r"fabrica"],
-            "educación": [r"universidad", r"educación", r"academy", r"utp"],
-            "gobierno": [r"gobierno", r"ministerio", r"gob\.pa", r"dgcp"],
-            "servicios": [r"servicios", r"services", r"viva solutions"],
-        }
-        
-        for industry, patterns in industry_keywords.items():
-            if any(re.search(pattern, company_text) for pattern in patterns):
+        for industry, pattern in INDUSTRY_PATTERNS:
+            if pattern.search(company_text):
                 company_info["industry"] = industry
                 break
     
     return company_info
 
-def extract_requirements_and_knowledge(text: str) -> Dict[str, List[str]]:
+# === PATRONES GENERALES PARA SECCIONES ===
+#
+# Cada sección tiene encabezados en orden de preferencia: (patrón desde la palabra
+# clave hasta el inicio del contenido, palabras que cierran la sección). El
+# contenido va hasta el primer cierre o el final del texto. Los patrones solo
+# se prueban donde empieza alguna de SECTION_KEYWORDS.
+_REQUIREMENTS_END = r"Conocimientos?|Funciones?|Ofrecemos?|Beneficios?|La\s+práctica|Universidad"
+_KNOWLEDGE_END = r"Funciones?|Ofrecemos?|Beneficios?|La\s+práctica|Universidad"
+_FUNCTIONS_END = r"Ofrecemos?|Beneficios?|La\s+práctica|Universidad"
+_BENEFITS_END = r"Nota|Dudas?|Interesados?|Universidad|Publicado"
+
+SECTION_HEADERS = {
+    "requirements": [
+        (r"(?:Requisitos?|Perfil|Requerimientos?):\s*", _REQUIREMENTS_END),
+        (r"(?:Requisitos?|Perfil|Requerimientos?)\s+", _REQUIREMENTS_END),
+    ],
+    "knowledge": [
+        (r"Conocimientos?\s*(?:en|requeridos?|necesarios?)?\s*:?\s*", _KNOWLEDGE_END),
+        (r"(?:Habilidades?|Skills?|Competencias?)\s*:?\s*", _KNOWLEDGE_END),
+    ],
+    "functions": [
+        # Un "Algunas de las" delante no cambia dónde empieza el contenido
+        (r"Funciones?\s*(?:de\s+colaboración)?\s*(?:en\s+el\s+área)?\s*:?\s*", _FUNCTIONS_END),
+        (r"(?:Responsabilidades?|Actividades?|Tareas?)\s*:?\s*", _FUNCTIONS_END),
+    ],
+    "benefits": [
+        (r"(?:Ofrecemos?|Beneficios?|Ofrecen)\s*:?\s*", _BENEFITS_END),
+        (r"(?:Qué\s+ofrecemos|Lo\s+que\s+ofrecemos)\s*:?\s*", _BENEFITS_END),
+    ],
+}
+
+SECTION_RULES = {
+    section_name: [(re.compile(header, re.IGNORECASE), re.compile(end, re.IGNORECASE)) for header, end in headers]
+    for section_name, headers in SECTION_HEADERS.items()
+}
+# Comienzo en minúsculas de cada encabezado y cada cierre de SECTION_HEADERS
+SECTION_KEYWORDS = (
+    'requisito', 'perfil', 'requerimiento', 'conocimiento', 'habilidad', 'skill', 'competencia',
+    'funcion', 'responsabilidad', 'actividad', 'tarea', 'ofrec', 'beneficio', 'qu', 'lo', 'la',
+    'universidad', 'nota', 'duda', 'interesado', 'publicado',
+)
+SECTION_KEYWORDS_PATTERN = re.compile('(?=' + '|'.join(SECTION_KEYWORDS) + ')', re.IGNORECASE)
+
+def find_section_keywords(text: str) -> List[int]:
+    """Posiciones (ordenadas) donde empieza alguna palabra clave de sección"""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Alguna mayúscula se alarga en minúsculas ("İ"): buscar sin correr las posiciones
+        return [match.start() for match in SECTION_KEYWORDS_PATTERN.finditer(text)]
+    
+    # Una búsqueda de subcadena por palabra es mucho más rápida que una regex con IGNORECASE
+    positions = []
+    for keyword in SECTION_KEYWORDS:
+        position = lowered.find(keyword)
+        while position != -1:
+            positions.append(position)
+            position = lowered.find(keyword, position + 1)
+    positions.sort()
+    return positions
+
+def find_sections(text: str) -> Dict[str, List[str]]:
+    """
+    Contenido de cada sección del texto, un candidato por encabezado encontrado
+    (en orden de preferencia).
+    
+    Ubica todas las palabras clave de encabezados y cierres en una pasada y
+    corta las secciones por posición, así el costo crece linealmente con el
+    texto. Para cada encabezado se usa su primera aparición.
+    """
+    positions = find_section_keywords(text)
+    # Sin re.MULTILINE, $ también coincide antes de un salto de línea final
+    text_end = len(text) - 1 if text.endswith('\n') else len(text)
+    
+    sections = {}
+    for section_name, rules in SECTION_RULES.items():
+        candidates = []
+        for header, end in rules:
+            start = next((match.end() for match in (header.match(text, position) for position in positions)
+                          if match), None)
+            if start is None:
+                continue
+            first = bisect_left(positions, start)
+            stop = next((position for position in positions[first:] if end.match(text, position)),
+                        max(text_end, start))
+            candidates.append(text[start:stop])
+        sections[section_name] = candidates
+    return sections
+
+def extract_requirements_and_knowledge(text: TextInput) -> Dict[str, List[str]]:
     """
     Extrae secciones de manera general y escalable.
     Funciona con diferentes formatos y estructuras.
@@ -277,44 +553,31 @@ def extract_requirements_and_knowledge(text: str) -> Dict[str, List[str]]:
         "benefits": []
     }
     
-    normalized_text = normalize_text(text)
-    
-    # === PATRONES GENERALES PARA SECCIONES ===
-    section_patterns = {
-        "requirements": [
-            r"(?:Requisitos?|Perfil|Requerimientos?):\s*(.*?)(?=(?:Conocimientos?|Funciones?|Ofrecemos?|Beneficios?|La\s+práctica|Universidad|$))",
-            r"(?:Requisitos?|Perfil|Requerimientos?)\s+(.*?)(?=(?:Conocimientos?|Funciones?|Ofrecemos?|Beneficios?|La\s+práctica|Universidad|$))",
-        ],
-        "knowledge": [
-            r"Conocimientos?\s*(?:en|requeridos?|necesarios?)?\s*:?\s*(.*?)(?=(?:Funciones?|Ofrecemos?|Beneficios?|La\s+práctica|Universidad|$))",
-            r"(?:Habilidades?|Skills?|Competencias?)\s*:?\s*(.*?)(?=(?:Funciones?|Ofrecemos?|Beneficios?|La\s+práctica|Universidad|$))",
-        ],
-        "functions": [
-            r"(?:Algunas?\s+de\s+las?\s+)?Funciones?\s*(?:de\s+colaboración)?\s*(?:en\s+el\s+área)?\s*:?\s*(.*?)(?=(?:Ofrecemos?|Beneficios?|La\s+práctica|Universidad|$))",
-            r"(?:Responsabilidades?|Actividades?|Tareas?)\s*:?\s*(.*?)(?=(?:Ofrecemos?|Beneficios?|La\s+práctica|Universidad|$))",
-        ],
-        "benefits": [
-            r"(?:Ofrecemos?|Beneficios?|Ofrecen)\s*:?\s*(.*?)(?=(?:Nota|Dudas?|Interesados?|Universidad|Publicado|$))",
-            r"(?:Qué\s+ofrecemos|Lo\s+que\s+ofrecemos)\s*:?\s*(.*?)(?=(?:Nota|Dudas?|Interesados?|Universidad|Publicado|$))",
-        ]
-    }
+    normalized_text = as_document(text).text
     
     # === PROCESAMIENTO GENERAL DE SECCIONES ===
-    for section_name, patterns in section_patterns.items():
-        for pattern in patterns:
-            match = re.search(pattern, normalized_text, re.DOTALL | re.IGNORECASE)
-            if match:
-                section_text = match.group(1).strip()
-                
-                # Detectar diferentes formatos de listas
-                items = extract_list_items(section_text)
-                
-                if items:
-                    result[section_name] = items
-                    break
+    for section_name, candidates in find_sections(normalized_text).items():
+        for section_text in candidates:
+            # Detectar diferentes formatos de listas
+            items = extract_list_items(section_text.strip())
+            
+            if items:
+                result[section_name] = items
+                break
     
     return result
 
+# Patrones de viñetas generales
+BULLET_PATTERNS = [re.compile(pattern, re.MULTILINE) for pattern in [
+    r'^[•????·\-?+*]\s+(.+)$',      # Viñetas al inicio de línea
+    r'\n[•????·\-?+*]\s+(.+)',      # Viñetas después de salto
+    r'^[0-9]+\.\s+(.+)$',             # Listas numeradas
+    r'\n[0-9]+\.\s+(.+)',             # Listas numeradas después de salto
+    r'^[a-zA-Z]\)\s+(.+)$',           # Listas con letras a) b) c)
+]]
+ONLY_NUMBERS = re.compile(r'^[\d\s\.,\-]+$')
+LIST_SECTION_NAMES = ['requisitos', 'conocimientos', 'funciones', 'beneficios']
+
 def extract_list_items(text: str) -> List[str]:
     """
     Extrae elementos de lista de manera general.
@@ -323,25 +586,16 @@ def extract_list_items(text: str) -> List[str]:
     
     items = []
     
-    # Patrones de viñetas generales
-    bullet_patterns = [
-        r'^[•????·\-?+*]\s+(.+)$',      # Viñetas al inicio de línea
-        r'\n[•????·\-?+*]\s+(.+)',      # Viñetas después de salto
-        r'^[0-9]+\.\s+(.+)$',             # Listas numeradas
-        r'\n[0-9]+\.\s+(.+)',             # Listas numeradas después de salto
-        r'^[a-zA-Z]\)\s+(.+)$',           # Listas con letras a) b) c)
-    ]
-    
     # Intentar cada patrón
-    for pattern in bullet_patterns:
-        matches = re.findall(pattern, text, re.MULTILINE)
+    for pattern in BULLET_PATTERNS:
+        matches = pattern.findall(text)
         if matches:
             # Limpiar y filtrar elementos válidos
             clean_items = []
             for item in matches:
                 item = item.strip()
                 if (len(item) > 10 and  # Mínimo 10 caracteres
-                    not re.match(r'^[\d\s\.,\-]+$', item) and  # No solo números/puntuación
+                    not ONLY_NUMBERS.match(item) and  # No solo números/puntuación
                     len(item.split()) >= 3):  # Al menos 3 palabras
                     clean_items.append(item)
             
@@ -354,115 +608,194 @@ def extract_list_items(text: str) -> List[str]:
         lines = [line.strip() for line in text.split('\n') if line.strip()]
         for line in lines:
             if (len(line) > 15 and
-                not re.match(r'^[\d\s\.,\-]+$', line) and
+                not ONLY_NUMBERS.match(line) and
                 len(line.split()) >= 4 and
-                line.lower() not in ['requisitos', 'conocimientos', 'funciones', 'beneficios']):
+                line.lower() not in LIST_SECTION_NAMES):
                 items.append(line)
     
     # Eliminar duplicados manteniendo orden
     return list(dict.fromkeys(items))
 
+# === INDICADORES DE OFERTA LABORAL ===
+#
+# Pesos, frases de expiración y tipos de oferta se leen de job_indicators.json
+# (o del archivo indicado en JOB_INDICATORS) para ajustarlos sin tocar código.
+JOB_INDICATORS_PATH = os.getenv(
+    'JOB_INDICATORS', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_indicators.json')
+)
+UNIDENTIFIED_JOB_TYPE = "No identificado"
+
+class IndicatorMatch(NamedTuple):
+    """Resultado de buscar los indicadores en un texto"""
+    is_job: bool
+    job_type: str
+    score: int
+    is_expired: bool
+    terms: FrozenSet[str]
+
+class IndicatorMatcher:
+    """
+    Busca cada término indicador una sola vez y deriva del conjunto encontrado
+    la puntuación, la expiración y el tipo de oferta.
+    
+    Los términos repetidos entre pesos, frases de expiración y tipos se buscan
+    una vez. Cada búsqueda es un `term in texto`, que corre en C: con los
+    términos de job_indicators.json es más rápido que un autómata de
+    Aho-Corasick en Python o una expresión regular única sobre el texto
+    (ver benchmarks/bench_indicators.py).
+    """
+    
+    def __init__(self, weights: Dict[str, int], expired_phrases: Iterable[str],
+                 job_types: Iterable[Tuple[str, str]], threshold: int, default_job_type: str):
+        """
+        Args:
+            weights: término en minúsculas -> peso (negativo para indicadores de no-oferta)
+            expired_phrases: términos que marcan la oferta como expirada
+            job_types: pares (término, tipo) en orden de prioridad
+            threshold: puntuación mínima para considerar el post una oferta
+            default_job_type: tipo de una oferta sin ningún término de job_types
+        """
+        self.weights = dict(weights)
+        self.expired_phrases = frozenset(expired_phrases)
+        self.job_types = [tuple(pair) for pair in job_types]
+        self.threshold = threshold
+        self.default_job_type = default_job_type
+        
+        self.terms = sorted(set(self.weights) | self.expired_phrases | {term for term, _ in self.job_types})
+        
+        # Para clasificar en lote: columnas de la matriz documento x término
+        self._vectorizer = CountVectorizer(vocabulary=self.terms, analyzer=self.find_terms,
+                                           binary=True, dtype=np.int64)
+        self._weight_vector = np.array([self.weights.get(term, 0) for term in self.terms], dtype=np.int64)
+        self._expired_vector = np.array([term in self.expired_phrases for term in self.terms], dtype=np.int64)
+        self._job_type_columns = [self.terms.index(term) for term, _ in self.job_types]
+        self._job_type_labels = np.array([label for _, label in self.job_types], dtype=object)
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'IndicatorMatcher':
+        """Carga la configuración de un archivo JSON como job_indicators.json"""
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        
+        weights = dict(config.get('job_indicators', {}))
+        for term, weight in config.get('non_job_indicators', {}).items():
+            weights[term] = weights.get(term, 0) + weight
+        
+        return cls(
+            weights,
+            config.get('expired_phrases', []),
+            config.get('job_types', []),
+            config.get('threshold', 30),
+            config.get('default_job_type', 'Oferta Laboral'),
+        )
+    
+    def find_terms(self, text: str) -> FrozenSet[str]:
+        """Términos presentes en el texto (ya en minúsculas)"""
+        return frozenset(term for term in self.terms if term in text)
+    
+    def scan(self, text: str) -> IndicatorMatch:
+        """Puntuación, términos, expiración y tipo de oferta de un texto en minúsculas"""
+        terms = self.find_terms(text)
+        score = sum(self.weights.get(term, 0) for term in terms)
+        is_job = score >= self.threshold
+        
+        job_type = UNIDENTIFIED_JOB_TYPE
+        if is_job:
+            job_type = next((label for term, label in self.job_types if term in terms), self.default_job_type)
+        
+        return IndicatorMatch(is_job, job_type, score, not self.expired_phrases.isdisjoint(terms), terms)
+    
+    def scan_batch(self, texts: Sequence[str]) -> List[Tuple[bool, str, int, bool]]:
+        """
+        Clasifica muchos textos en minúsculas a la vez.
+        
+        Arma una sola matriz dispersa documento x término (binaria) y obtiene
+        todas las puntuaciones con un producto matriz x vector de pesos. Da el
+        mismo resultado que scan() para cada texto, sin los términos.
+        """
+        if not texts:
+            return []
+        
+        matrix = self._vectorizer.transform(texts)
+        scores = matrix @ self._weight_vector
+        is_job = scores >= self.threshold
+        is_expired = (matrix @ self._expired_vector) > 0
+        
+        job_types = np.full(len(texts), UNIDENTIFIED_JOB_TYPE, dtype=object)
+        job_types[is_job] = self.default_job_type
+        if self._job_type_columns:
+            # El primer término de job_types presente en cada documento decide el tipo
+            present = matrix[:, self._job_type_columns].toarray() > 0
+            typed = is_job & present.any(axis=1)
+            job_types[typed] = self._job_type_labels[present.argmax(axis=1)[typed]]
+        
+        return list(zip(is_job.tolist(), job_types.tolist(), scores.tolist(), is_expired.tolist()))
+
+INDICATOR_MATCHER = IndicatorMatcher.from_file(JOB_INDICATORS_PATH)
+
 # === RESTO DE FUNCIONES CON MEJORAS GENERALES ===
 
-def is_job_post(text: str, description: str) -> Tuple[bool, Optional[str], int, bool]:
+def is_job_post(text: TextInput, description: TextInput) -> Tuple[bool, Optional[str], int, bool]:
     """Determina si es oferta laboral con criterios generales mejorados"""
     
-    text = normalize_text(text)
-    description = normalize_text(description)
-    combined_text = f"{text} {description}".lower()
-    
-    # Indicadores positivos generales
-    job_indicators = {
-        "práctica profesional": 25,
-        "práctica laboral": 25,
-        "vacante": 20,
-        "pasantía": 20,
-        "empleo": 15,
-        "trabajo": 10,
-        "puesto": 10,
-        "empresa:": 15,
-        "contacto:": 12,
-        "requisitos:": 12,
-        "conocimientos": 10,
-        "funciones": 10,
-        "ofrecemos": 12,
-        "está ofreciendo": 15,
-        "está buscando": 15,
-        "se solicita": 12,
-        "enviar hoja de vida": 15,
-        "interesados enviar": 12,
-    }
+    combined_text = f"{as_document(text).lower} {as_document(description).lower}"
+    match = INDICATOR_MATCHER.scan(combined_text)
     
-    # Indicadores negativos generales
-    non_job_indicators = {
-        "talleres": -20,
-        "seminario": -20,
-        "conferencia": -20,
-        "evento": -15,
-        "matrícula": -25,
-        "ha finalizado": -30,
-        "cupos agotados": -25,
-        "convocatoria cerrada": -25,
-    }
+    return match.is_job, match.job_type, match.score, match.is_expired
+
+def is_job_post_batch(texts: Sequence[TextInput],
+                      descriptions: Sequence[TextInput]) -> List[Tuple[bool, Optional[str], int, bool]]:
+    """
+    is_job_post para muchos posts a la vez (texto OCR y descripción de cada uno).
     
-    score = 0
-    
-    # Calcular puntuación
-    for term, weight in job_indicators.items():
-        if term in combined_text:
-            score += weight
-    
-    for term, weight in non_job_indicators.items():
-        if term in combined_text:
-            score += weight
-    
-    # Verificar si está expirada
-    is_expired = any(pattern in combined_text for pattern in [
-        "ha finalizado", "se acabó", "cupos agotados", "convocatoria cerrada"
-    ])
-    
-    is_job = score >= 30
-    
-    # Determinar tipo
-    job_type = "No identificado"
-    if is_job:
-        if "práctica profesional" in combined_text:
-            job_type = "Práctica Profesional"
-        elif "práctica laboral" in combined_text:
-            job_type = "Práctica Laboral"
-        elif "vacante" in combined_text:
-            job_type = "Vacante"
-        elif "pasantía" in combined_text:
-            job_type = "Pasantía"
-        else:
-            job_type = "Oferta Laboral"
-    
-    return is_job, job_type, score, is_expired
-
-def extract_job_data(image_text: str, post_description: str) -> Dict:
-    """Extrae información con procesamiento general mejorado"""
-    
-    primary_text = normalize_text(post_description) if post_description else ""
-    secondary_text = normalize_text(image_text) if image_text else ""
-    
-    # Estrategia inteligente de combinación
-    if len(primary_text) < 100 and len(secondary_text) > 50:
-        combined_text = primary_text + "\n\n" + secondary_text
-    elif len(primary_text) > 50:
-        combined_text = primary_text
+    Devuelve una tupla (is_job, job_type, score, is_expired) por post, idéntica
+    a la de is_job_post, calculando las puntuaciones en lote.
+    """
+    if len(texts) != len(descriptions):
+        raise ValueError("texts y descriptions deben tener la misma cantidad de elementos")
+    
+    combined_texts = [
+        f"{as_document(text).lower} {as_document(description).lower}"
+        for text, description in zip(texts, descriptions)
+    ]
+    return INDICATOR_MATCHER.scan_batch(combined_texts)
+
+def extract_job_data(image_text: TextInput, post_description: TextInput) -> Dict:
+    """
+    Extrae información con procesamiento general mejorado.
+    
+    Cada texto se normaliza una sola vez y el mismo NormalizedDocument se pasa
+    a todos los extractores. Si se reciben los documentos que ya usó
+    is_job_post, tampoco se vuelven a normalizar aquí.
+    """
+    
+    primary = as_document(post_description)
+    secondary = as_document(image_text)
+    
+    # Estrategia inteligente de combinación (los textos normalizados no tienen
+    # saltos de línea: al unirlos basta un espacio)
+    if len(primary) < 100 and len(secondary) > 50:
+        combined = NormalizedDocument(" ".join(part for part in (primary.text, secondary.text) if part),
+                                      normalized=True)
+    elif len(primary) > 50:
+        combined = primary
     else:
-        combined_text = secondary_text
+        combined = secondary
     
     # Extraer información usando funciones mejoradas
-    company_info = extract_company_info(combined_text)
-    contact_info = extract_contact_info(combined_text)
-    sections_info = extract_requirements_and_knowledge(combined_text)
+    company_info = extract_company_info(combined)
+    contact_info = extract_contact_info(combined)
+    sections_info = extract_requirements_and_knowledge(combined)
     
     # Si no hay contacto en descripción, buscar en OCR
-    if not (contact_info.get('name') or contact_info.get('phone')) and secondary_text:
-        ocr_contact = extract_contact_info(secondary_text)
+    if not (contact_info.get('name') or contact_info.get('phone')) and secondary.text:
+        ocr_contact = extract_contact_info(secondary)
         contact_info.update({k: v for k, v in ocr_contact.items() if v})
     
+    # Descripción primero, como en la combinación: una frase de oferta vencida
+    # que cruce la unión de los textos depende del orden
+    is_expired = is_job_post(primary, secondary)[3]
+    
     return {
         "company_name": company_info["name"],
         "company_industry": company_info["industry"],
@@ -470,110 +803,136 @@ def extract_job_data(image_text: str, post_description: str) -> Dict:
         "contact_position": contact_info.get("position"),
         "contact_email": contact_info.get("email"),
         "contact_phone": contact_info.get("phone"),
-        "position_title": extract_position_title(combined_text),
+        "position_title": extract_position_title(combined),
         "requirements": sections_info["requirements"],
         "knowledge_required": sections_info["knowledge"],
         "functions": sections_info["functions"],
         "benefits": sections_info["benefits"],
-        "is_active": not is_job_post(primary_text, secondary_text)[3],
-        "work_modality": extract_work_modality(combined_text),
-        "duration": extract_duration(combined_text),
+        "is_active": not is_expired,
+        "work_modality": extract_work_modality(combined),
+        "duration": extract_duration(combined),
     }
 
-def extract_position_title(text: str) -> Optional[str]:
+POSITION_TITLE_PATTERNS = [re.compile(pattern) for pattern in [
+    r"práctica\s+(?:profesional|laboral)\s+(?:como|en)\s+([^\n,.]+)",
+    r"(?:puesto|cargo|vacante)\s+(?:de|para)\s+([^\n,.]+)",
+    r"se\s+(?:busca|requiere|solicita)\s+([^\n,.]+)",
+    r"\b(?:analista|ingeniero|desarrollador|especialista|gerente)\s+(?:de|en)\s+([^\n,.]+)",
+]]
+TITLE_ARTICLE = re.compile(r'^(?:un|una)\s+')
+
+def extract_position_title(text: TextInput) -> Optional[str]:
     """Extrae título del puesto con patrones generales"""
     
-    normalized_text = normalize_text(text).lower()
-    
-    patterns = [
-        r"práctica\s+(?:profesional|laboral)\s+(?:como|en)\s+([^\n,.]+)",
-        r"(?:puesto|cargo|vacante)\s+(?:de|para)\s+([^\n,.]+)",
-        r"se\s+(?:busca|requiere|solicita)\s+([^\n,.]+)",
-        r"\b(?:analista|ingeniero|desarrollador|especialista|gerente)\s+(?:de|en)\s+([^\n,.]+)",
-    ]
+    normalized_text = as_document(text).lower
     
-    for pattern in patterns:
-        match = re.search(pattern, normalized_text)
+    for pattern in POSITION_TITLE_PATTERNS:
+        match = pattern.search(normalized_text)
         if match:
             title = match.group(1).strip()
-            title = re.sub(r'^(?:un|una)\s+', '', title)
+            title = TITLE_ARTICLE.sub('', title)
             return title.strip().title()
     
     return None
 
-def extract_work_modality(text: str) -> Optional[str]:
+WORK_MODALITY_PATTERNS = [
+    ("Presencial", re.compile(r"presencial|oficina")),
+    ("Remoto", re.compile(r"remoto|virtual|casa")),
+    ("Híbrido", re.compile(r"híbrido|mixto")),
+]
+
+def extract_work_modality(text: TextInput) -> Optional[str]:
     """Extrae modalidad de trabajo"""
     
-    normalized_text = normalize_text(text).lower()
+    normalized_text = as_document(text).lower
     
-    if re.search(r"presencial|oficina", normalized_text):
-        return "Presencial"
-    elif re.search(r"remoto|virtual|casa", normalized_text):
-        return "Remoto"
-    elif re.search(r"híbrido|mixto", normalized_text):
-        return "Híbrido"
+    for modality, pattern in WORK_MODALITY_PATTERNS:
+        if pattern.search(normalized_text):
+            return modality
     
     return None
 
-def extract_duration(text: str) -> Optional[str]:
+DURATION_PATTERNS = [re.compile(pattern) for pattern in [
+    r"(\d+)\s+meses",
+    r"(\d+)\s+años",
+    r"duración:\s*([^\n]+)",
+    r"período:\s*([^\n]+)",
+]]
+
+def extract_duration(text: TextInput) -> Optional[str]:
     """Extrae duración del trabajo"""
     
-    normalized_text = normalize_text(text).lower()
+    normalized_text = as_document(text).lower
     
-    duration_patterns = [
-        r"(\d+)\s+meses",
-        r"(\d+)\s+años",
-        r"duración:\s*([^\n]+)",
-        r"período:\s*([^\n]+)",
-    ]
-    
-    for pattern in duration_patterns:
-        match = re.search(pattern, normalized_text)
+    for pattern in DURATION_PATTERNS:
+        match = pattern.search(normalized_text)
         if match:
             return match.group(1).strip()
     
     return None
 
-def extract_experience_education(text: str) -> Dict[str, Optional[str]]:
+EXPERIENCE_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r"experiencia\s+(?:mínima\s+)?(?:de\s+)?(\d+(?:-\d+)?|\d+\+)\s+(?:años?|meses?)",
+    r"(\d+(?:-\d+)?|\d+\+)\s+(?:años?|meses?)\s+(?:de\s+experiencia|requeridos)",
+]]
+
+EDUCATION_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    r"(?:estudiante|egresado)\s+(?:de|en)\s+([^\n,.;]+)",
+    r"Facultad de\s+([^\n,.;]+)",
+    r"(?:carrera|título|licenciatura)\s+(?:en|de)\s+([^\n,.;]+)",
+]]
+TRAILING_PUNCTUATION = re.compile(r'[.,;:]+$')
+
+def extract_experience_education(text: TextInput) -> Dict[str, Optional[str]]:
     """Extrae experiencia y educación requeridas"""
     
-    normalized_text = normalize_text(text)
+    normalized_text = as_document(text).text
     
     result = {"experience": None, "education": None}
     
     # Experiencia
-    exp_patterns = [
-        r"experiencia\s+(?:mínima\s+)?(?:de\s+)?(\d+(?:-\d+)?|\d+\+)\s+(?:años?|meses?)",
-        r"(\d+(?:-\d+)?|\d+\+)\s+(?:años?|meses?)\s+(?:de\s+experiencia|requeridos)",
-    ]
-    
-    for pattern in exp_patterns:
-        match = re.search(pattern, normalized_text, re.IGNORECASE)
+    for pattern in EXPERIENCE_PATTERNS:
+        match = pattern.search(normalized_text)
         if match:
             exp_str = match.group(1) + (" años" if "año" in match.group(0).lower() else " meses")
             result["experience"] = exp_str
             break
     
     # Educación
-    edu_patterns = [
-        r"(?:estudiante|egresado)\s+(?:de|en)\s+([^\n,.;]+)",
-        r"Facultad de\s+([^\n,.;]+)",
-        r"(?:carrera|título|licenciatura)\s+(?:en|de)\s+([^\n,.;]+)",
-    ]
-    
-    for pattern in edu_patterns:
-        match = re.search(pattern, normalized_text, re.IGNORECASE)
+    for pattern in EDUCATION_PATTERNS:
+        match = pattern.search(normalized_text)
         if match:
             edu = match.group(1).strip().title()
-            result["education"] = re.sub(r'[.,;:]+$', '', edu)
+            result["education"] = TRAILING_PUNCTUATION.sub('', edu)
             break
     
     return result
 
-def extract_skills_and_technologies(text: str) -> Dict[str, List[str]]:
+SKILL_PATTERNS = {
+    category: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for category, patterns in {
+        # Patrones para lenguajes de programación
+        "programming_languages": [
+            r'\b(Python|Java|JavaScript|C\+\+|C#|PHP|Go|Rust|Swift|Kotlin)\b',
+            r'\b(React|Angular|Vue|Node\.js|Django|Flask|Spring)\b'
+        ],
+        # Patrones para tecnologías
+        "technologies": [
+            r'\b(AWS|Azure|GCP|Docker|Kubernetes|Git)\b',
+            r'\b(MySQL|PostgreSQL|MongoDB|Redis|Elasticsearch)\b'
+        ],
+        # Patrones para habilidades blandas
+        "soft_skills": [
+            r'\b(comunicación|trabajo en equipo|liderazgo|adaptabilidad|resolución de problemas)\b',
+            r'\b(empatía|creatividad|pensamiento crítico|gestión del tiempo)\b'
+        ],
+    }.items()
+}
+
+def extract_skills_and_technologies(text: TextInput) -> Dict[str, List[str]]:
     """Extrae habilidades técnicas y tecnologías específicas"""
 
-    normalized_text = normalize_text(text)
+    normalized_text = as_document(text).text
     
     result = {
         "programming_languages": [],
@@ -581,34 +940,8 @@ def extract_skills_and_technologies(text: str) -> Dict[str, List[str]]:
         "soft_skills": []
     }
     
-    # Patrones para lenguajes de programación
-    programming_patterns = [
-        r'\b(Python|Java|JavaScript|C\+\+|C#|PHP|Go|Rust|Swift|Kotlin)\b',
-        r'\b(React|Angular|Vue|Node\.js|Django|Flask|Spring)\b'
-    ]
-
-    for pattern in programming_patterns:
-        matches = re.findall(pattern, normalized_text, re.IGNORECASE)
-        result["programming_languages"].extend(matches)
-    
-    # Patrones para tecnologías
-    tech_patterns = [
-        r'\b(AWS|Azure|GCP|Docker|Kubernetes|Git)\b',
-        r'\b(MySQL|PostgreSQL|MongoDB|Redis|Elasticsearch)\b'
-    ]
-    
-    for pattern in tech_patterns:
-        matches = re.findall(pattern, normalized_text, re.IGNORECASE)
-        result["technologies"].extend(matches)
-
-    # Patrones para habilidades blandas
-    soft_skills_patterns = [
-        r'\b(comunicación|trabajo en equipo|liderazgo|adaptabilidad|resolución de problemas)\b',
-        r'\b(empatía|creatividad|pensamiento crítico|gestión del tiempo)\b'
-    ]
-
-    for pattern in soft_skills_patterns:
-        matches = re.findall(pattern, normalized_text, re.IGNORECASE)
-        result["soft_skills"].extend(matches)
+    for category, patterns in SKILL_PATTERNS.items():
+        for pattern in patterns:
+            result[category].extend(pattern.findall(normalized_text))
 
     return result
@@ -0,0 +1,157 @@
+﻿# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import logging
+from collections import OrderedDict
+
+class NormalizationCache:
+    """
+    Caché LRU de normalize_text por palabra y por línea, compartida entre posts.
+    
+    Los flyers de una misma cuenta repiten vocabulario ("Requisitos", nombres de
+    empresas) y líneas completas (el pie de la UTP), así que cada palabra o
+    línea ya vista se resuelve con una búsqueda en un diccionario. Las palabras
+    que faltan en una línea se normalizan juntas con una sola llamada a
+    `normalizer`, que debe aplicar las reglas palabra por palabra sin tocar los
+    saltos de línea (una palabra por línea de entrada y de salida).
+    
+    Se guarda en JSON entre ejecuciones junto con `fingerprint`, una huella de
+    las reglas y del léxico: si cambian, las entradas viejas se descartan. No
+    es segura para usar desde varios hilos a la vez.
+    """
+    
+    def __init__(self, normalizer, fingerprint, path='data/normalization_cache.json',
+                 max_tokens=50000, max_lines=5000, sample_every=50):
+        self.logger = logging.getLogger(__name__)
+        self.normalizer = normalizer
+        self.fingerprint = fingerprint
+        self.path = path
+        self.max_tokens = max_tokens
+        self.max_lines = max_lines
+        self.sample_every = sample_every
+        self.tokens = OrderedDict()
+        self.lines = OrderedDict()
+        
+        self.token_hits = self.token_misses = 0
+        self.line_hits = self.line_misses = 0
+        # Para estimar el tiempo ahorrado: tiempo con caché por carácter frente al
+        # de normalizar sin caché uno de cada `sample_every` textos
+        self.texts = 0
+        self.characters = 0
+        self.seconds = 0.0
+        self.sampled_characters = 0
+        self.sampled_seconds = 0.0
+        
+        if path and os.path.exists(path):
+            self.load()
+    
+    def load(self):
+        """Carga las entradas guardadas si se generaron con las mismas reglas"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"No se pudo leer la caché de normalización {self.path}: {e}")
+            return
+        
+        if data.get('fingerprint') != self.fingerprint:
+            self.logger.info("Caché de normalización descartada: cambiaron las reglas o el léxico")
+            return
+        # Se guardan de la menos a la más usada recientemente
+        self.tokens.update(data.get('tokens', [])[-self.max_tokens:])
+        self.lines.update(data.get('lines', [])[-self.max_lines:])
+        self.logger.info(f"Caché de normalización: {len(self.tokens)} palabras y {len(self.lines)} líneas cargadas")
+    
+    def save(self):
+        """Escribe la caché en disco (reemplazo atómico del archivo)"""
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'fingerprint': self.fingerprint,
+                'tokens': list(self.tokens.items()),
+                'lines': list(self.lines.items()),
+            }, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+    
+    def normalize(self, text):
+        """Equivalente a normalize_text(text), resuelto por líneas y palabras"""
+        if self.texts % self.sample_every == 0:
+            start = time.perf_counter()
+            ' '.join(self.normalizer(text).split())
+            self.sampled_seconds += time.perf_counter() - start
+            self.sampled_characters += len(text)
+        
+        start = time.perf_counter()
+        normalized_lines = []
+        for line in text.splitlines():
+            normalized = self.lines.get(line)
+            if normalized is not None:
+                self.lines.move_to_end(line)
+                self.line_hits += 1
+            else:
+                normalized = self._normalize_line(line)
+                self.line_misses += 1
+                self._store(self.lines, line, normalized, self.max_lines)
+            if normalized:
+                normalized_lines.append(normalized)
+        
+        self.seconds += time.perf_counter() - start
+        self.characters += len(text)
+        self.texts += 1
+        return ' '.join(normalized_lines)
+    
+    def _normalize_line(self, line):
+        """Normaliza una línea palabra por palabra; las palabras nuevas, en una sola llamada"""
+        words = line.split()
+        results = []
+        missing = {}
+        for word in words:
+            normalized = self.tokens.get(word)
+            if normalized is not None:
+                self.tokens.move_to_end(word)
+                self.token_hits += 1
+            else:
+                missing.setdefault(word, None)
+            results.append(normalized)
+        
+        if missing:
+            normalized_words = self.normalizer('\n'.join(missing)).split('\n')
+            for word, normalized in zip(missing, normalized_words):
+                missing[word] = ' '.join(normalized.split())
+                self._store(self.tokens, word, missing[word], self.max_tokens)
+            self.token_misses += len(missing)
+            results = [missing[word] if normalized is None else normalized
+                       for word, normalized in zip(words, results)]
+        
+        return ' '.join(normalized for normalized in results if normalized)
+    
+    @staticmethod
+    def _store(entries, key, value, max_entries):
+        entries[key] = value
+        if len(entries) > max_entries:
+            entries.popitem(last=False)
+    
+    def get_stats(self):
+        """Aciertos por nivel y una estimación del tiempo ahorrado"""
+        token_lookups = self.token_hits + self.token_misses
+        line_lookups = self.line_hits + self.line_misses
+        uncached_seconds = (self.characters * self.sampled_seconds / self.sampled_characters
+                            if self.sampled_characters else self.seconds)
+        return {
+            "token_hits": self.token_hits,
+            "token_misses": self.token_misses,
+            "token_hit_rate": (self.token_hits / token_lookups * 100) if token_lookups else 0.0,
+            "line_hits": self.line_hits,
+            "line_misses": self.line_misses,
+            "line_hit_rate": (self.line_hits / line_lookups * 100) if line_lookups else 0.0,
+            "seconds": self.seconds,
+            # Estimación: costo por carácter sin caché (muestreado) menos el tiempo real
+            "seconds_saved": uncached_seconds - self.seconds,
+        }
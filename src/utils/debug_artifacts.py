@@ -0,0 +1,165 @@
+﻿# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import zlib
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ('off', 'sampled', 'full')
+
+class DebugArtifactWriter:
+    """
+    Escribe los artefactos de depuración (imágenes, textos, JSON de análisis) en
+    un hilo de fondo para que el procesamiento nunca espere al disco.
+    
+    Niveles:
+        off: no se escribe nada
+        sampled: solo uno de cada `sample_every` artefactos (por clave, así todos
+            los archivos de un mismo post se guardan o se omiten juntos)
+        full: se escribe todo
+    
+    La cola es acotada para no acumular memoria si el disco no da abasto. En
+    'full' el procesamiento espera a que haya lugar, así no se pierde ningún
+    artefacto; en 'sampled' el artefacto se descarta (se cuenta y se avisa).
+    """
+    
+    def __init__(self, level='full', sample_every=10, queue_size=32, png_compress_level=6):
+        if level not in LEVELS:
+            raise ValueError(f"Nivel de artefactos de depuración no válido: {level}")
+        self.level = level
+        self.sample_every = max(1, sample_every)
+        self.png_compress_level = png_compress_level
+        
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._counter = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        
+        self.written = 0
+        self.dropped = 0
+        self.skipped = 0
+        self.failed = 0
+        self.write_seconds = 0.0
+        
+        if self.level != 'off':
+            self._thread = threading.Thread(target=self._run, name="debug-artifacts", daemon=True)
+            self._thread.start()
+    
+    @property
+    def enabled(self):
+        return self.level != 'off'
+    
+    def should_write(self, key=None):
+        """Indica si el artefacto asociado a `key` se debe guardar según el nivel"""
+        if self.level == 'off':
+            return False
+        if self.level == 'full':
+            return True
+        
+        if key is None:
+            # Sin clave se muestrea por orden de llegada
+            with self._lock:
+                index = self._counter
+                self._counter += 1
+            return index % self.sample_every == 0
+        return zlib.crc32(str(key).encode('utf-8')) % self.sample_every == 0
+    
+    def save_image(self, image, path, key=None):
+        """Encola una imagen PIL para guardarla como PNG. Devuelve True si quedó encolada"""
+        return self._submit('image', path, image, key)
+    
+    def write_text(self, path, text, key=None):
+        """Encola un archivo de texto UTF-8. Devuelve True si quedó encolado"""
+        return self._submit('text', path, text, key)
+    
+    def write_json(self, path, data, key=None):
+        """Encola un JSON indentado. `data` no se debe modificar después de encolarlo"""
+        return self._submit('json', path, data, key)
+    
+    def _submit(self, kind, path, payload, key):
+        if not self.should_write(key):
+            self.skipped += 1
+            return False
+        
+        item = (kind, path, payload)
+        if self._thread is None:
+            # Ya se cerró el hilo de fondo: escribir en el hilo actual
+            self._process(item)
+            return True
+        if self.level == 'full':
+            self._queue.put(item)
+            return True
+        
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                dropped = self.dropped
+            logger.warning(f"Cola de artefactos llena, se descarta {path} ({dropped} descartados)")
+            return False
+        return True
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._process(item)
+            finally:
+                self._queue.task_done()
+    
+    def _process(self, item):
+        """Escribe un artefacto encolado y actualiza las estadísticas"""
+        kind, path, payload = item
+        try:
+            start = time.perf_counter()
+            self._write(kind, path, payload)
+            self.write_seconds += time.perf_counter() - start
+            self.written += 1
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Error al escribir artefacto de depuración: {e}")
+    
+    def _write(self, kind, path, payload):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        if kind == 'image':
+            payload.save(path, format='PNG', compress_level=self.png_compress_level)
+        elif kind == 'text':
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(payload)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+    
+    def flush(self):
+        """Espera a que se escriban todos los artefactos encolados"""
+        if self._thread is not None:
+            self._queue.join()
+    
+    def get_stats(self):
+        """Estadísticas de escritura"""
+        return {
+            "level": self.level,
+            "written": self.written,
+            "skipped": self.skipped,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "write_seconds": round(self.write_seconds, 2),
+        }
+    
+    def close(self):
+        """Escribe lo pendiente y detiene el hilo de fondo"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
@@ -7,18 +7,45 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-def save_image_from_url(url, output_path):
-    """Guarda una imagen desde una URL a un archivo local"""
+def fetch_image_from_url(url, timeout=10):
+    """
+    Descarga una imagen una sola vez y la decodifica desde memoria.
+    
+    Returns:
+        Tupla (imagen PIL o None, bytes descargados). Los bytes permiten
+        medir el tráfico aunque la imagen no se pueda decodificar.
+    """
+    try:
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        content = response.content
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Error de red o HTTP al descargar imagen {url}: {e}")
+        return None, b""
+    
+    try:
+        img = Image.open(BytesIO(content))
+        img.load()
+        return img, content
+    except Exception as e:
+        logger.error(f"Error al decodificar imagen {url}: {e}")
+        return None, content
+
+def save_image(img, output_path):
+    """Guarda una imagen ya descargada en un archivo local"""
     try:
         # Crear directorio si no existe
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
-        # Descargar y guardar imagen
-        response = requests.get(url)
-        img = Image.open(BytesIO(response.content))
         img.save(output_path)
         logger.info(f"Imagen guardada en {output_path}")
         return True
     except Exception as e:
         logger.error(f"Error al guardar imagen: {str(e)}")
         return False
+
+def save_image_from_url(url, output_path):
+    """Guarda una imagen desde una URL a un archivo local"""
+    img, _ = fetch_image_from_url(url)
+    if img is None:
+        return False
+    return save_image(img, output_path)
@@ -1,63 +1,123 @@
 ﻿# -*- coding: utf-8 -*-
 import os
 import sys
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+import base64
+from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file
 from datetime import datetime, timedelta
 from sqlalchemy import desc, and_, or_
+from sqlalchemy.orm import scoped_session, sessionmaker
 import json
 
 # Añadir el directorio raíz al path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.database.models import init_db, JobPost, JobData, CarouselImage, AnalysisMetrics
+from src.database.models import get_engine, JobPost, JobData, CarouselImage, AnalysisMetrics, get_aggregate_counters
+from src.database.stats_cache import StatsCache, data_version_path
+from src.database.search import search_enabled, build_match_expression, search_subquery
+from src.web.facets import FacetService
+from src.web.tasks import TaskRunner
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
-# Inicializar base de datos
-db_session = init_db()
+# Inicializar base de datos (crea tablas e índices con el engine de escritura)
+engine = get_engine()
+
+# Una sesión por hilo y por petición, sobre conexiones de solo lectura del
+# pool. Sin autoflush: las vistas ajustan objetos para la plantilla
+# (prepare_job_data_for_template) y esos cambios nunca deben escribirse.
+db_session = scoped_session(sessionmaker(bind=get_engine(read_only=True), autoflush=False))
+
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    """Devuelve la conexión al pool y descarta el estado de la sesión de la petición"""
+    db_session.remove()
+
+# Contadores del dashboard: se recalculan al vencer el TTL o cuando el scraper guarda posts nuevos
+stats_cache = StatsCache(
+    ttl=int(os.getenv('STATS_CACHE_TTL', '30')),
+    version_path=data_version_path(engine)
+)
+
+# Desplegables de filtros con conteos, actualizados por incrementos
+facet_service = FacetService(
+    db_session,
+    lambda args: build_base_offer_query(args)[0],  # definida más abajo
+    version_path=data_version_path(engine)
+)
+
+# Exportaciones en segundo plano: las peticiones solo encolan y consultan el estado
+task_runner = TaskRunner(
+    engine,
+    export_dir=os.getenv('EXPORT_DIR', os.path.join('data', 'exports')),
+    max_workers=int(os.getenv('EXPORT_WORKERS', '1'))
+)
 
 @app.template_filter('tojsonfilter')
 def tojsonfilter(obj):
     return json.dumps(obj)
 
-@app.route('/')
-def index():
-    """Página principal con lista de ofertas y filtros mejorados"""
+# Paginación del listado de ofertas
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+def build_offer_query(args):
+    """
+    Consulta de ofertas (JobPost, JobData) con los filtros de la página principal.
+    
+    Args:
+        args: parámetros de la petición (request.args)
+    
+    Returns:
+        Tupla (consulta, columna de relevancia bm25 o None si no hay búsqueda de texto)
+    """
+    query, rank = build_base_offer_query(args)
+    
+    # Filtros de facetas (desplegables con conteo)
+    job_type = args.get('type', '')
+    company = args.get('company', '')
+    industry = args.get('industry', '')
+    work_modality = args.get('modality', '')
+    
+    # 'all' equivale a no filtrar, igual que en FacetService
+    if job_type and job_type != 'all':
+        query = query.filter(JobData.job_type == job_type)
+    
+    if company and company != 'all':
+        query = query.filter(JobData.company_name == company)
+    
+    if industry and industry != 'all':
+        query = query.filter(JobData.company_industry == industry)
+    
+    if work_modality and work_modality != 'all':
+        query = query.filter(JobData.work_modality == work_modality)
+    
+    return query, rank
+
+def build_base_offer_query(args):
+    """
+    Consulta de ofertas con los filtros que no son facetas: estado, fechas y búsqueda
+    
+    Returns:
+        Tupla (consulta, columna de relevancia bm25 o None)
+    """
     
     # Obtener parámetros de filtro
-    job_type = request.args.get('type', '')
-    company = request.args.get('company', '')
-    industry = request.args.get('industry', '')
-    active_filter = request.args.get('active', 'true')
-    work_modality = request.args.get('modality', '')
-    date_from = request.args.get('date_from', '')
-    date_to = request.args.get('date_to', '')
-    search_query = request.args.get('search', '')
+    active_filter = args.get('active', 'true')
+    date_from = args.get('date_from', '')
+    date_to = args.get('date_to', '')
+    search_query = args.get('search', '')
     
     # Construir consulta base
     query = db_session.query(JobPost, JobData).join(JobData).filter(
         JobPost.is_job_offer == True
     )
     
-    # Aplicar filtros
-    if job_type:
-        query = query.filter(JobData.job_type == job_type)
-    
-    if company and company != 'all':
-        query = query.filter(JobData.company_name == company)
-    
-    if industry:
-        query = query.filter(JobData.company_industry == industry)
-    
     if active_filter == 'true':
         query = query.filter(JobData.is_active == True)
     elif active_filter == 'false':
         query = query.filter(JobData.is_active == False)
     
-    if work_modality:
-        query = query.filter(JobData.work_modality == work_modality)
-    
     # Filtros de fecha
     if date_from:
         try:
@@ -73,8 +133,14 @@ def index():
         except ValueError:
             pass
     
-    # Búsqueda por texto
-    if search_query:
+    # Búsqueda por texto: índice FTS5 (sin acentos, ordenado por relevancia) si existe
+    rank = None
+    match_expression = build_match_expression(search_query) if search_query else None
+    if match_expression and search_enabled(db_session.get_bind()):
+        results = search_subquery(match_expression)
+        query = query.join(results, results.c.job_data_id == JobData.id)
+        rank = results.c.rank
+    elif search_query:
         search_filter = or_(
             JobData.company_name.contains(search_query),
             JobData.position_title.contains(search_query),
@@ -82,37 +148,120 @@ def index():
         )
         query = query.filter(search_filter)
     
-    # Ordenar por fecha descendente
-    job_posts = query.order_by(desc(JobPost.post_date)).all()
-    
-    # Obtener datos para filtros
-    job_types = db_session.query(JobData.job_type).filter(
-        JobData.job_type.isnot(None),
-        JobData.job_type != "No es oferta laboral"
-    ).distinct().all()
-    job_types = [jt[0] for jt in job_types if jt[0]]
-    
-    companies = db_session.query(JobData.company_name).filter(
-        JobData.company_name.isnot(None),
-        JobData.company_name.notin_(["N/A", "Por determinar"])
-    ).distinct().all()
-    companies = [c[0] for c in companies if c[0]]
-    
-    industries = db_session.query(JobData.company_industry).filter(
-        JobData.company_industry.isnot(None)
-    ).distinct().all()
-    industries = [i[0] for i in industries if i[0]]
-    
-    work_modalities = db_session.query(JobData.work_modality).filter(
-        JobData.work_modality.isnot(None)
-    ).distinct().all()
-    work_modalities = [w[0] for w in work_modalities if w[0]]
+    return query, rank
+
+def encode_cursor(sort_value, data_id):
+    """Token opaco con la posición (fecha o relevancia, id) de la última oferta de una página"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, data_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token, ranked=False):
+    """Inverso de encode_cursor. Lanza ValueError si el token no es válido"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        sort_value, data_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if ranked:
+            return float(sort_value), int(data_id)
+        return (datetime.fromisoformat(sort_value) if sort_value else None), int(data_id)
+    except Exception:
+        raise ValueError(f"Cursor no válido: {token}")
+
+def get_page_size(args):
+    """Tamaño de página pedido, acotado a [1, MAX_PAGE_SIZE]"""
+    try:
+        page_size = int(args.get('page_size', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        page_size = DEFAULT_PAGE_SIZE
+    return max(1, min(MAX_PAGE_SIZE, page_size))
+
+def paginate_offers(query, page_size, cursor=None, rank=None):
+    """
+    Paginación por keyset sobre (post_date, id) descendente.
+    
+    En lugar de OFFSET, cada página continúa después de la última fila de la
+    anterior, así que el costo por página no crece con la profundidad. Las
+    fechas nulas van al final, como en el orden descendente de SQLite. Con
+    búsqueda de texto (`rank`) el orden es por relevancia bm25 y luego id.
+    
+    Returns:
+        Tupla (filas de la página, cursor de la página siguiente o None)
+    """
+    if rank is not None:
+        return paginate_ranked_offers(query, page_size, cursor, rank)
+    
+    if cursor is not None:
+        last_date, last_id = cursor
+        if last_date is None:
+            query = query.filter(JobPost.post_date.is_(None), JobData.id < last_id)
+        else:
+            query = query.filter(or_(
+                JobPost.post_date < last_date,
+                and_(JobPost.post_date == last_date, JobData.id < last_id),
+                JobPost.post_date.is_(None)
+            ))
+    
+    rows = query.order_by(desc(JobPost.post_date), desc(JobData.id)).limit(page_size + 1).all()
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last_post, last_data = rows[-1]
+        next_cursor = encode_cursor(last_post.post_date, last_data.id)
+    return rows, next_cursor
+
+def paginate_ranked_offers(query, page_size, cursor, rank):
+    """Igual que paginate_offers pero ordenando por relevancia (bm25: menor es mejor)"""
+    if cursor is not None:
+        last_rank, last_id = cursor
+        query = query.filter(or_(rank > last_rank, and_(rank == last_rank, JobData.id < last_id)))
+    
+    rows = query.add_columns(rank).order_by(rank, desc(JobData.id)).limit(page_size + 1).all()
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        _, last_data, last_rank = rows[-1]
+        next_cursor = encode_cursor(last_rank, last_data.id)
+    return [(post, data) for post, data, _ in rows], next_cursor
+
+@app.route('/')
+def index():
+    """Página principal con lista de ofertas paginada y filtros mejorados"""
+    
+    query, rank = build_offer_query(request.args)
+    # Sale de los conteos cacheados de las facetas, sin un COUNT por petición
+    total_offers = facet_service.count_offers(request.args)
+    
+    # Página actual: un cursor inválido simplemente vuelve a la primera
+    page_size = get_page_size(request.args)
+    try:
+        cursor = decode_cursor(request.args['cursor'], ranked=rank is not None) if request.args.get('cursor') else None
+    except ValueError:
+        cursor = None
+    job_posts, next_cursor = paginate_offers(query, page_size, cursor, rank)
+    
+    # Enlaces de navegación conservando los filtros
+    filter_args = {key: value for key, value in request.args.items() if key != 'cursor'}
+    next_page_url = url_for('index', **filter_args, cursor=next_cursor) if next_cursor else None
+    first_page_url = url_for('index', **filter_args) if cursor else None
+    
+    # Valores de los desplegables con su conteo bajo los filtros actuales (cacheados)
+    facets = facet_service.get_facets(request.args)
+    job_types = facets['type']
+    companies = facets['company']
+    industries = facets['industry']
+    work_modalities = facets['modality']
     
     # Estadísticas para el dashboard
     stats = get_dashboard_stats()
     
     return render_template('index.html', 
                          job_posts=job_posts,
+                         total_offers=total_offers,
+                         next_page_url=next_page_url,
+                         first_page_url=first_page_url,
                          job_types=job_types,
                          companies=companies,
                          industries=industries,
@@ -156,6 +305,47 @@ def api_stats():
     stats = get_dashboard_stats()
     return jsonify(stats)
 
+@app.route('/api/offers')
+def api_offers():
+    """
+    API de ofertas paginada por cursor.
+    
+    Acepta los mismos filtros que la página principal más page_size y cursor.
+    Para recorrer todo el resultado basta con repetir la petición pasando el
+    next_cursor de la respuesta anterior hasta que sea null.
+    """
+    page_size = get_page_size(request.args)
+    query, rank = build_offer_query(request.args)
+    try:
+        cursor = decode_cursor(request.args['cursor'], ranked=rank is not None) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    rows, next_cursor = paginate_offers(query, page_size, cursor, rank)
+    
+    offers = [{
+        'id': data.id,
+        'post_id': post.id,
+        'post_url': post.post_url,
+        'post_date': post.post_date.isoformat() if post.post_date else None,
+        'is_carousel': post.is_carousel,
+        'company_name': data.company_name,
+        'company_industry': data.company_industry,
+        'job_type': data.job_type,
+        'position_title': data.position_title,
+        'work_modality': data.work_modality,
+        'duration': data.duration,
+        'contact_email': data.contact_email,
+        'contact_phone': data.contact_phone,
+        'is_active': data.is_active,
+    } for post, data in rows]
+    
+    return jsonify({
+        'offers': offers,
+        'page_size': page_size,
+        'next_cursor': next_cursor
+    })
+
 @app.route('/dashboard')
 def dashboard():
     """Dashboard con gráficos y estadísticas avanzadas"""
@@ -181,32 +371,43 @@ def dashboard():
 
 @app.route('/export/excel')
 def export_excel():
-    """Exportar datos filtrados a Excel"""
-    from src.reports.reports_generator import JobAnalysisReporter
-    
-    reporter = JobAnalysisReporter()
-    filename = reporter.export_to_excel()
-    reporter.close()
-    
-    return jsonify({
-        'success': True,
-        'filename': filename,
-        'message': f'Datos exportados exitosamente a {filename}'
-    })
+    """Encolar la exportación a Excel; responde de inmediato con el id de la tarea"""
+    return task_response(task_runner.submit('excel')), 202
 
 @app.route('/export/contacts')
 def export_contacts():
-    """Exportar contactos a CSV"""
-    from src.reports.reports_generator import JobAnalysisReporter
-    
-    reporter = JobAnalysisReporter()
-    filename = reporter.export_contacts_csv()
-    reporter.close()
-    
+    """Encolar la exportación de contactos a CSV"""
+    return task_response(task_runner.submit('contacts')), 202
+
+@app.route('/api/tasks/<task_id>')
+def api_task(task_id):
+    """Estado de una exportación en segundo plano"""
+    task = task_runner.get(task_id)
+    if task is None:
+        return jsonify({'error': 'Tarea no encontrada'}), 404
+    return task_response(task)
+
+@app.route('/api/tasks/<task_id>/download')
+def download_task(task_id):
+    """Descargar el archivo de una exportación terminada"""
+    task = task_runner.get(task_id)
+    if task is None:
+        return jsonify({'error': 'Tarea no encontrada'}), 404
+    
+    path = task_runner.get_file(task_id)
+    if path is None:
+        return jsonify({'error': 'La exportación no ha terminado', 'status': task['status']}), 409
+    return send_file(path, as_attachment=True, download_name=os.path.basename(path))
+
+def task_response(task):
+    """JSON de una tarea con las URLs para consultar su estado y descargar el resultado"""
     return jsonify({
-        'success': True,
-        'filename': filename,
-        'message': f'Contactos exportados exitosamente a {filename}'
+        'success': task['status'] != 'failed',
+        'task_id': task['id'],
+        'status': task['status'],
+        'error': task['error'],
+        'status_url': url_for('api_task', task_id=task['id']),
+        'download_url': url_for('download_task', task_id=task['id']) if task['status'] == 'done' else None,
     })
 
 def prepare_job_data_for_template(job_data):
@@ -242,32 +443,27 @@ def prepare_job_data_for_template(job_data):
     return job_data
 
 def get_dashboard_stats():
-    """Obtiene estadísticas para el dashboard - CORREGIDO"""
+    """Obtiene estadísticas para el dashboard (cacheadas, ver stats_cache)"""
+    return stats_cache.get('dashboard', compute_dashboard_stats)
+
+def compute_dashboard_stats():
+    """Calcula las estadísticas del dashboard con una sola consulta agregada"""
+    
+    # Estadísticas de esta semana
+    week_ago = datetime.now() - timedelta(days=7)
+    counters = get_aggregate_counters(db_session, since=week_ago)
     
     stats = {}
     
     # Estadísticas generales
-    stats['total_posts'] = db_session.query(JobPost).count()
-    stats['total_job_offers'] = db_session.query(JobPost).filter(JobPost.is_job_offer == True).count()
-    
-    # CORRECCIÓN: Solo contar ofertas laborales reales
-    stats['active_offers'] = db_session.query(JobData).join(JobPost).filter(
-        JobPost.is_job_offer == True,
-        JobData.is_active == True
-    ).count()
+    stats['total_posts'] = counters['total_posts']
+    stats['total_job_offers'] = counters['job_offers']
     
-    # CORRECCIÓN: Solo contar ofertas laborales finalizadas, no posts que no son ofertas
-    stats['expired_offers'] = db_session.query(JobData).join(JobPost).filter(
-        JobPost.is_job_offer == True,
-        JobData.is_active == False
-    ).count()
+    # Solo ofertas laborales reales, activas y finalizadas
+    stats['active_offers'] = counters['active_offers']
+    stats['expired_offers'] = counters['expired_offers']
     
-    # Estadísticas de esta semana
-    week_ago = datetime.now() - timedelta(days=7)
-    stats['this_week'] = db_session.query(JobPost).filter(
-        JobPost.post_date >= week_ago,
-        JobPost.is_job_offer == True
-    ).count()
+    stats['this_week'] = counters['recent_offers']
     
     # Tasa de detección
     if stats['total_posts'] > 0:
@@ -276,11 +472,7 @@ def get_dashboard_stats():
         stats['detection_rate'] = 0
     
     # Ofertas con información de contacto completa
-    stats['with_contact'] = db_session.query(JobData).join(JobPost).filter(
-        JobPost.is_job_offer == True,
-        JobData.contact_email.isnot(None),
-        JobData.is_active == True
-    ).count()
+    stats['with_contact'] = counters['with_contact']
     
     return stats
 
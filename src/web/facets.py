@@ -0,0 +1,188 @@
+﻿# -*- coding: utf-8 -*-
+import time
+import logging
+import threading
+from collections import Counter, OrderedDict
+from sqlalchemy import func
+
+from src.database.models import JobData
+from src.database.stats_cache import get_data_version
+
+logger = logging.getLogger(__name__)
+
+# Parámetro del filtro -> (columna, valores que no se ofrecen en el desplegable)
+FACETS = OrderedDict([
+    ('type', (JobData.job_type, {"No es oferta laboral"})),
+    ('company', (JobData.company_name, {"N/A", "Por determinar"})),
+    ('industry', (JobData.company_industry, set())),
+    ('modality', (JobData.work_modality, set())),
+])
+
+# Parámetros que no filtran resultados y por lo tanto no forman parte de la clave de caché
+NON_FILTER_PARAMS = {'cursor', 'page_size'}
+
+class FacetService:
+    """
+    Valores y conteos de los desplegables de filtros (tipo, empresa, industria, modalidad).
+    
+    Por cada combinación de filtros que no son facetas (estado, fechas, búsqueda)
+    guarda los conteos de las tuplas (tipo, empresa, industria, modalidad),
+    obtenidos con un solo GROUP BY. El conteo de cada faceta se arma en Python
+    a partir de esas tuplas aplicando las demás facetas seleccionadas, así que
+    los números respetan los filtros actuales sin una consulta por desplegable.
+    El total de ofertas de la página sale de las mismas tuplas (count_offers).
+    
+    Cuando el pipeline guarda posts nuevos (cambia la versión de datos) solo se
+    agregan las filas de JobData con id mayor al último visto. Si desaparecieron
+    filas, o pasado `rebuild_seconds` (para recoger actualizaciones), se
+    recalcula todo.
+    """
+    
+    def __init__(self, db_session, base_query, version_path=None, max_entries=64, rebuild_seconds=600):
+        """
+        Args:
+            db_session: sesión de base de datos
+            base_query: función(args) que devuelve la consulta de ofertas con los
+                filtros que no son facetas ya aplicados
+            version_path: archivo de versión de datos (ver stats_cache)
+        """
+        self.db_session = db_session
+        self.base_query = base_query
+        self.version_path = version_path
+        self.max_entries = max_entries
+        self.rebuild_seconds = rebuild_seconds
+        self._entries = OrderedDict()  # clave de filtros -> estado de la caché (LRU)
+        self._lock = threading.Lock()
+        self.full_builds = 0
+        self.incremental_updates = 0
+    
+    def get_facets(self, args):
+        """
+        Returns:
+            Dict {parámetro: [(valor, conteo), ...]} ordenado alfabéticamente
+        """
+        return self._rolled_up(args)[0]
+    
+    def count_offers(self, args):
+        """Número de ofertas con todos los filtros aplicados, facetas incluidas"""
+        return self._rolled_up(args)[1]
+    
+    def _rolled_up(self, args):
+        """(facetas, total) para los filtros de `args`, cacheados por selección de facetas"""
+        selected = {
+            param: args.get(param) for param in FACETS
+            if args.get(param) and args.get(param) != 'all'
+        }
+        key = tuple(sorted(
+            (param, value) for param, value in args.items()
+            if param not in FACETS and param not in NON_FILTER_PARAMS
+        ))
+        
+        with self._lock:
+            entry = self._refresh(key, args)
+            rollup_key = tuple(sorted(selected.items()))
+            rolled_up = entry['rollups'].get(rollup_key)
+            if rolled_up is None:
+                rolled_up = self._roll_up(entry['counts'], selected)
+                entry['rollups'][rollup_key] = rolled_up
+            return rolled_up
+    
+    def _refresh(self, key, args):
+        """Devuelve la entrada de caché para `key`, construyéndola o actualizándola si hace falta"""
+        version = get_data_version(self.version_path)
+        entry = self._entries.get(key)
+        
+        if entry is not None and time.monotonic() - entry['built_at'] > self.rebuild_seconds:
+            entry = None
+        
+        if entry is not None and entry['version'] != version:
+            max_id = self.db_session.query(func.max(JobData.id)).scalar() or 0
+            if max_id < entry['last_id']:
+                # Se borraron filas (p. ej. clean_database): no se puede actualizar por incrementos
+                entry = None
+            else:
+                if max_id > entry['last_id']:
+                    new_counts, _ = self._count(args, after_id=entry['last_id'])
+                    entry['counts'].update(new_counts)
+                    entry['rollups'] = {}
+                    self.incremental_updates += 1
+                entry['last_id'] = max_id
+                entry['version'] = version
+        
+        if entry is None:
+            counts, last_id = self._count(args)
+            entry = {
+                'counts': counts,
+                'last_id': last_id,
+                'version': version,
+                'built_at': time.monotonic(),
+                'rollups': {},
+            }
+            self.full_builds += 1
+        
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+    
+    def _count(self, args, after_id=None):
+        """Un GROUP BY sobre las cuatro facetas; devuelve (Counter de tuplas, id máximo visto)"""
+        columns = [column for column, _ in FACETS.values()]
+        query = self.base_query(args)
+        if after_id is not None:
+            query = query.filter(JobData.id > after_id)
+        rows = query.order_by(None).with_entities(
+            *columns, func.count(JobData.id), func.max(JobData.id)
+        ).group_by(*columns).all()
+        
+        counts = Counter()
+        last_id = after_id or 0
+        for row in rows:
+            counts[tuple(row[:len(columns)])] += row[-2]
+            last_id = max(last_id, row[-1] or 0)
+        return counts, last_id
+    
+    def _roll_up(self, counts, selected):
+        """
+        Conteo por valor de cada faceta, aplicando las demás facetas seleccionadas
+        
+        Returns:
+            Tupla (facetas, total de ofertas que cumplen todas las selecciones)
+        """
+        params = list(FACETS)
+        per_facet = {param: Counter() for param in params}
+        total = 0
+        for values, count in counts.items():
+            mismatched = [
+                param for param, value in zip(params, values)
+                if param in selected and value != selected[param]
+            ]
+            if not mismatched:
+                total += count
+            # La tupla cuenta para una faceta si coincide con todas las demás selecciones
+            if len(mismatched) > 1:
+                continue
+            for index, param in enumerate(params):
+                if not mismatched or mismatched == [param]:
+                    per_facet[param][values[index]] += count
+        
+        facets = {}
+        for param, (_, excluded) in FACETS.items():
+            options = {
+                value: count for value, count in per_facet[param].items()
+                if value and value not in excluded
+            }
+            # La opción seleccionada se mantiene aunque ya no tenga resultados
+            if param in selected:
+                options.setdefault(selected[param], 0)
+            facets[param] = sorted(options.items(), key=lambda item: item[0].lower())
+        return facets, total
+    
+    def get_stats(self):
+        """Estadísticas de la caché de facetas"""
+        return {
+            "entries": len(self._entries),
+            "full_builds": self.full_builds,
+            "incremental_updates": self.incremental_updates,
+        }
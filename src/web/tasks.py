@@ -0,0 +1,208 @@
+﻿# -*- coding: utf-8 -*-
+import os
+import uuid
+import socket
+import logging
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.orm import sessionmaker
+
+from src.database.models import ExportTask
+from src.reports.reports_generator import JobAnalysisReporter
+
+# Exportaciones disponibles: tipo -> (método de JobAnalysisReporter, extensión)
+EXPORTS = {
+    'excel': ('export_to_excel', 'xlsx'),
+    'contacts': ('export_contacts_csv', 'csv'),
+}
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+def process_start_time(pid):
+    """
+    Momento de inicio del proceso (ticks desde el arranque del sistema, de
+    /proc/<pid>/stat), o None si no se puede leer (p. ej. fuera de Linux)
+    """
+    try:
+        with open(f'/proc/{pid}/stat', encoding='utf-8') as f:
+            stat = f.read()
+        # El nombre del comando va entre paréntesis y puede contener espacios;
+        # starttime es el campo 22 y los campos tras el paréntesis empiezan en el 3
+        return stat[stat.rindex(')') + 2:].split()[19]
+    except (OSError, ValueError, IndexError):
+        return None
+
+def process_identity(pid):
+    """host:pid:inicio del proceso, o host:pid si no se conoce su hora de inicio"""
+    identity = f"{socket.gethostname()}:{pid}"
+    started = process_start_time(pid)
+    return f"{identity}:{started}" if started else identity
+
+class TaskRunner:
+    """
+    Ejecuta las exportaciones del dashboard fuera del hilo de la petición.
+    
+    Cada tarea queda registrada en la tabla export_tasks, así que su estado
+    se puede consultar desde cualquier petición y cualquier proceso del
+    servidor. Cada tarea usa su propia sesión sobre el engine compartido y
+    guarda el proceso que la ejecuta (host:pid:inicio, ver process_identity):
+    al arrancar, las de procesos que ya no existen (reinicio o worker caído)
+    y las que llevan el host:pid de este mismo proceso se marcan como fallidas.
+    """
+    
+    def __init__(self, engine, export_dir, max_workers=1, retention_hours=24):
+        self.logger = logging.getLogger(__name__)
+        self.Session = sessionmaker(bind=engine)
+        self.export_dir = os.path.abspath(export_dir)
+        self.retention = timedelta(hours=retention_hours)
+        self.worker = process_identity(os.getpid())
+        os.makedirs(self.export_dir, exist_ok=True)
+        
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='export')
+        self._fail_interrupted()
+    
+    def submit(self, kind):
+        """
+        Encola una exportación y devuelve su estado (ver get).
+        
+        Si ya hay una del mismo tipo pendiente o en curso, se devuelve esa en
+        lugar de generar el mismo archivo dos veces.
+        """
+        if kind not in EXPORTS:
+            raise ValueError(f"Tipo de exportación desconocido: {kind}")
+        
+        self._purge_expired()
+        with self.Session() as session:
+            task = session.query(ExportTask).filter(
+                ExportTask.kind == kind,
+                ExportTask.status.in_([PENDING, RUNNING])
+            ).first()
+            if task is None:
+                task = ExportTask(id=uuid.uuid4().hex, kind=kind, status=PENDING, worker=self.worker)
+                session.add(task)
+                session.commit()
+                self.executor.submit(self._run, task.id, kind)
+                self.logger.info(f"Exportación {kind} encolada: {task.id}")
+            return self._as_dict(task)
+    
+    def get(self, task_id):
+        """Estado de una tarea como diccionario, o None si no existe"""
+        with self.Session() as session:
+            task = session.get(ExportTask, task_id)
+            return self._as_dict(task) if task is not None else None
+    
+    def get_file(self, task_id):
+        """Ruta del archivo de una tarea terminada, o None si no está disponible"""
+        task = self.get(task_id)
+        if task is None or task['status'] != DONE or not task['filename']:
+            return None
+        path = os.path.join(self.export_dir, task['filename'])
+        return path if os.path.exists(path) else None
+    
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+    
+    def _run(self, task_id, kind):
+        method, extension = EXPORTS[kind]
+        filename = f"{kind}_{task_id}.{extension}"
+        self._update(task_id, status=RUNNING, started_at=datetime.utcnow())
+        
+        reporter = JobAnalysisReporter(db_session=self.Session())
+        try:
+            getattr(reporter, method)(os.path.join(self.export_dir, filename))
+        except Exception as e:
+            self.logger.error(f"Error en la exportación {task_id}: {str(e)}")
+            self._update(task_id, status=FAILED, error=str(e), finished_at=datetime.utcnow())
+            return
+        finally:
+            reporter.close()
+        
+        self._update(task_id, status=DONE, filename=filename, finished_at=datetime.utcnow())
+        self.logger.info(f"Exportación {kind} terminada: {filename}")
+    
+    def _update(self, task_id, **fields):
+        with self.Session() as session:
+            session.query(ExportTask).filter(ExportTask.id == task_id).update(fields)
+            session.commit()
+    
+    def _fail_interrupted(self):
+        """
+        Las tareas sin terminar cuyo proceso ya no existe no van a terminar.
+        
+        Tampoco las que tienen el host:pid de este proceso: este runner recién
+        arranca, así que las dejó otro que terminó o un proceso anterior con
+        el mismo pid (también si se guardaron sin hora de inicio).
+        """
+        own_process = self.worker.split(':')[:2]
+        with self.Session() as session:
+            unfinished = session.query(ExportTask).filter(
+                ExportTask.status.in_([PENDING, RUNNING])
+            ).all()
+            interrupted = [
+                task for task in unfinished
+                if (task.worker or '').split(':')[:2] == own_process or not self._worker_alive(task.worker)
+            ]
+            for task in interrupted:
+                task.status = FAILED
+                task.error = 'Interrumpida por un reinicio del servidor'
+                task.finished_at = datetime.utcnow()
+            session.commit()
+        if interrupted:
+            self.logger.warning(f"{len(interrupted)} exportaciones interrumpidas marcadas como fallidas")
+    
+    @staticmethod
+    def _worker_alive(worker):
+        """
+        Si el proceso host:pid[:inicio] sigue vivo; los de otros hosts se asumen vivos.
+        
+        Con la hora de inicio guardada, un pid reutilizado por otro proceso
+        (p. ej. el pid 1 tras reiniciar un contenedor) no cuenta como vivo.
+        """
+        if not worker:
+            return False
+        host, _, pid = worker.partition(':')
+        pid, _, started = pid.partition(':')
+        if host != socket.gethostname() or os.name == 'nt':
+            # En Windows os.kill(pid, 0) terminaría el proceso
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except (PermissionError, ValueError, OSError):
+            return True
+        if started and process_identity(int(pid)) != worker:
+            return False
+        return True
+    
+    def _purge_expired(self):
+        """Borra las tareas terminadas (y sus archivos) más antiguas que la retención"""
+        cutoff = datetime.utcnow() - self.retention
+        with self.Session() as session:
+            expired = session.query(ExportTask).filter(
+                ExportTask.status.in_([DONE, FAILED]),
+                ExportTask.finished_at < cutoff
+            ).all()
+            for task in expired:
+                if task.filename:
+                    path = os.path.join(self.export_dir, task.filename)
+                    if os.path.exists(path):
+                        os.remove(path)
+                session.delete(task)
+            session.commit()
+    
+    @staticmethod
+    def _as_dict(task):
+        return {
+            'id': task.id,
+            'kind': task.kind,
+            'status': task.status,
+            'filename': task.filename,
+            'error': task.error,
+            'created_at': task.created_at.isoformat() if task.created_at else None,
+            'started_at': task.started_at.isoformat() if task.started_at else None,
+            'finished_at': task.finished_at.isoformat() if task.finished_at else None,
+        }